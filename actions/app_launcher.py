@@ -0,0 +1,339 @@
+"""
+Application Launcher Action Module
+Finds installed applications by spoken name and launches them without a shell.
+Scans .desktop entries, macOS app bundles and Start Menu shortcuts (plus $PATH
+executables if config.APP_LAUNCHER_SCAN_PATH) once, keeps an in-memory fuzzy
+index, and only rescans directories whose mtime has changed. Commands in
+config.APP_LAUNCHER_DENYLIST (reboot, rm, sudo, ...) are never indexed.
+"""
+
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+from pathlib import Path
+import config
+from actions.fuzzy import TrigramIndex, normalize
+
+
+# Desktop entry field codes (%f, %U, %i, ...) that must be stripped from Exec
+_FIELD_CODE_RE = re.compile(r"%[fFuUdDnNickvm%]")
+_NAME_SUFFIXES = (".desktop", ".app", ".exe", ".lnk")
+# Shorter queries only match on trigram similarity: "x" must not be a prefix of everything
+_MIN_PREFIX_CHARS = 3
+
+
+def _normalize(name: str) -> str:
+    """Normalize an application name (e.g., "Google-Chrome.desktop" -> "google chrome")."""
+    return normalize(name, _NAME_SUFFIXES)
+
+
+class AppEntry:
+    """A launchable application and the names it can be matched by."""
+
+    __slots__ = ("name", "argv", "source", "aliases")
+
+    def __init__(self, name: str, argv: list, source: str, aliases: set):
+        self.name = name
+        self.argv = argv
+        self.source = source
+        self.aliases = aliases
+
+    def __repr__(self) -> str:
+        return f"AppEntry({self.name!r}, {self.argv!r})"
+
+
+class AppIndex:
+    """
+    In-memory fuzzy index over installed applications.
+    Entries are grouped by the directory they came from so a changed
+    directory can be rescanned without touching the rest of the index.
+    """
+
+    def __init__(self, desktop_dirs=None, app_dirs=None, path_dirs=None):
+        self.desktop_dirs = [Path(d) for d in (desktop_dirs if desktop_dirs is not None else _default_desktop_dirs())]
+        self.app_dirs = [Path(d) for d in (app_dirs if app_dirs is not None else _default_app_dirs())]
+        if path_dirs is None:
+            path_dirs = _default_path_dirs() if config.APP_LAUNCHER_SCAN_PATH else []
+        self.path_dirs = [Path(d) for d in path_dirs]
+        self._lock = threading.Lock()
+        self._dir_mtimes = {}
+        self._dir_entries = {}
+        self._exact = {}
+        self._grams = TrigramIndex()
+
+    def refresh(self) -> int:
+        """
+        Rescan directories whose mtime changed since the last scan.
+        The first call scans everything.
+
+        Returns:
+            Number of directories that were rescanned
+        """
+        rescanned = 0
+        with self._lock:
+            seen = set()
+            for kind, dirs in (("desktop", self.desktop_dirs), ("app", self.app_dirs), ("path", self.path_dirs)):
+                for directory in dirs:
+                    key = (kind, str(directory))
+                    seen.add(key)
+                    try:
+                        mtime = directory.stat().st_mtime_ns
+                    except OSError:
+                        mtime = None
+                    if key in self._dir_mtimes and self._dir_mtimes[key] == mtime:
+                        continue
+                    self._dir_mtimes[key] = mtime
+                    self._dir_entries[key] = _scan_dir(kind, directory) if mtime is not None else []
+                    rescanned += 1
+            for key in list(self._dir_entries):
+                if key not in seen:
+                    del self._dir_entries[key]
+                    self._dir_mtimes.pop(key, None)
+                    rescanned += 1
+            if rescanned:
+                self._rebuild()
+        return rescanned
+
+    def _rebuild(self) -> None:
+        """Rebuild the alias and trigram tables from the per-directory entries."""
+        exact = {}
+        gram_index = {}
+        alias_grams = {}
+        # Desktop entries win over bundles, which win over bare executables;
+        # within a kind, earlier directories (XDG/$PATH order) win
+        for kind in ("path", "app", "desktop"):
+            for (entry_kind, _), entries in reversed(list(self._dir_entries.items())):
+                if entry_kind != kind:
+                    continue
+                for entry in entries:
+                    for alias in entry.aliases:
+                        exact[alias] = entry
+        grams = TrigramIndex()
+        for alias in exact:
+            grams.add(alias, alias)
+        self._exact = exact
+        self._grams = grams
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """
+        Find the applications that best match a spoken name.
+
+        Args:
+            query: Spoken or typed application name
+            limit: Maximum number of results
+
+        Returns:
+            List of (score, AppEntry) tuples, best first. Scores are in [0, 1].
+        """
+        norm = _normalize(query)
+        if not norm:
+            return []
+        exact = self._exact
+
+        hit = exact.get(norm) or exact.get(norm.replace(" ", ""))
+        if hit is not None:
+            return [(1.0, hit)]
+
+        best = {}
+        for score, alias in self._grams.search(norm, limit=None):
+            if len(norm) >= _MIN_PREFIX_CHARS and (alias.startswith(norm) or norm in alias.split()):
+                score = max(score, 0.9)
+            entry = exact[alias]
+            if score > best.get(id(entry), (0.0, None))[0]:
+                best[id(entry)] = (score, entry)
+
+        ranked = sorted(best.values(), key=lambda item: (-item[0], item[1].name))
+        return ranked[:limit]
+
+    def best_match(self, query: str):
+        """
+        Return the single best application for a query, or None if nothing
+        scores above config.APP_LAUNCHER_MIN_SCORE.
+        """
+        results = self.search(query, limit=1)
+        if results and results[0][0] >= config.APP_LAUNCHER_MIN_SCORE:
+            return results[0][1]
+        return None
+
+
+def _default_desktop_dirs() -> list:
+    """XDG application directories, in precedence order."""
+    if sys.platform.startswith("win") or sys.platform == "darwin":
+        return []
+    data_home = os.environ.get("XDG_DATA_HOME") or str(Path("~/.local/share").expanduser())
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [Path(data_home) / "applications"]
+    dirs += [Path(d) / "applications" for d in data_dirs.split(":") if d]
+    dirs += [Path("/var/lib/flatpak/exports/share/applications"),
+             Path("~/.local/share/flatpak/exports/share/applications").expanduser()]
+    return dirs
+
+
+def _default_app_dirs() -> list:
+    """Directories holding app bundles (macOS) or Start Menu shortcuts (Windows)."""
+    if sys.platform == "darwin":
+        return [Path("/Applications"), Path("/System/Applications"), Path("~/Applications").expanduser()]
+    if sys.platform.startswith("win"):
+        dirs = []
+        for var in ("APPDATA", "PROGRAMDATA"):
+            base = os.environ.get(var)
+            if base:
+                dirs.append(Path(base) / "Microsoft" / "Windows" / "Start Menu" / "Programs")
+        return dirs
+    return []
+
+
+def _default_path_dirs() -> list:
+    """Unique directories from $PATH, in order."""
+    seen = []
+    for d in os.environ.get("PATH", "").split(os.pathsep):
+        if d and d not in seen:
+            seen.append(d)
+    return [Path(d) for d in seen]
+
+
+def _denied(argv: list) -> bool:
+    """True if the command is on config.APP_LAUNCHER_DENYLIST ("mkfs.ext4" matches "mkfs")."""
+    words = [Path(argv[0]).name.lower()]
+    if words[0] in ("env", "sh", "bash"):
+        # Wrapped commands ("env reboot", "sh -c 'rm ...'") are judged by every word
+        words += [Path(w).name.lower() for a in argv[1:] for w in a.split()]
+    for word in words:
+        if word.endswith(".exe"):
+            word = word[:-4]
+        if word in config.APP_LAUNCHER_DENYLIST or word.split(".")[0] in config.APP_LAUNCHER_DENYLIST:
+            return True
+    return False
+
+
+def _scan_dir(kind: str, directory: Path) -> list:
+    """
+    Scan one directory and return its launchable entries.
+
+    Args:
+        kind: "desktop", "app" or "path"
+        directory: Directory to scan
+
+    Returns:
+        List of AppEntry objects
+    """
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                try:
+                    if kind == "desktop":
+                        if item.name.endswith(".desktop"):
+                            entry = _parse_desktop_file(Path(item.path))
+                            if entry and not _denied(entry.argv):
+                                entries.append(entry)
+                    elif kind == "app":
+                        if item.name.endswith((".app", ".lnk")):
+                            name = item.name.rsplit(".", 1)[0]
+                            entries.append(AppEntry(name, [item.path], kind, {_normalize(name)}))
+                    elif item.is_file() and os.access(item.path, os.X_OK) and not _denied([item.name]):
+                        norm = _normalize(item.name)
+                        if norm:
+                            entries.append(AppEntry(item.name, [item.path], kind, {norm}))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return entries
+
+
+def _parse_desktop_file(path: Path):
+    """
+    Parse the [Desktop Entry] group of a .desktop file.
+
+    Args:
+        path: Path to the .desktop file
+
+    Returns:
+        AppEntry, or None if the entry is hidden or not an application
+    """
+    fields = {}
+    in_group = False
+    try:
+        with path.open(encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_group:
+                        break
+                    in_group = line == "[Desktop Entry]"
+                    continue
+                if in_group and "=" in line and not line.startswith("#"):
+                    key, value = line.split("=", 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+
+    if fields.get("Type", "Application") != "Application":
+        return None
+    if fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+        return None
+    exec_line = fields.get("Exec")
+    name = fields.get("Name")
+    if not exec_line or not name:
+        return None
+    try:
+        argv = [a for a in shlex.split(_FIELD_CODE_RE.sub("", exec_line)) if a]
+    except ValueError:
+        return None
+    if not argv:
+        return None
+
+    aliases = {_normalize(name), _normalize(path.stem), _normalize(Path(argv[0]).name)}
+    generic = fields.get("GenericName")
+    if generic:
+        aliases.add(_normalize(generic))
+    for keyword in fields.get("Keywords", "").split(";"):
+        if keyword.strip():
+            aliases.add(_normalize(keyword))
+    aliases.discard("")
+    return AppEntry(name, argv, "desktop", aliases)
+
+
+# Global index, scanned lazily on first lookup
+_index = AppIndex()
+
+
+def launch_app(name: str) -> str:
+    """
+    Launch the installed application that best matches a spoken name.
+    The process is started directly (no shell) and detached from Jarvis.
+
+    Args:
+        name: Spoken application name (e.g., "firefox", "text editor")
+
+    Returns:
+        Confirmation message
+
+    Raises:
+        ValueError: If no application matches or it fails to start
+    """
+    _index.refresh()
+    entry = _index.best_match(name)
+    if entry is None:
+        raise ValueError(f"No installed application matches '{name}'")
+    try:
+        if entry.source == "app" and sys.platform == "darwin":
+            subprocess.Popen(["open", "-a", entry.argv[0]], start_new_session=True,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elif entry.source == "app" and sys.platform.startswith("win"):
+            os.startfile(entry.argv[0])
+        else:
+            kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+            if not sys.platform.startswith("win"):
+                kwargs["start_new_session"] = True
+            subprocess.Popen(entry.argv, **kwargs)
+    except Exception as e:
+        raise ValueError(f"Failed to launch {entry.name}: {e}")
+    return f"Opened {entry.name}"
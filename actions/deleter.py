@@ -1,44 +1,181 @@
 """
 Deletion Action Module
 Deletes characters and words using pynput.
+Builds one selection while the modifiers are held and deletes it with a
+single key press, instead of a select/delete or Backspace pair per unit.
 """
 
+import sys
+import time
 from pynput.keyboard import Controller, Key
+import config
+import log
+import metrics
+
+_log = log.get_logger("deleter")
+
+try:
+    import pyperclip
+except Exception:
+    pyperclip = None
 
 controller = Controller()
 
+KEY_EVENTS = metrics.counter(
+    "jarvis_delete_key_events_total", "Synthetic key events sent by deletions, by operation", ("operation",),
+)
+SECONDS = metrics.histogram(
+    "jarvis_delete_seconds", "Wall time of deletions, by operation", metrics.LATENCY_BUCKETS, ("operation",),
+)
+
+# Written to the clipboard before a copy so an empty selection can be detected
+_CLIPBOARD_SENTINEL = "\u0000jarvis-selection-probe\u0000"
+
+
+class _EventCounter:
+    """Counts synthetic key events sent during one operation."""
+
+    def __init__(self):
+        self.events = 0
+
+    def tap(self, key) -> None:
+        controller.press(key)
+        controller.release(key)
+        self.events += 2
+
+    def tap_with(self, modifiers: tuple, key, times: int = 1) -> None:
+        """Hold modifiers once and tap key `times` times."""
+        with controller.pressed(*modifiers):
+            for _ in range(times):
+                controller.press(key)
+                controller.release(key)
+        self.events += 2 * len(modifiers) + 2 * times
+
+
+def _record(operation: str, events: int, seconds: float) -> None:
+    KEY_EVENTS.inc(operation, amount=events)
+    SECONDS.observe(seconds, operation)
+
+
+def _word_modifier():
+    # macOS moves by word with Option, everything else with Ctrl
+    return Key.alt if sys.platform == "darwin" else Key.ctrl
+
+
+def _select_to_line_start(counter: _EventCounter) -> None:
+    if sys.platform == "darwin":
+        counter.tap_with((Key.cmd, Key.shift), Key.left)
+    else:
+        counter.tap_with((Key.shift,), Key.home)
+
+
+def _copy_selection(counter: _EventCounter) -> str:
+    """
+    Copy the current selection and return its text, or "" if nothing was
+    selected.
+    """
+    pyperclip.copy(_CLIPBOARD_SENTINEL)
+    counter.tap_with((Key.cmd if sys.platform == "darwin" else Key.ctrl,), "c")
+    time.sleep(config.DELETE_CLIPBOARD_WAIT)
+    selected = pyperclip.paste()
+    if selected == _CLIPBOARD_SENTINEL:
+        return ""
+    return selected.replace("\r\n", "\n")
+
+
+def _delete_lines_backward(counter: _EventCounter, count: int) -> int:
+    """
+    Delete whole line segments while they fit inside `count` characters.
+    Each step selects to the start of the line, measures the selection via
+    the clipboard, and deletes it with one key if it is not longer than
+    what is left to delete. The clipboard is restored afterwards.
+    Stops as soon as the copy holds a line break: a selection to the line
+    start never does, so the editor copied its whole line instead (VS Code
+    and JetBrains do that with nothing selected) and the length is not
+    what one Backspace would remove.
+
+    Returns:
+        Number of characters still to delete
+    """
+    remaining = count
+    try:
+        saved = pyperclip.paste()
+    except Exception:
+        return remaining
+    try:
+        while remaining >= config.DELETE_LINE_SELECT_THRESHOLD:
+            _select_to_line_start(counter)
+            selected = _copy_selection(counter)
+            length = len(selected)
+            if "\n" in selected:
+                # Nothing is selected; Shift+Left deletes the rest
+                break
+            if length == 0:
+                # Already at the start of a line: one Backspace removes the line break
+                counter.tap(Key.backspace)
+                remaining -= 1
+            elif length <= remaining:
+                counter.tap(Key.backspace)
+                remaining -= length
+            else:
+                # Line is longer than what is left: collapse the selection back to the cursor
+                counter.tap(Key.right)
+                break
+    finally:
+        try:
+            pyperclip.copy(saved)
+        except Exception as e:
+            _log.warning("Could not restore clipboard: %s", e)
+    return remaining
+
 
 def delete_chars(count: int) -> None:
     """
-    Delete N characters backward by pressing Backspace N times.
-    
+    Delete N characters backward.
+    Selects N characters with Shift+Left while holding Shift once, then
+    deletes the selection with a single Backspace. Counts of at least
+    config.DELETE_LINE_SELECT_THRESHOLD first consume whole line segments
+    with Shift+Home when the clipboard is available.
+
     Args:
         count: Number of characters to delete
     """
+    if count <= 0:
+        return
+    counter = _EventCounter()
+    start = time.perf_counter()
     try:
-        for _ in range(count):
-            controller.press(Key.backspace)
-            controller.release(Key.backspace)
+        remaining = count
+        if pyperclip is not None and count >= config.DELETE_LINE_SELECT_THRESHOLD:
+            remaining = _delete_lines_backward(counter, count)
+        if remaining == 1:
+            counter.tap(Key.backspace)
+        elif remaining > 1:
+            counter.tap_with((Key.shift,), Key.left, remaining)
+            counter.tap(Key.backspace)
     except Exception as e:
-        print(f"Error deleting characters: {e}")
+        _log.error("Error deleting characters: %s", e)
+    finally:
+        _record("delete_chars", counter.events, time.perf_counter() - start)
 
 
 def delete_words(count: int) -> None:
     """
-    Delete N words backward by selecting N words and deleting.
-    Uses Shift+Ctrl+Left to select words backward, then deletes.
-    
+    Delete N words backward.
+    Holds Ctrl+Shift (Option+Shift on macOS), presses Left N times to
+    select the words, then deletes the selection once.
+
     Args:
         count: Number of words to delete
     """
+    if count <= 0:
+        return
+    counter = _EventCounter()
+    start = time.perf_counter()
     try:
-        for _ in range(count):
-            # Select word backward: Ctrl+Shift+Left
-            with controller.pressed(Key.ctrl, Key.shift):
-                controller.press(Key.left)
-                controller.release(Key.left)
-            # Delete the selected word
-            controller.press(Key.delete)
-            controller.release(Key.delete)
+        counter.tap_with((_word_modifier(), Key.shift), Key.left, count)
+        counter.tap(Key.delete)
     except Exception as e:
-        print(f"Error deleting words: {e}")
+        _log.error("Error deleting words: %s", e)
+    finally:
+        _record("delete_words", counter.events, time.perf_counter() - start)
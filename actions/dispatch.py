@@ -0,0 +1,517 @@
+"""
+Action Dispatch Module
+Registry mapping action names (as returned by the router/AI) to handlers.
+Each action declares a parameter schema and a timeout; handlers run on a
+bounded thread pool so slow actions never hold up the overlay answer.
+Timeouts do not cancel handlers (Python threads cannot be stopped): an
+overrunning handler keeps its pool thread until it returns, but its serial
+lane is released when the timeout expires so later keyboard actions run.
+Action modules are imported once, on first use, and cached.
+Multi-step plans run independent steps concurrently and dependent steps in order.
+"""
+
+import importlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+import config
+import log
+import tracing
+
+_log = log.get_logger("dispatch")
+
+
+class Param:
+    """Schema entry for one action parameter."""
+
+    __slots__ = ("type", "required", "default", "choices")
+
+    def __init__(self, type=str, required: bool = False, default=None, choices=None):
+        self.type = type
+        self.required = required
+        self.default = default
+        self.choices = choices
+
+    def coerce(self, name: str, value):
+        """Convert value to the declared type or raise ValueError."""
+        if self.type is bool and isinstance(value, str):
+            value = value.strip().lower() in ("1", "true", "yes", "on")
+        elif not isinstance(value, self.type):
+            try:
+                value = self.type(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Parameter '{name}' must be {self.type.__name__}, got {value!r}")
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"Parameter '{name}' must be one of {', '.join(map(str, self.choices))}")
+        return value
+
+
+class ActionSpec:
+    """A registered action: handler, parameter schema, and limits."""
+
+    __slots__ = ("name", "handler", "params", "timeout", "answers", "serial")
+
+    def __init__(self, name: str, handler, params: dict, timeout: float, answers: bool, serial: bool = False):
+        self.name = name
+        self.handler = handler
+        self.params = params
+        self.timeout = timeout
+        self.answers = answers
+        self.serial = serial
+
+    def validate(self, params: dict) -> dict:
+        """
+        Check params against the schema.
+        Unknown keys are dropped, defaults filled in, values coerced.
+
+        Raises:
+            ValueError: If a required parameter is missing/empty or a value is invalid
+        """
+        params = params if isinstance(params, dict) else {}
+        clean = {}
+        for name, spec in self.params.items():
+            value = params.get(name)
+            if value is None or value == "":
+                if spec.required:
+                    raise ValueError(f"Action '{self.name}' requires parameter '{name}'")
+                if spec.default is not None:
+                    clean[name] = spec.default
+                continue
+            clean[name] = spec.coerce(name, value)
+        return clean
+
+
+_registry = {}
+_modules = {}
+_modules_lock = threading.Lock()
+
+
+def register(name: str, params: dict = None, timeout: float = None, answers: bool = False, serial: bool = False):
+    """
+    Decorator registering a handler for an action name.
+
+    Args:
+        name: Action name used in router/AI responses
+        params: Mapping of parameter name to Param
+        timeout: Seconds to wait for the handler, and to hold the serial lane
+            (config.ACTION_DEFAULT_TIMEOUT if None). The handler is not cancelled.
+        answers: The handler's return value replaces the response's answer text
+        serial: Never run concurrently with another serial action (keyboard input)
+    """
+    def decorator(func):
+        _registry[name] = ActionSpec(name, func, params or {}, timeout or config.ACTION_DEFAULT_TIMEOUT, answers, serial)
+        return func
+    return decorator
+
+
+def get_spec(name: str):
+    """Return the ActionSpec for an action name, or None if unknown."""
+    return _registry.get(name)
+
+
+def _module(name: str):
+    """Import an action module once and cache it."""
+    mod = _modules.get(name)
+    if mod is None:
+        with _modules_lock:
+            mod = _modules.get(name)
+            if mod is None:
+                mod = importlib.import_module(name)
+                _modules[name] = mod
+    return mod
+
+
+# ==================== STATS ====================
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name: str, seconds: float, error: bool, timed_out: bool) -> None:
+    with _stats_lock:
+        s = _stats.setdefault(name, {"count": 0, "errors": 0, "timeouts": 0, "total": 0.0, "max": 0.0})
+        s["count"] += 1
+        s["total"] += seconds
+        s["max"] = max(s["max"], seconds)
+        s["errors"] += int(error)
+        s["timeouts"] += int(timed_out)
+
+
+def get_action_stats() -> dict:
+    """
+    Return per-action latency statistics.
+
+    Returns:
+        Dict mapping action name to count, errors, timeouts, avg_ms and max_ms
+    """
+    with _stats_lock:
+        return {
+            name: {
+                "count": s["count"],
+                "errors": s["errors"],
+                "timeouts": s["timeouts"],
+                "avg_ms": 1000 * s["total"] / s["count"] if s["count"] else 0.0,
+                "max_ms": 1000 * s["max"],
+            }
+            for name, s in _stats.items()
+        }
+
+
+# ==================== EXECUTION ====================
+
+_executor = ThreadPoolExecutor(max_workers=config.ACTION_MAX_WORKERS, thread_name_prefix="jarvis-action")
+_slots = threading.BoundedSemaphore(config.ACTION_MAX_WORKERS + config.ACTION_MAX_PENDING)
+_serial_lock = threading.Lock()
+
+
+def _call(spec: ActionSpec, params: dict):
+    if not spec.serial:
+        return spec.handler(**params)
+    _serial_lock.acquire()
+    released = []
+    release_guard = threading.Lock()
+
+    def release(expired: bool = False) -> None:
+        with release_guard:
+            if released:
+                return
+            released.append(True)
+        if expired:
+            _log.warning("Action '%s' still running after %ss; releasing the serial lane", spec.name, spec.timeout)
+        _serial_lock.release()
+
+    # A hung keyboard action must not block every later one
+    timer = threading.Timer(spec.timeout, release, (True,))
+    timer.daemon = True
+    timer.start()
+    try:
+        return spec.handler(**params)
+    finally:
+        timer.cancel()
+        release()
+
+
+def _run(spec: ActionSpec, params: dict, trace=None):
+    start = time.perf_counter()
+    error = False
+    try:
+        with tracing.use(trace):
+            return _call(spec, params)
+    except Exception:
+        error = True
+        raise
+    finally:
+        end = time.perf_counter()
+        elapsed = end - start
+        if trace is not None:
+            trace.add_span("action", start, end, action=spec.name, ok=not error)
+        _slots.release()
+        timed_out = elapsed > spec.timeout
+        if timed_out:
+            _log.warning("Action '%s' took %.1fs (timeout %ss)", spec.name, elapsed, spec.timeout)
+        _record(spec.name, elapsed, error, timed_out)
+
+
+def _start(spec: ActionSpec, params: dict, trace=None):
+    """Run a validated action on the pool, or raise ValueError if it is saturated."""
+    if not _slots.acquire(blocking=False):
+        raise ValueError(f"Too many actions in progress, dropped '{spec.name}'")
+    try:
+        return _executor.submit(_run, spec, params, trace)
+    except Exception:
+        _slots.release()
+        raise
+
+
+def submit(action_dict: dict):
+    """
+    Validate an action and start it on the action pool.
+
+    Args:
+        action_dict: Dict with keys: action, params, answer
+
+    Returns:
+        Tuple of (ActionSpec, Future), or (None, None) for actions with no
+        handler (e.g. respond). For a "plan" action the Future resolves once
+        every step has finished.
+
+    Raises:
+        ValueError: If params fail validation or the pool is saturated
+    """
+    name = action_dict.get("action", "respond")
+    params = action_dict.get("params", {})
+    if name == "plan":
+        plan = _Plan(params.get("steps") if isinstance(params, dict) else None)
+        return plan.spec, plan.start()
+    spec = _registry.get(name)
+    if spec is None:
+        return None, None
+    return spec, _start(spec, spec.validate(params), tracing.current())
+
+
+def wait(spec: ActionSpec, future):
+    """
+    Wait for a submitted action up to its timeout.
+    On timeout the handler keeps running in the background; only the wait ends.
+
+    Returns:
+        The handler's return value
+
+    Raises:
+        TimeoutError: If the action is still running after spec.timeout
+    """
+    try:
+        return future.result(timeout=spec.timeout)
+    except FutureTimeout:
+        raise TimeoutError(f"Action '{spec.name}' timed out after {spec.timeout}s")
+
+
+def execute(action_dict: dict):
+    """Submit an action and wait for its result (None for actions without a handler)."""
+    spec, future = submit(action_dict)
+    if spec is None:
+        return None
+    return wait(spec, future)
+
+
+# ==================== PLANS ====================
+
+class _Plan:
+    """
+    An ordered list of steps with dependencies, run as one action.
+    Each step is {"id", "action", "params", "after"}, where "after" lists the
+    ids of steps that must finish first. Steps whose dependencies are met
+    are started together; a failed step skips everything that depends on it.
+    """
+
+    def __init__(self, raw_steps):
+        if not isinstance(raw_steps, list) or not raw_steps:
+            raise ValueError("Plan has no steps")
+        if len(raw_steps) > config.PLAN_MAX_STEPS:
+            raise ValueError(f"Plan has {len(raw_steps)} steps, at most {config.PLAN_MAX_STEPS} are allowed")
+        self._order = []
+        self._steps = {}
+        for index, raw in enumerate(raw_steps, 1):
+            if not isinstance(raw, dict):
+                raise ValueError(f"Plan step {index} is not an object")
+            step_id = str(raw.get("id", index))
+            if step_id in self._steps:
+                raise ValueError(f"Duplicate plan step id '{step_id}'")
+            name = raw.get("action", "respond")
+            spec = _registry.get(name)
+            if spec is None and name != "respond":
+                raise ValueError(f"Unknown action '{name}' in plan step '{step_id}'")
+            params = spec.validate(raw.get("params", {})) if spec is not None else {}
+            after = raw.get("after") or []
+            if not isinstance(after, list):
+                after = [after]
+            self._order.append(step_id)
+            self._steps[step_id] = (spec, params, {str(a) for a in after})
+        self._check_dependencies()
+        specs = [spec for spec, _, _ in self._steps.values() if spec is not None]
+        self.spec = ActionSpec(
+            "plan", None, {},
+            timeout=sum(spec.timeout for spec in specs) or config.ACTION_DEFAULT_TIMEOUT,
+            answers=any(spec.answers for spec in specs),
+        )
+        self._lock = threading.Lock()
+        self._pending = dict(self._steps)
+        self._results = {}
+        self._failed = set()
+        self._running = 0
+        self._done = False
+        self._future = Future()
+        self._trace = tracing.current()
+
+    def _check_dependencies(self) -> None:
+        """Reject unknown step ids and cycles, which would never finish."""
+        remaining = {}
+        for step_id, (_, _, after) in self._steps.items():
+            unknown = after - self._steps.keys()
+            if unknown:
+                raise ValueError(f"Plan step '{step_id}' depends on unknown step '{sorted(unknown)[0]}'")
+            remaining[step_id] = set(after)
+        while remaining:
+            ready = [step_id for step_id, after in remaining.items() if not after & remaining.keys()]
+            if not ready:
+                raise ValueError("Plan steps depend on each other in a cycle")
+            for step_id in ready:
+                del remaining[step_id]
+
+    def start(self) -> Future:
+        """Start every step without dependencies and return the plan's Future."""
+        self._advance()
+        return self._future
+
+    def _advance(self) -> None:
+        to_start = []
+        with self._lock:
+            changed = True
+            while changed:
+                changed = False
+                for step_id, (spec, params, after) in list(self._pending.items()):
+                    if after & self._failed:
+                        _log.warning("Plan step '%s' skipped: a step it depends on failed", step_id)
+                        del self._pending[step_id]
+                        self._failed.add(step_id)
+                        changed = True
+                    elif after <= self._results.keys():
+                        del self._pending[step_id]
+                        to_start.append((step_id, spec, params))
+                        self._running += 1
+            finished = not self._pending and not self._running and not self._done
+            if finished:
+                self._done = True
+        for step_id, spec, params in to_start:
+            if spec is None:
+                self._completed(step_id, None, None)
+                continue
+            try:
+                future = _start(spec, params, self._trace)
+            except Exception as e:
+                self._completed(step_id, None, e)
+                continue
+            future.add_done_callback(lambda f, step_id=step_id: self._completed(step_id, f, None))
+        if finished:
+            self._future.set_result(self._answer())
+
+    def _completed(self, step_id: str, future, error) -> None:
+        if future is not None:
+            error = future.exception()
+        with self._lock:
+            self._running -= 1
+            if error is not None:
+                _log.warning("Plan step '%s' failed: %s", step_id, error)
+                self._failed.add(step_id)
+            else:
+                self._results[step_id] = future.result() if future is not None else None
+        self._advance()
+
+    def _answer(self):
+        """Join the results of answering steps, in plan order."""
+        parts = []
+        for step_id in self._order:
+            spec = self._steps[step_id][0]
+            if spec is not None and spec.answers and self._results.get(step_id):
+                parts.append(str(self._results[step_id]))
+        return "\n".join(parts) or None
+
+
+# ==================== HANDLERS ====================
+
+def _show_output(title: str, text: str) -> None:
+    """Show output in the overlay viewer (skipped when headless; the overlay is never imported)."""
+    if not config.HEADLESS:
+        _module("actions.overlay").show_output(title, text)
+
+
+@register("type", {"text": Param(str, required=True)}, timeout=30, serial=True)
+def _type(text: str):
+    _module("actions.typer").type_text(text)
+
+
+@register("delete_chars", {"count": Param(int, required=True)}, serial=True)
+def _delete_chars(count: int):
+    _module("actions.deleter").delete_chars(count)
+
+
+@register("delete_words", {"count": Param(int, required=True)}, serial=True)
+def _delete_words(count: int):
+    _module("actions.deleter").delete_words(count)
+
+
+@register("web_search", {"query": Param(str, required=True)}, timeout=10)
+def _web_search(query: str):
+    result = _module("actions.searcher").web_search(query)
+    _log.info("Search result: %s", result)
+    return result
+
+
+@register("watch_youtube", {"query": Param(str, required=True)}, timeout=15)
+def _watch_youtube(query: str):
+    return _module("actions.youtube").watch_youtube(query)
+
+
+@register("open_app", {"name": Param(str, required=True)}, timeout=5)
+def _open_app(name: str):
+    try:
+        message = _module("actions.app_launcher").launch_app(name)
+        _log.info("%s", message)
+        return message
+    except ValueError as e:
+        _log.warning("Could not open app: %s", e)
+
+
+@register("create_file", {"name": Param(str, required=True), "content": Param(str, default="")})
+def _create_file(name: str, content: str = ""):
+    return _module("actions.file_ops").create_file(name, content)
+
+
+@register("read_file", {
+    "name": Param(str, required=True),
+    "mode": Param(str, default="preview", choices=("preview", "head", "tail", "range", "grep")),
+    "lines": Param(int, default=10),
+    "start": Param(int, default=1),
+    "end": Param(int, default=10),
+    "unit": Param(str, default="lines", choices=("lines", "bytes")),
+    "pattern": Param(str),
+    "regex": Param(bool, default=False),
+})
+def _read_file(name: str, mode: str, lines: int, start: int, end: int, unit: str, regex: bool, pattern: str = ""):
+    file_ops = _module("actions.file_ops")
+    if mode == "head":
+        content = file_ops.head_file(name, lines)
+    elif mode == "tail":
+        content = file_ops.tail_file(name, lines)
+    elif mode == "range":
+        content = file_ops.read_range(name, start, end, unit)
+    elif mode == "grep":
+        content = file_ops.grep_file(name, pattern, regex)
+    else:
+        content = file_ops.read_file(name)
+    _log.debug("File content: %s", content)
+    _show_output(name, content)
+    return content
+
+
+@register("search_files", {"query": Param(str, required=True)}, timeout=5, answers=True)
+def _search_files(query: str):
+    result = _module("actions.fulltext").search_files(query)
+    _log.info("Notes search: %s", result)
+    return result
+
+
+@register("run_command", {"cmd": Param(str, required=True)}, timeout=12)
+def _run_command(cmd: str):
+    output = _module("actions.shell_ops").run_command(cmd)
+    _log.debug("Command output: %s", output)
+    _show_output(f"$ {cmd}", output)
+    return output
+
+
+@register("clipboard_write", {"text": Param(str, required=True)}, timeout=2)
+def _clipboard_write(text: str):
+    _module("pyperclip").copy(text)
+
+
+@register("clipboard_read", timeout=2)
+def _clipboard_read():
+    content = _module("pyperclip").paste()
+    _log.debug("Clipboard: %s", content)
+    _show_output("Clipboard", content)
+    return content
+
+
+@register("system_info", {"metric": Param(str, default="time", choices=("time", "battery", "disk"))}, timeout=2)
+def _system_info(metric: str):
+    if metric == "time":
+        info = _module("datetime").datetime.now().strftime("%H:%M:%S")
+    elif metric == "battery":
+        try:
+            info = f"{_module('psutil').sensors_battery().percent}%"
+        except Exception:
+            info = "Battery info unavailable"
+    else:
+        info = f"{_module('psutil').disk_usage('/').percent}% used"
+    _log.info("System info: %s", info)
+    return info
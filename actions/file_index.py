@@ -0,0 +1,244 @@
+"""
+Workspace File Index Module
+Resolves spoken file names ("my shopping list") to workspace paths
+("lists/shopping_list.txt") using normalized-token and trigram matching.
+The index is kept current by polling directory mtimes, so only directories
+that gained, lost or renamed files are rescanned.
+"""
+
+import heapq
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+import config
+from actions.fuzzy import TrigramIndex, normalize
+
+# Filler words that show up in spoken file names but never in the file name
+_STOPWORDS = frozenset({"a", "an", "the", "my", "our", "file", "called", "named", "document", "please"})
+
+
+def _spoken_tokens(spoken: str) -> tuple:
+    """
+    Split a spoken file name into (normalized stem, tokens, extension).
+    Handles "dot txt" and literal extensions.
+
+    Args:
+        spoken: Spoken or typed name (e.g., "my shopping list dot txt")
+
+    Returns:
+        Tuple of (normalized text, set of tokens, extension or "")
+    """
+    text = spoken.strip().lower().replace(" dot ", ".")
+    ext = ""
+    stem, dot, tail = text.rpartition(".")
+    if dot and stem and tail.isalnum() and len(tail) <= 5:
+        text, ext = stem, tail
+    norm = normalize(text)
+    tokens = {t for t in norm.split() if t not in _STOPWORDS}
+    if tokens:
+        norm = " ".join(t for t in norm.split() if t in tokens)
+    return norm, tokens or set(norm.split()), ext
+
+
+class WorkspaceIndex:
+    """In-memory fuzzy index over every file under a workspace directory."""
+
+    def __init__(self, root: Path, poll_interval: float = 2.0):
+        self.root = Path(root).resolve()
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._last_poll = 0.0
+        self._dir_mtimes = {}
+        self._dir_files = {}
+        self._dir_subdirs = {}
+        self._files = {}
+        self._tokens = {}
+        self._grams = TrigramIndex()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def paths(self) -> list:
+        """Relative paths of every indexed file (as of the last refresh)."""
+        with self._lock:
+            return list(self._files)
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Bring the index up to date with the filesystem.
+        Every directory is stat'ed but only directories whose mtime changed
+        are listed again. Calls within poll_interval of the last poll are
+        free unless force is set.
+
+        Args:
+            force: Poll even if the last poll was recent
+
+        Returns:
+            Number of directories rescanned
+        """
+        now = time.monotonic()
+        if not force and self._dir_mtimes and now - self._last_poll < self.poll_interval:
+            return 0
+        with self._lock:
+            rescanned = 0
+            visited = set()
+            stack = [self.root]
+            while stack:
+                directory = stack.pop()
+                key = str(directory)
+                visited.add(key)
+                try:
+                    mtime = directory.stat().st_mtime_ns
+                except OSError:
+                    continue
+                if self._dir_mtimes.get(key) != mtime:
+                    self._dir_mtimes[key] = mtime
+                    self._rescan_dir(directory)
+                    rescanned += 1
+                stack.extend(self._dir_subdirs.get(key, ()))
+            for key in [k for k in self._dir_mtimes if k not in visited]:
+                self._drop_dir(key)
+                rescanned += 1
+            self._last_poll = time.monotonic()
+        return rescanned
+
+    def _rescan_dir(self, directory: Path) -> None:
+        """List one directory and diff its files against the index."""
+        key = str(directory)
+        files = set()
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.name.startswith("."):
+                        continue
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(Path(item.path))
+                        elif item.is_file():
+                            files.add(os.path.relpath(item.path, self.root))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        old = self._dir_files.get(key, set())
+        for rel in old - files:
+            self._remove_file(rel)
+        for rel in files - old:
+            self._add_file(rel)
+        self._dir_files[key] = files
+        self._dir_subdirs[key] = subdirs
+
+    def _drop_dir(self, key: str) -> None:
+        """Forget a directory that no longer exists."""
+        for rel in self._dir_files.pop(key, ()):
+            self._remove_file(rel)
+        self._dir_mtimes.pop(key, None)
+        self._dir_subdirs.pop(key, None)
+
+    def _add_file(self, rel: str) -> None:
+        name = os.path.basename(rel)
+        stem, dot, ext = name.rpartition(".")
+        if not dot or not stem:
+            stem, ext = name, ""
+        norm = normalize(stem)
+        tokens = frozenset(norm.split())
+        self._files[rel] = (norm, tokens, ext.lower())
+        for token in tokens:
+            self._tokens.setdefault(token, set()).add(rel)
+        self._grams.add(rel, norm)
+
+    def _remove_file(self, rel: str) -> None:
+        entry = self._files.pop(rel, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            bucket = self._tokens.get(token)
+            if bucket is not None:
+                bucket.discard(rel)
+                if not bucket:
+                    del self._tokens[token]
+        self._grams.remove(rel)
+
+    def notify_written(self, path: Path) -> None:
+        """
+        Record a file Jarvis just wrote so it is findable before the next poll.
+
+        Args:
+            path: Absolute path inside the workspace
+        """
+        with self._lock:
+            rel = os.path.relpath(path, self.root)
+            parent = str(Path(path).parent)
+            if rel not in self._files:
+                self._add_file(rel)
+                self._dir_files.setdefault(parent, set()).add(rel)
+
+    def search(self, spoken: str, limit: int = 5) -> list:
+        """
+        Rank workspace files against a spoken name.
+
+        Args:
+            spoken: Spoken or typed file name
+            limit: Maximum number of results
+
+        Returns:
+            List of (score, relative path) tuples, best first. Scores are in [0, 1].
+        """
+        self.refresh()
+        norm, tokens, ext = _spoken_tokens(spoken)
+        if not norm:
+            return []
+        files = self._files
+        scores = {}
+
+        # Whole-token matches are the common case and need no trigram work
+        hits = Counter()
+        for token in tokens:
+            hits.update(self._tokens.get(token, ()))
+        for rel, shared in hits.items():
+            f_norm, f_tokens, f_ext = files[rel]
+            if f_norm == norm:
+                score = 1.0
+            else:
+                score = 0.7 * shared / len(tokens) + 0.3 * shared / max(len(f_tokens), 1)
+            scores[rel] = score
+
+        # Fall back to trigrams for misheard or partial words
+        if not scores or max(scores.values()) < 0.8:
+            for score, rel in self._grams.search(norm, limit=limit * 4):
+                if score > scores.get(rel, 0.0):
+                    scores[rel] = score
+
+        if ext:
+            for rel, score in scores.items():
+                scores[rel] = min(1.0, score + 0.05) if files[rel][2] == ext else score * 0.8
+        # Prefer shallower, shorter paths on ties
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0].count(os.sep), len(item[0])))
+        return [(score, rel) for rel, score in best]
+
+    def resolve(self, spoken: str):
+        """
+        Resolve a spoken name to the best matching workspace path.
+
+        Args:
+            spoken: Spoken or typed file name
+
+        Returns:
+            Absolute Path, or None if nothing scores above config.FILE_INDEX_MIN_SCORE
+        """
+        results = self.search(spoken, limit=1)
+        if results and results[0][0] >= config.FILE_INDEX_MIN_SCORE:
+            return self.root / results[0][1]
+        return None
+
+
+# Global index over the configured workspace, populated on first lookup
+_index = WorkspaceIndex(config.WORKSPACE_DIR, poll_interval=config.FILE_INDEX_POLL_SECONDS)
+
+
+def get_index() -> WorkspaceIndex:
+    """Return the shared workspace index."""
+    return _index
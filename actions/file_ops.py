@@ -2,10 +2,16 @@
 File Operations Action Module
 Create, read, and append files with sandbox validation.
 All operations are restricted to the workspace directory.
+Spoken names are resolved to existing files through the workspace index.
 """
 
+import atexit
 from pathlib import Path
 import config
+import log
+from actions import file_index, file_reader, file_writer, fulltext
+
+_log = log.get_logger("file_ops")
 
 
 def _validate_path(filename: str) -> Path:
@@ -38,13 +44,56 @@ def _validate_path(filename: str) -> Path:
         raise ValueError(f"Invalid path: {e}")
 
 
-def create_file(filename: str, content: str) -> str:
+# Write-behind journal for appends; flushed batches are reindexed for search
+_journal = file_writer.AppendJournal(
+    flush_seconds=config.FILE_APPEND_FLUSH_SECONDS,
+    flush_bytes=config.FILE_APPEND_FLUSH_BYTES,
+    idle_seconds=config.FILE_APPEND_IDLE_SECONDS,
+    durable=config.FILE_DURABLE_WRITES,
+    on_flush=lambda path: fulltext.get_index().update_file(path),
+)
+atexit.register(_journal.close_all)
+
+
+def flush_appends() -> None:
+    """Write any buffered appends to disk now."""
+    _journal.flush()
+
+
+def _resolve_existing(filename: str) -> Path:
+    """
+    Resolve a possibly spoken filename to an existing workspace file.
+    An exact relative path wins; otherwise the workspace index is searched
+    for the closest match ("my shopping list" -> "shopping_list.txt").
+    For reads only: writes must never land on a different file.
+
+    Args:
+        filename: Filename, relative path, or spoken name
+
+    Returns:
+        Validated absolute Path (may not exist if nothing matched)
+
+    Raises:
+        ValueError: If path escapes the workspace directory
+    """
+    path = _validate_path(filename)
+    if path.exists():
+        return path
+    match = file_index.get_index().resolve(filename)
+    # Re-validate: the index joins names without resolving symlinks
+    return _validate_path(match) if match is not None else path
+
+
+def create_file(filename: str, content: str, durable: bool = None) -> str:
     """
     Create a file in the workspace directory with the given content.
+    The write is atomic (temp file + rename), so a crash never leaves a
+    half-written file behind.
     
     Args:
         filename: Filename or relative path within workspace
         content: File content to write
+        durable: fsync before returning (defaults to config.FILE_DURABLE_WRITES)
         
     Returns:
         Confirmation message
@@ -56,44 +105,181 @@ def create_file(filename: str, content: str) -> str:
         path = _validate_path(filename)
         # Create parent directories if needed
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content)
+        # Pending appends belong to the old file and its handle must not outlive the rename
+        _journal.close(path)
+        file_writer.atomic_write(path, content, config.FILE_DURABLE_WRITES if durable is None else durable)
+        file_index.get_index().notify_written(path)
+        fulltext.get_index().update_file(path)
         return f"Created file: {filename}"
     except ValueError as e:
         raise
     except Exception as e:
-        print(f"Error creating file {filename}: {e}")
+        _log.error("Error creating file %s: %s", filename, e)
         raise ValueError(f"Failed to create file: {e}")
 
 
+def _existing_file(filename: str) -> Path:
+    """Resolve filename to an existing regular file or raise ValueError."""
+    path = _resolve_existing(filename)
+    _journal.flush(path)
+    if not path.is_file():
+        raise ValueError(f"File not found: {filename}")
+    return path
+
+
+def _with_note(text: str, truncated: bool, note: str) -> str:
+    """Append a truncation note to text when output was cut short."""
+    return f"{text.rstrip(chr(10))}\n[{note}]" if truncated else text
+
+
 def read_file(filename: str) -> str:
     """
-    Read and return the contents of a file in the workspace.
+    Read a file in the workspace.
+    Files up to config.FILE_PREVIEW_BYTES are returned in full; larger files
+    return a preview of the first config.FILE_PREVIEW_LINES lines so a huge
+    log never gets loaded into memory. Use tail_file, read_range or grep_file
+    for the rest.
     
     Args:
         filename: Filename or relative path within workspace
         
     Returns:
-        File contents as string
+        File contents (or a preview) as string
         
     Raises:
         ValueError: If path is invalid or file doesn't exist
     """
     try:
-        path = _validate_path(filename)
-        if not path.exists():
-            raise ValueError(f"File not found: {filename}")
-        return path.read_text()
+        path = _existing_file(filename)
+        size = path.stat().st_size
+        if size <= config.FILE_PREVIEW_BYTES:
+            return path.read_text(errors="replace")
+        text, truncated = file_reader.head(path, config.FILE_PREVIEW_LINES, config.FILE_PREVIEW_BYTES)
+        return _with_note(text, True, f"preview of {path.name}, {size / 1_048_576:.1f} MB total; ask for the tail, a range, or a search")
+    except ValueError:
+        raise
+    except Exception as e:
+        _log.error("Error reading file %s: %s", filename, e)
+        raise ValueError(f"Failed to read file: {e}")
+
+
+def head_file(filename: str, lines: int = 10) -> str:
+    """
+    Return the first N lines of a workspace file.
+    
+    Args:
+        filename: Filename or relative path within workspace
+        lines: Number of lines
+        
+    Returns:
+        The lines as a string
+        
+    Raises:
+        ValueError: If path is invalid or file doesn't exist
+    """
+    try:
+        text, truncated = file_reader.head(_existing_file(filename), max(int(lines), 1), config.FILE_READ_MAX_BYTES)
+        return _with_note(text, truncated, f"first {lines} lines")
+    except ValueError:
+        raise
+    except Exception as e:
+        _log.error("Error reading file %s: %s", filename, e)
+        raise ValueError(f"Failed to read file: {e}")
+
+
+def tail_file(filename: str, lines: int = 10) -> str:
+    """
+    Return the last N lines of a workspace file.
+    
+    Args:
+        filename: Filename or relative path within workspace
+        lines: Number of lines
+        
+    Returns:
+        The lines as a string
+        
+    Raises:
+        ValueError: If path is invalid or file doesn't exist
+    """
+    try:
+        text, truncated = file_reader.tail(_existing_file(filename), max(int(lines), 1), config.FILE_READ_MAX_BYTES)
+        return _with_note(text, truncated, f"last {lines} lines")
     except ValueError:
         raise
     except Exception as e:
-        print(f"Error reading file {filename}: {e}")
+        _log.error("Error reading file %s: %s", filename, e)
         raise ValueError(f"Failed to read file: {e}")
 
 
+def read_range(filename: str, start: int, end: int, unit: str = "lines") -> str:
+    """
+    Return a line range (1-based, inclusive) or byte range (0-based, end
+    exclusive) of a workspace file.
+    
+    Args:
+        filename: Filename or relative path within workspace
+        start: First line or byte
+        end: Last line (inclusive) or end byte (exclusive)
+        unit: "lines" or "bytes"
+        
+    Returns:
+        The range as a string
+        
+    Raises:
+        ValueError: If path is invalid, file doesn't exist or range is invalid
+    """
+    try:
+        text, truncated = file_reader.read_range(_existing_file(filename), int(start), int(end), unit, config.FILE_READ_MAX_BYTES)
+        return _with_note(text, truncated, f"range truncated to {config.FILE_READ_MAX_BYTES} bytes")
+    except ValueError:
+        raise
+    except Exception as e:
+        _log.error("Error reading file %s: %s", filename, e)
+        raise ValueError(f"Failed to read file: {e}")
+
+
+def grep_file(filename: str, pattern: str, regex: bool = False, context: int = 1) -> str:
+    """
+    Search a workspace file for a substring or regex (case-insensitive) and
+    return matching lines with context. Stops after config.FILE_GREP_MAX_MATCHES.
+    
+    Args:
+        filename: Filename or relative path within workspace
+        pattern: Text or regular expression to find
+        regex: Treat pattern as a regular expression
+        context: Lines of context around each match
+        
+    Returns:
+        Matches formatted as "line N:" blocks, or a no-match message
+        
+    Raises:
+        ValueError: If path is invalid, file doesn't exist or pattern is invalid
+    """
+    try:
+        matches = file_reader.grep(
+            _existing_file(filename), pattern, bool(regex), max(int(context), 0),
+            config.FILE_GREP_MAX_MATCHES, config.FILE_READ_MAX_BYTES
+        )
+        if not matches:
+            return f"No matches for '{pattern}' in {filename}"
+        blocks = [f"line {line_no}:\n{text}" for line_no, text in matches]
+        if len(matches) >= config.FILE_GREP_MAX_MATCHES:
+            blocks.append(f"[stopped after {config.FILE_GREP_MAX_MATCHES} matches]")
+        return "\n--\n".join(blocks)
+    except ValueError:
+        raise
+    except Exception as e:
+        _log.error("Error searching file %s: %s", filename, e)
+        raise ValueError(f"Failed to search file: {e}")
+
+
 def append_file(filename: str, content: str) -> str:
     """
-    Append content to an existing file in the workspace.
-    Creates the file if it doesn't exist.
+    Append content to a file in the workspace, by its exact name (no fuzzy
+    matching, so "new notes.txt" never lands in "notes.txt").
+    Creates the file if it doesn't exist. Writes are buffered and flushed
+    in batches (see config.FILE_APPEND_FLUSH_SECONDS); reads through this
+    module always see pending appends.
     
     Args:
         filename: Filename or relative path within workspace
@@ -108,12 +294,15 @@ def append_file(filename: str, content: str) -> str:
     try:
         path = _validate_path(filename)
         path.parent.mkdir(parents=True, exist_ok=True)
-        # Append to file (or create if doesn't exist)
-        with path.open("a") as f:
-            f.write(content)
-        return f"Appended to file: {filename}"
+        # Queue the append; the journal creates the file on first flush
+        new_file = not path.exists()
+        _journal.append(path, content)
+        if new_file:
+            _journal.flush(path)
+        file_index.get_index().notify_written(path)
+        return f"Appended to file: {path.name}"
     except ValueError:
         raise
     except Exception as e:
-        print(f"Error appending to file {filename}: {e}")
+        _log.error("Error appending to file %s: %s", filename, e)
         raise ValueError(f"Failed to append to file: {e}")
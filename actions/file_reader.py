@@ -0,0 +1,203 @@
+"""
+File Reader Module
+Bounded-memory reads of large workspace files backed by mmap.
+Every function stops as soon as it has enough data and caps the amount of
+text it returns, so a 200 MB log costs no more than a 2 KB note.
+"""
+
+import mmap
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def _mapped(path: Path):
+    """
+    Memory-map a file read-only.
+    Yields an empty bytes object for empty files (which cannot be mapped).
+    """
+    with path.open("rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+def _line_offset(mm, line: int) -> int:
+    """
+    Byte offset where 1-based line number `line` starts, or len(mm) if the
+    file has fewer lines. Scans forward only as far as needed.
+    """
+    pos = 0
+    size = len(mm)
+    for _ in range(line - 1):
+        nl = mm.find(b"\n", pos)
+        if nl < 0:
+            return size
+        pos = nl + 1
+    return pos
+
+
+def _count_newlines(mm, lo: int, hi: int, chunk: int = 1 << 20) -> int:
+    """Count newlines in mm[lo:hi] without copying more than one chunk at a time."""
+    total = 0
+    while lo < hi:
+        step = min(hi, lo + chunk)
+        total += mm[lo:step].count(b"\n")
+        lo = step
+    return total
+
+
+def head(path: Path, lines: int, max_bytes: int) -> tuple:
+    """
+    Return the first N lines of a file.
+
+    Args:
+        path: File to read
+        lines: Number of lines
+        max_bytes: Cap on returned bytes
+
+    Returns:
+        Tuple of (text, truncated)
+    """
+    with _mapped(path) as mm:
+        end = _line_offset(mm, lines + 1)
+        return _decode(mm[:min(end, max_bytes)]), end > max_bytes or end < len(mm)
+
+
+def tail(path: Path, lines: int, max_bytes: int) -> tuple:
+    """
+    Return the last N lines of a file, scanning backwards from the end.
+
+    Args:
+        path: File to read
+        lines: Number of lines
+        max_bytes: Cap on returned bytes
+
+    Returns:
+        Tuple of (text, truncated)
+    """
+    with _mapped(path) as mm:
+        size = len(mm)
+        end = size
+        # A trailing newline terminates the last line rather than starting a new one
+        if size and mm[size - 1:size] == b"\n":
+            end -= 1
+        pos = end
+        for _ in range(lines):
+            pos = mm.rfind(b"\n", 0, pos)
+            if pos < 0:
+                break
+        start = pos + 1
+        start = max(start, size - max_bytes)
+        return _decode(mm[start:size]), start > 0
+
+
+def read_range(path: Path, start: int, end: int, unit: str, max_bytes: int) -> tuple:
+    """
+    Return a byte or line range of a file.
+
+    Args:
+        path: File to read
+        start: First byte offset (0-based) or line number (1-based), inclusive
+        end: Last byte offset (exclusive) or line number (inclusive)
+        unit: "bytes" or "lines"
+        max_bytes: Cap on returned bytes
+
+    Returns:
+        Tuple of (text, truncated)
+
+    Raises:
+        ValueError: If unit is unknown or the range is empty
+    """
+    if unit not in ("bytes", "lines"):
+        raise ValueError(f"Unknown range unit '{unit}' (use bytes or lines)")
+    if end < start:
+        raise ValueError(f"Invalid range {start}-{end}")
+    with _mapped(path) as mm:
+        if unit == "bytes":
+            lo, hi = max(start, 0), min(end, len(mm))
+        else:
+            lo = _line_offset(mm, max(start, 1))
+            hi = lo
+            size = len(mm)
+            for _ in range(end - max(start, 1) + 1):
+                nl = mm.find(b"\n", hi)
+                if nl < 0:
+                    hi = size
+                    break
+                hi = nl + 1
+                if hi - lo > max_bytes:
+                    break
+        return _decode(mm[lo:min(hi, lo + max_bytes)]), hi - lo > max_bytes
+
+
+def grep(path: Path, pattern: str, regex: bool, context: int, max_matches: int, max_bytes: int) -> list:
+    """
+    Find lines containing a substring or regex match, with surrounding context.
+    Scanning stops after max_matches matching lines.
+
+    Args:
+        path: File to search
+        pattern: Substring or regular expression (case-insensitive)
+        regex: Treat pattern as a regular expression
+        context: Lines of context before and after each match
+        max_matches: Stop after this many matching lines
+        max_bytes: Cap on total returned bytes
+
+    Returns:
+        List of (line_number, text) tuples; text includes the context lines
+
+    Raises:
+        ValueError: If the regular expression is invalid
+    """
+    needle = pattern.encode("utf-8")
+    try:
+        compiled = re.compile(needle if regex else re.escape(needle), re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern: {e}")
+    results = []
+    budget = max_bytes
+    with _mapped(path) as mm:
+        size = len(mm)
+        pos = 0
+        line_no = 1
+        counted_to = 0
+        while pos < size and len(results) < max_matches and budget > 0:
+            m = compiled.search(mm, pos)
+            if m is None:
+                break
+            hit = m.start()
+            line_start = mm.rfind(b"\n", 0, hit) + 1
+            line_end = mm.find(b"\n", hit)
+            line_end = size if line_end < 0 else line_end
+            # Count newlines incrementally so line numbers stay O(file) overall
+            line_no += _count_newlines(mm, counted_to, line_start)
+            counted_to = line_start
+
+            lo = line_start
+            for _ in range(context):
+                if lo == 0:
+                    break
+                lo = mm.rfind(b"\n", 0, lo - 1) + 1
+            hi = line_end
+            for _ in range(context):
+                if hi >= size:
+                    break
+                nxt = mm.find(b"\n", hi + 1)
+                hi = size if nxt < 0 else nxt
+            data = mm[lo:min(hi, lo + budget)]
+            budget -= len(data)
+            results.append((line_no, _decode(data)))
+            pos = line_end + 1
+    return results
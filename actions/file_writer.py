@@ -0,0 +1,237 @@
+"""
+File Writer Module
+Atomic whole-file writes and a buffered write-behind journal for appends.
+Dictating a long note as a stream of appends keeps one handle open per file
+and batches the writes, instead of an open/write/close cycle per phrase.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+import log
+
+_log = log.get_logger("file_writer")
+
+# Read once at import (os.umask can only be read by setting it); new files get 0666 & ~umask like open()
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist a rename by fsyncing the containing directory (POSIX only)."""
+    if os.name != "posix":
+        return
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, content: str, durable: bool) -> None:
+    """
+    Replace a file's contents atomically.
+    Content goes to a temp file in the same directory which is then renamed
+    over the target, so readers see either the old or the new file, never a
+    torn one. The replaced file keeps its permission bits; a new file gets
+    the mode open() would have given it.
+
+    Args:
+        path: Destination file
+        content: Text to write (UTF-8)
+        durable: fsync the data and the directory before returning
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        # mkstemp creates 0600; keep the mode of the file being replaced
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_name, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    if durable:
+        _fsync_dir(path.parent)
+
+
+class AppendJournal:
+    """
+    Write-behind buffer for appends.
+    Appends are queued in memory per file and written in one batch when the
+    buffer reaches flush_bytes or has been pending for flush_seconds. File
+    handles stay open between batches and are closed after idle_seconds.
+    """
+
+    def __init__(self, flush_seconds: float = 1.0, flush_bytes: int = 64 * 1024,
+                 idle_seconds: float = 30.0, durable: bool = False, on_flush=None):
+        self.flush_seconds = flush_seconds
+        self.flush_bytes = flush_bytes
+        self.idle_seconds = idle_seconds
+        self.durable = durable
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_bytes = {}
+        self._first_pending = {}
+        self._handles = {}
+        self._last_used = {}
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def append(self, path: Path, text: str) -> None:
+        """
+        Queue text to be appended to path.
+        Flushes synchronously if the file's buffer is over flush_bytes.
+
+        Args:
+            path: Absolute file path
+            text: Text to append
+        """
+        key = str(path)
+        flushed = False
+        with self._lock:
+            self._pending.setdefault(key, []).append(text)
+            size = self._pending_bytes.get(key, 0) + len(text)
+            self._pending_bytes[key] = size
+            self._first_pending.setdefault(key, time.monotonic())
+            if size >= self.flush_bytes:
+                self._flush_locked(key)
+                flushed = True
+        if flushed:
+            self._notify(key)
+        else:
+            self._wakeup.set()
+
+    def flush(self, path: Path = None) -> None:
+        """
+        Write pending appends now.
+
+        Args:
+            path: File to flush, or None for every file
+        """
+        with self._lock:
+            keys = [str(path)] if path is not None else list(self._pending)
+            flushed = [key for key in keys if key in self._pending]
+            for key in flushed:
+                self._flush_locked(key)
+        for key in flushed:
+            self._notify(key)
+
+    def close(self, path: Path) -> None:
+        """Flush and close the handle for one file (e.g., before it is replaced)."""
+        self.flush(path)
+        with self._lock:
+            handle = self._handles.pop(str(path), None)
+            self._last_used.pop(str(path), None)
+        if handle:
+            handle.close()
+
+    def close_all(self) -> None:
+        """Flush everything and close all handles."""
+        self.flush()
+        with self._lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+            self._last_used.clear()
+        for handle in handles:
+            try:
+                handle.close()
+            except OSError:
+                pass
+
+    def _flush_locked(self, key: str) -> None:
+        """
+        Write one file's buffer (caller holds the lock). The buffer is only
+        dropped once the write succeeded; on OSError it stays queued and is
+        retried after flush_seconds.
+        """
+        chunks = self._pending.get(key)
+        if not chunks:
+            self._pending.pop(key, None)
+            self._pending_bytes.pop(key, None)
+            self._first_pending.pop(key, None)
+            return
+        handle = self._handles.get(key)
+        try:
+            if handle is None:
+                handle = open(key, "a", encoding="utf-8")
+                self._handles[key] = handle
+            handle.write("".join(chunks))
+            handle.flush()
+            if self.durable:
+                os.fsync(handle.fileno())
+        except OSError:
+            # Reopen next time; a failed handle may be unusable
+            if self._handles.pop(key, None) is not None:
+                self._last_used.pop(key, None)
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+            self._first_pending[key] = time.monotonic()
+            raise
+        del self._pending[key]
+        self._pending_bytes.pop(key, None)
+        self._first_pending.pop(key, None)
+        self._last_used[key] = time.monotonic()
+
+    def _notify(self, key: str) -> None:
+        if self.on_flush is None:
+            return
+        try:
+            self.on_flush(Path(key))
+        except Exception as e:
+            _log.warning("Append flush callback error: %s", e)
+
+    def _next_timeout(self) -> float:
+        """Seconds until the oldest pending buffer is due or a handle may go idle."""
+        now = time.monotonic()
+        with self._lock:
+            timeout = self.idle_seconds if self._handles else None
+            if self._first_pending:
+                due = min(self._first_pending.values()) + self.flush_seconds - now
+                timeout = due if timeout is None else min(timeout, due)
+        return None if timeout is None else max(timeout, 0.0)
+
+    def _run(self) -> None:
+        """Background loop: flush aged buffers and close idle handles."""
+        while True:
+            self._wakeup.wait(self._next_timeout())
+            self._wakeup.clear()
+            now = time.monotonic()
+            flushed = []
+            idle = []
+            with self._lock:
+                for key, since in list(self._first_pending.items()):
+                    if now - since >= self.flush_seconds:
+                        try:
+                            self._flush_locked(key)
+                            flushed.append(key)
+                        except OSError as e:
+                            _log.error("Error flushing appends to %s: %s", key, e)
+                for key, used in list(self._last_used.items()):
+                    if now - used >= self.idle_seconds and key not in self._pending:
+                        idle.append(self._handles.pop(key))
+                        del self._last_used[key]
+            for handle in idle:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+            for key in flushed:
+                self._notify(key)
@@ -0,0 +1,232 @@
+"""
+Full-Text Search Action Module
+Offline "search my notes" over the workspace using SQLite FTS5.
+The index lives outside the workspace, is updated incrementally when Jarvis
+writes a file, and is re-synced against file mtimes in the background.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import config
+import log
+from actions import file_index
+
+_log = log.get_logger("fulltext")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    name, body, tokenize = 'porter unicode61'
+);
+"""
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class FullTextIndex:
+    """SQLite FTS5 index over the text files of a workspace."""
+
+    def __init__(self, db_path: Path, root: Path, sync_interval: float = 2.0):
+        self.db_path = Path(db_path)
+        self.root = Path(root).resolve()
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._last_sync = 0.0
+        self._sync_thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (callers hold self._lock)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _has_documents(self) -> bool:
+        """True if the on-disk index already holds documents from an earlier run."""
+        with self._lock:
+            return self._connect().execute("SELECT 1 FROM docs LIMIT 1").fetchone() is not None
+
+    def _indexable(self, rel: str) -> bool:
+        return os.path.splitext(rel)[1].lower() in config.FULLTEXT_EXTENSIONS
+
+    def _upsert(self, conn: sqlite3.Connection, rel: str, stat: os.stat_result) -> None:
+        """(Re)index one file. Only the first FULLTEXT_MAX_FILE_BYTES are indexed."""
+        try:
+            with (self.root / rel).open("rb") as f:
+                body = f.read(config.FULLTEXT_MAX_FILE_BYTES).decode("utf-8", errors="replace")
+        except OSError:
+            return
+        row = conn.execute("SELECT id FROM docs WHERE path = ?", (rel,)).fetchone()
+        if row:
+            conn.execute("UPDATE docs SET mtime_ns = ?, size = ? WHERE id = ?", (stat.st_mtime_ns, stat.st_size, row[0]))
+            conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (row[0],))
+            doc_id = row[0]
+        else:
+            doc_id = conn.execute(
+                "INSERT INTO docs (path, mtime_ns, size) VALUES (?, ?, ?)",
+                (rel, stat.st_mtime_ns, stat.st_size)
+            ).lastrowid
+        name = os.path.splitext(os.path.basename(rel))[0].replace("_", " ").replace("-", " ")
+        conn.execute("INSERT INTO docs_fts (rowid, name, body) VALUES (?, ?, ?)", (doc_id, name, body))
+
+    def _delete(self, conn: sqlite3.Connection, rel: str) -> None:
+        row = conn.execute("SELECT id FROM docs WHERE path = ?", (rel,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (row[0],))
+            conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Reconcile the index with the workspace.
+        The file list comes from the workspace file index; only files whose
+        mtime or size changed are re-read. Calls within sync_interval of the
+        last sync are free unless force is set.
+
+        Args:
+            force: Sync even if the last sync was recent
+
+        Returns:
+            Number of files added, updated or removed
+        """
+        if not force and self._last_sync and time.monotonic() - self._last_sync < self.sync_interval:
+            return 0
+        ws = file_index.get_index()
+        ws.refresh(force=force)
+        current = [rel for rel in ws.paths() if self._indexable(rel)]
+        with self._lock:
+            conn = self._connect()
+            known = {path: (mtime, size) for path, mtime, size in conn.execute("SELECT path, mtime_ns, size FROM docs")}
+
+        # Stat outside the lock so searches are never queued behind this pass
+        stale = []
+        for rel in current:
+            try:
+                st = (self.root / rel).stat()
+            except OSError:
+                continue
+            if known.pop(rel, None) != (st.st_mtime_ns, st.st_size):
+                stale.append((rel, st))
+
+        with self._lock:
+            with conn:
+                for rel, st in stale:
+                    self._upsert(conn, rel, st)
+                for rel in known:
+                    self._delete(conn, rel)
+            self._last_sync = time.monotonic()
+        return len(stale) + len(known)
+
+    def sync_in_background(self) -> None:
+        """
+        Start a sync on a daemon thread unless one is running or the last
+        sync is recent. Searches use this so they never wait on a full
+        workspace stat pass once the index has been built.
+        """
+        if self._sync_thread and self._sync_thread.is_alive():
+            return
+        if time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        self._sync_thread = threading.Thread(target=self._safe_sync, daemon=True)
+        self._sync_thread.start()
+
+    def _safe_sync(self) -> None:
+        try:
+            self.sync(force=True)
+        except Exception as e:
+            _log.error("Full-text sync error: %s", e)
+
+    def update_file(self, path: Path) -> None:
+        """
+        Reindex a single file right after Jarvis wrote it.
+
+        Args:
+            path: Absolute path inside the workspace
+        """
+        rel = os.path.relpath(path, self.root)
+        if not self._indexable(rel):
+            return
+        try:
+            st = Path(path).stat()
+        except OSError:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._upsert(conn, rel, st)
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """
+        Rank workspace files against a free-text query.
+        All words must match (prefix matching); if nothing does, any word may.
+        The first search builds the index; later ones query it immediately
+        and refresh it in the background.
+
+        Args:
+            query: Spoken or typed search text
+            limit: Maximum number of results
+
+        Returns:
+            List of (relative path, snippet) tuples, best first
+        """
+        if not self._last_sync and not self._has_documents():
+            self.sync(force=True)
+        else:
+            self.sync_in_background()
+        words = _WORD_RE.findall(query.lower())
+        if not words:
+            return []
+        terms = [f'"{w}"*' for w in words]
+        with self._lock:
+            conn = self._connect()
+            for joiner in (" AND ", " OR "):
+                rows = conn.execute(
+                    "SELECT d.path, snippet(docs_fts, 1, '[', ']', '...', 12) "
+                    "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+                    "WHERE docs_fts MATCH ? ORDER BY bm25(docs_fts, 4.0, 1.0) LIMIT ?",
+                    (joiner.join(terms), limit)
+                ).fetchall()
+                if rows or len(terms) == 1:
+                    return rows
+        return []
+
+
+_index = FullTextIndex(config.FULLTEXT_DB_PATH, config.WORKSPACE_DIR, sync_interval=config.FILE_INDEX_POLL_SECONDS)
+
+
+def get_index() -> FullTextIndex:
+    """Return the shared full-text index."""
+    return _index
+
+
+def search_files(query: str) -> str:
+    """
+    Search workspace files and summarize the best matches.
+
+    Args:
+        query: What to look for (e.g., "dentist appointment")
+
+    Returns:
+        Human-readable list of matching files with snippets
+    """
+    try:
+        results = _index.search(query, limit=config.FULLTEXT_MAX_RESULTS)
+    except sqlite3.Error as e:
+        _log.error("Error searching files: %s", e)
+        return f"Search failed: {e}"
+    if not results:
+        return f"No notes mention '{query}'"
+    return "\n".join(f"{path}: {' '.join(snippet.split())}" for path, snippet in results)
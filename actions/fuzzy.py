@@ -0,0 +1,123 @@
+"""
+Fuzzy Matching Helpers
+Name normalization and an incremental trigram index shared by the
+application launcher and the workspace file index.
+"""
+
+import re
+from collections import Counter
+from itertools import chain
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+# Split camelCase / digit boundaries before lowercasing ("myNotes2" -> "my notes 2")
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])")
+
+
+def normalize(text: str, suffixes=()) -> str:
+    """
+    Normalize a name for matching.
+    Splits camelCase, lowercases, replaces separators with single spaces and
+    drops any of the given suffixes.
+
+    Args:
+        text: Raw name (e.g., "Shopping_List.txt")
+        suffixes: Lowercase suffixes to strip (e.g., (".desktop", ".app"))
+
+    Returns:
+        Normalized name (e.g., "shopping list")
+    """
+    text = _CAMEL_RE.sub(" ", text).lower()
+    for suffix in suffixes:
+        if text.endswith(suffix):
+            text = text[: -len(suffix)]
+            break
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def trigrams(text: str) -> set:
+    """
+    Build the set of character trigrams for a normalized string.
+    The string is padded so short names still produce trigrams.
+
+    Args:
+        text: Normalized text
+
+    Returns:
+        Set of 3-character strings
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index from normalized strings to arbitrary keys.
+    Supports incremental add/remove so callers can keep it in sync with a
+    changing collection instead of rebuilding it.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._grams = {}
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def __contains__(self, key) -> bool:
+        return key in self._grams
+
+    def add(self, key, text: str) -> None:
+        """Index key under the normalized text (replacing any previous text)."""
+        if key in self._grams:
+            self.remove(key)
+        grams = trigrams(text)
+        self._grams[key] = grams
+        postings = self._postings
+        for gram in grams:
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = {key}
+            else:
+                bucket.add(key)
+
+    def remove(self, key) -> None:
+        """Drop key from the index. Unknown keys are ignored."""
+        grams = self._grams.pop(key, None)
+        if not grams:
+            return
+        postings = self._postings
+        for gram in grams:
+            bucket = postings.get(gram)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del postings[gram]
+
+    def search(self, text: str, limit: int = 5, candidates=None) -> list:
+        """
+        Rank indexed keys by trigram similarity to text.
+
+        Args:
+            text: Normalized query text
+            limit: Maximum number of results (None for all)
+            candidates: Optional iterable of keys to restrict scoring to
+
+        Returns:
+            List of (score, key) tuples, best first. Scores are Dice
+            coefficients in [0, 1].
+        """
+        query_grams = trigrams(text)
+        postings = self._postings
+        key_grams = self._grams
+        if candidates is not None:
+            scored = []
+            for key in candidates:
+                grams = key_grams.get(key)
+                if grams:
+                    scored.append((2.0 * len(query_grams & grams) / (len(query_grams) + len(grams)), key))
+        else:
+            overlap = Counter(chain.from_iterable(postings.get(gram, ()) for gram in query_grams))
+            n_query = len(query_grams)
+            scored = [(2.0 * shared / (n_query + len(key_grams[key])), key) for key, shared in overlap.items()]
+        scored.sort(key=lambda item: -item[0])
+        return scored[:limit]
@@ -2,13 +2,263 @@
 Overlay Display Module
 Shows answers in a small, non-blocking tkinter overlay window.
 Auto-dismisses after configurable duration.
+The Tk thread sleeps until a message is enqueued (no polling); one window is
+reused for every message and bursts collapse to the latest text.
+Large outputs (file contents, command output) go to a scrollable viewer that
+only renders the lines currently on screen.
 """
 
+import re
 import tkinter as tk
 import threading
 import queue
 import time
+from array import array
+from bisect import bisect_right
 import config
+import log
+import metrics
+import tracing
+
+_log = log.get_logger("overlay")
+
+# Virtual event the producer side fires to wake the Tk loop
+_WAKE_EVENT = "<<JarvisOverlayMessage>>"
+
+MESSAGES = metrics.counter("jarvis_overlay_messages_total", "Messages posted to the overlay")
+COALESCED = metrics.counter("jarvis_overlay_coalesced_total", "Overlay messages replaced by a newer one before being drawn")
+WAKEUPS = metrics.counter("jarvis_overlay_wakeups_total", "Times the Tk loop woke to drain the overlay queue")
+DISPLAY_SECONDS = metrics.histogram(
+    "jarvis_overlay_display_seconds", "Time from posting an overlay message to drawing it", metrics.LATENCY_BUCKETS,
+)
+
+
+class LineIndex:
+    """
+    Line-offset index over a large string.
+    Lines are sliced out on demand, so only what is displayed is ever copied.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        offsets = array("Q", [0])
+        find = text.find
+        pos = find("\n")
+        while pos >= 0:
+            offsets.append(pos + 1)
+            pos = find("\n", pos + 1)
+        # A trailing newline ends the last line rather than starting an empty one
+        if len(offsets) > 1 and offsets[-1] == len(text):
+            offsets.pop()
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def line(self, i: int, max_chars: int = None) -> str:
+        """Return line i (0-based) without its line break, optionally truncated."""
+        start = self._offsets[i]
+        end = self._offsets[i + 1] - 1 if i + 1 < len(self._offsets) else len(self.text)
+        if max_chars is not None and end - start > max_chars:
+            return self.text[start:start + max_chars] + " …"
+        return self.text[start:end].rstrip("\r\n")
+
+    def line_of(self, offset: int) -> int:
+        """Line number containing a character offset."""
+        return bisect_right(self._offsets, offset) - 1
+
+    def find(self, query: str, start_line: int, backwards: bool = False):
+        """
+        Find the next (or previous) line containing query, case-insensitively,
+        wrapping around the end.
+
+        Returns:
+            Line number, or None if query does not occur
+        """
+        if not query:
+            return None
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        if backwards:
+            limit = self._offsets[start_line]
+            last = None
+            for m in pattern.finditer(self.text, 0, limit):
+                last = m.start()
+            if last is None:
+                for m in pattern.finditer(self.text, limit):
+                    last = m.start()
+            return None if last is None else self.line_of(last)
+        begin = self._offsets[start_line + 1] if start_line + 1 < len(self._offsets) else len(self.text)
+        m = pattern.search(self.text, begin) or pattern.search(self.text, 0, begin)
+        return None if m is None else self.line_of(m.start())
+
+
+class OutputViewer:
+    """
+    Scrollable overlay for large text, rendering only the visible lines.
+    Keys: Up/Down, PageUp/PageDown, Home/End, "/" to search, Enter/n next
+    match, N previous match, Escape to close. Auto-dismiss is paused while
+    the pointer is over the window and restarts after each interaction.
+    """
+
+    def __init__(self, root: tk.Tk):
+        self.root = root
+        self.index = LineIndex("")
+        self.top = 0
+        self.query = ""
+        self._dismiss_id = None
+        self._hovered = False
+
+        win = tk.Toplevel(root)
+        win.withdraw()
+        win.overrideredirect(True)
+        win.attributes("-topmost", True)
+        win.configure(bg="#1e1e1e")
+        self.window = win
+
+        self.title = tk.Label(win, bg="#1e1e1e", fg="#9cdcfe", font=("Segoe UI", 9, "bold"), anchor="w", padx=8)
+        self.title.pack(fill=tk.X)
+        self.body = tk.Text(
+            win, height=config.OVERLAY_VIEWER_LINES, width=config.OVERLAY_VIEWER_COLUMNS,
+            bg="#1e1e1e", fg="white", font=("Consolas", 9), wrap=tk.NONE,
+            borderwidth=0, padx=8, pady=4, cursor="arrow",
+        )
+        self.body.tag_configure("match", background="#515c6a")
+        self.body.pack(fill=tk.BOTH, expand=True)
+        self.search_entry = tk.Entry(win, bg="#2d2d2d", fg="white", insertbackground="white", borderwidth=0)
+        self.status = tk.Label(win, bg="#1e1e1e", fg="#808080", font=("Segoe UI", 8), anchor="w", padx=8)
+        self.status.pack(fill=tk.X)
+
+        for widget in (win, self.body):
+            widget.bind("<MouseWheel>", self._on_wheel)
+            widget.bind("<Button-4>", lambda e: self.scroll(-3))
+            widget.bind("<Button-5>", lambda e: self.scroll(3))
+        win.bind("<Enter>", self._on_enter)
+        win.bind("<Leave>", self._on_leave)
+        win.bind("<Button-1>", lambda e: self.body.focus_force())
+        self.body.bind("<Key>", self._on_key)
+        self.search_entry.bind("<Return>", self._on_search_submit)
+        self.search_entry.bind("<Escape>", lambda e: self._close_search())
+
+    @property
+    def visible_lines(self) -> int:
+        return config.OVERLAY_VIEWER_LINES
+
+    def show(self, title: str, text: str):
+        """Replace the viewer content and bring it up under the answer overlay."""
+        self.index = LineIndex(text)
+        self.top = 0
+        self.query = ""
+        self.title.config(text=f"{title}  ({len(self.index):,} lines)")
+        self.render()
+        win = self.window
+        win.update_idletasks()
+        x = win.winfo_screenwidth() - win.winfo_reqwidth() - 10
+        win.geometry(f"+{x}+80")
+        win.deiconify()
+        win.lift()
+        self._touch()
+
+    def render(self):
+        """Draw the lines in [top, top + visible_lines) and nothing else."""
+        body = self.body
+        body.config(state=tk.NORMAL)
+        body.delete("1.0", tk.END)
+        end = min(self.top + self.visible_lines, len(self.index))
+        lines = [self.index.line(i, config.OVERLAY_VIEWER_MAX_LINE_CHARS) for i in range(self.top, end)]
+        body.insert("1.0", "\n".join(lines))
+        if self.query:
+            pattern = re.compile(re.escape(self.query), re.IGNORECASE)
+            for row, line in enumerate(lines, start=1):
+                for m in pattern.finditer(line):
+                    body.tag_add("match", f"{row}.{m.start()}", f"{row}.{m.end()}")
+        body.config(state=tk.DISABLED)
+        total = len(self.index)
+        hint = f"  /{self.query}" if self.query else "  / to search, Esc to close"
+        self.status.config(text=f"lines {self.top + 1 if total else 0}-{end} of {total:,}{hint}")
+
+    def scroll(self, delta: int):
+        max_top = max(len(self.index) - self.visible_lines, 0)
+        top = min(max(self.top + delta, 0), max_top)
+        if top != self.top:
+            self.top = top
+            self.render()
+        self._touch()
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120, macOS small integers
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-3 * (step or (1 if event.delta > 0 else -1)))
+
+    def _on_key(self, event):
+        page = self.visible_lines - 1
+        moves = {"Up": -1, "Down": 1, "Prior": -page, "Next": page}
+        if event.keysym in moves:
+            self.scroll(moves[event.keysym])
+        elif event.keysym == "Home":
+            self.scroll(-len(self.index))
+        elif event.keysym == "End":
+            self.scroll(len(self.index))
+        elif event.keysym == "Escape":
+            self.hide()
+        elif event.char == "/":
+            self._open_search()
+        elif event.keysym in ("Return", "n"):
+            self._jump(backwards=False)
+        elif event.keysym == "N":
+            self._jump(backwards=True)
+        return "break"
+
+    def _open_search(self):
+        self.search_entry.delete(0, tk.END)
+        self.search_entry.pack(fill=tk.X, before=self.status)
+        self.search_entry.focus_force()
+        self._touch()
+
+    def _close_search(self):
+        self.search_entry.pack_forget()
+        self.body.focus_force()
+
+    def _on_search_submit(self, event=None):
+        self.query = self.search_entry.get()
+        self._close_search()
+        self._jump(backwards=False, from_line=self.top - 1)
+
+    def _jump(self, backwards: bool, from_line: int = None):
+        if not self.query:
+            return
+        start = self.top if from_line is None else from_line
+        line = self.index.find(self.query, max(start, 0 if backwards else -1), backwards)
+        if line is None:
+            self.status.config(text=f"'{self.query}' not found")
+        else:
+            self.top = max(min(line, len(self.index) - 1), 0)
+            self.render()
+        self._touch()
+
+    def _on_enter(self, event=None):
+        self._hovered = True
+        self._cancel_dismiss()
+
+    def _on_leave(self, event=None):
+        self._hovered = False
+        self._touch()
+
+    def _touch(self):
+        """Restart the dismiss timer (never runs while the pointer is over the window)."""
+        self._cancel_dismiss()
+        if not self._hovered:
+            self._dismiss_id = self.window.after(int(config.OVERLAY_VIEWER_DURATION * 1000), self.hide)
+
+    def _cancel_dismiss(self):
+        if self._dismiss_id is not None:
+            self.window.after_cancel(self._dismiss_id)
+            self._dismiss_id = None
+
+    def hide(self):
+        self._cancel_dismiss()
+        self.window.withdraw()
+        # Release the (possibly multi-megabyte) content while hidden
+        self.index = LineIndex("")
 
 
 class TkOverlayThread(threading.Thread):
@@ -19,77 +269,184 @@ class TkOverlayThread(threading.Thread):
         self.queue = queue.Queue()
         self.root = None
         self.running = True
+        self._ready = threading.Event()
+        self._window = None
+        self._label = None
+        self._dismiss_id = None
+        self._viewer = None
 
     def run(self):
         try:
             self.root = tk.Tk()
             self.root.withdraw()
-            # Start polling loop
-            self._poll_queue()
+            self._build_window()
+            self._viewer = OutputViewer(self.root)
+            self.root.bind(_WAKE_EVENT, self._on_wake)
+            self._ready.set()
+            # Show anything enqueued before the loop was up
+            self._on_wake()
             self.root.mainloop()
         except Exception as e:
-            print(f"Overlay thread error: {e}")
+            _log.error("Overlay thread error: %s", e)
+        finally:
+            self._ready.set()
 
-    def _poll_queue(self):
+    def _build_window(self):
+        """Create the single overlay window, hidden until the first message."""
+        win = tk.Toplevel(self.root)
+        win.withdraw()
+        win.overrideredirect(True)
+        win.attributes("-topmost", True)
         try:
-            while not self.queue.empty():
-                text = self.queue.get_nowait()
-                self._show_text(text)
-        except Exception as e:
-            print(f"Overlay poll error: {e}")
-        finally:
-            # Schedule next poll
-            if self.root:
-                self.root.after(200, self._poll_queue)
+            win.attributes("-noactivate", True)
+        except Exception:
+            pass
+
+        label = tk.Label(
+            win,
+            text="",
+            bg="#1e1e1e",
+            fg="white",
+            font=("Segoe UI", 10),
+            wraplength=350,
+            padx=10,
+            pady=8,
+            justify=tk.LEFT,
+        )
+        label.pack()
+        self._window = win
+        self._label = label
 
-    def _show_text(self, text: str):
+    def post(self, kind: str, payload):
+        """
+        Queue a message and wake the Tk loop (safe from any thread).
+
+        Args:
+            kind: "answer" (payload is the text) or "output" (payload is (title, text))
+            payload: Message content
+        """
+        MESSAGES.inc()
+        self.queue.put((kind, payload, time.perf_counter(), tracing.current()))
+        self.notify()
+
+    def notify(self):
+        """Wake the Tk loop from any thread."""
+        if not self._ready.is_set() or self.root is None:
+            return
         try:
-            # Create a transient Toplevel window for the overlay
-            win = tk.Toplevel(self.root)
-            win.overrideredirect(True)
-            win.attributes("-topmost", True)
+            self.root.event_generate(_WAKE_EVENT, when="tail")
+        except Exception:
+            # Non-threaded Tcl builds refuse cross-thread calls; fall back to a one-shot timer
             try:
-                win.attributes("-noactivate", True)
-            except Exception:
-                pass
-
-            label = tk.Label(
-                win,
-                text=text,
-                bg="#1e1e1e",
-                fg="white",
-                font=("Segoe UI", 10),
-                wraplength=350,
-                padx=10,
-                pady=8,
-                justify=tk.LEFT,
-            )
-            label.pack()
+                self.root.after(0, self._on_wake)
+            except Exception as e:
+                _log.error("Overlay wake error: %s", e)
+
+    def _on_wake(self, event=None):
+        """Drain the queue and show only the newest message of each kind."""
+        latest = {}
+        WAKEUPS.inc()
+        try:
+            while True:
+                kind, payload, enqueued_at, trace = self.queue.get_nowait()
+                if kind in latest:
+                    COALESCED.inc()
+                latest[kind] = (payload, enqueued_at, trace)
+        except queue.Empty:
+            pass
+        if "output" in latest:
+            (title, text), enqueued_at, trace = latest["output"]
+            try:
+                self._viewer.show(title, text)
+                self._record_shown(enqueued_at, trace)
+            except Exception as e:
+                _log.error("Error showing output viewer: %s", e)
+        if "answer" in latest:
+            text, enqueued_at, trace = latest["answer"]
+            self._show_text(text, enqueued_at, trace)
+
+    def _show_text(self, text: str, enqueued_at: float, trace=None):
+        try:
+            win = self._window
+            self._label.config(text=text)
 
             win.update_idletasks()
             width = win.winfo_reqwidth()
-            height = win.winfo_reqheight()
             screen_width = win.winfo_screenwidth()
             x = screen_width - width - 10
             y = 10
             win.geometry(f"+{x}+{y}")
             win.deiconify()
+            win.lift()
 
-            # Auto-dismiss after configured duration
+            # Restart the auto-dismiss timer for the new content
+            if self._dismiss_id is not None:
+                win.after_cancel(self._dismiss_id)
             dismiss_ms = int(config.OVERLAY_DURATION * 1000)
-            win.after(dismiss_ms, win.destroy)
+            self._dismiss_id = win.after(dismiss_ms, self._dismiss)
+
+            self._record_shown(enqueued_at, trace)
         except Exception as e:
-            print(f"Error showing overlay: {e}")
+            _log.error("Error showing overlay: %s", e)
+
+    def _record_shown(self, enqueued_at: float, trace=None):
+        if trace is not None:
+            trace.mark("overlay")
+        DISPLAY_SECONDS.observe(time.perf_counter() - enqueued_at)
+
+    def _dismiss(self):
+        self._dismiss_id = None
+        try:
+            self._window.withdraw()
+        except Exception as e:
+            _log.error("Error hiding overlay: %s", e)
+
+
+# Overlay thread, started on first use (or by start()) rather than at import
+_tk_thread = None
+_tk_thread_lock = threading.Lock()
+metrics.gauge(
+    "jarvis_overlay_queue_depth", "Overlay messages waiting to be drawn",
+    lambda: _tk_thread.queue.qsize() if _tk_thread is not None else 0,
+)
 
 
-# Start overlay thread on import
-_tk_thread = TkOverlayThread()
-_tk_thread.start()
+def start() -> TkOverlayThread:
+    """Start the overlay thread if it is not running yet (safe from any thread)."""
+    global _tk_thread
+    if _tk_thread is None:
+        with _tk_thread_lock:
+            if _tk_thread is None:
+                thread = TkOverlayThread()
+                thread.start()
+                _tk_thread = thread
+    return _tk_thread
+
+
+def wait_ready(timeout: float = None) -> bool:
+    """Start the overlay thread and wait until its Tk loop is up."""
+    return start()._ready.wait(timeout)
 
 
 def show_answer(text: str) -> None:
     """Enqueue text to be shown by the overlay thread."""
     try:
-        _tk_thread.queue.put(text)
+        start().post("answer", text)
+    except Exception as e:
+        _log.warning("Failed to enqueue overlay text: %s", e)
+
+
+def show_output(title: str, text: str) -> None:
+    """
+    Show a large result (file contents, command output, clipboard) in the
+    scrollable viewer. Only the visible lines are rendered, so multi-megabyte
+    text appears immediately.
+
+    Args:
+        title: Short heading (e.g., the file name)
+        text: Full output
+    """
+    try:
+        start().post("output", (title, text))
     except Exception as e:
-        print(f"Failed to enqueue overlay text: {e}")
+        _log.warning("Failed to enqueue overlay output: %s", e)
@@ -0,0 +1,201 @@
+"""
+Phrase Cache Module
+Pre-rendered PCM audio for short, frequently spoken TTS phrases.
+Phrases are synthesized once to WAV with pyttsx3.save_to_file, stored on disk
+keyed by text + voice + rate, and kept in an in-memory LRU so a cache hit
+starts playing without touching the speech engine.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import wave
+from collections import OrderedDict
+from pathlib import Path
+import log
+
+_log = log.get_logger("phrase_cache")
+
+
+class CachedAudio:
+    """Decoded PCM for one phrase."""
+
+    __slots__ = ("frames", "sample_rate", "channels", "sample_width")
+
+    def __init__(self, frames: bytes, sample_rate: int, channels: int, sample_width: int):
+        self.frames = frames
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+
+def _read_wav(path: Path):
+    """Load a WAV file, or return None if it is missing or not PCM WAV."""
+    try:
+        with wave.open(str(path), "rb") as wf:
+            return CachedAudio(wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels(), wf.getsampwidth())
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+class PhraseCache:
+    """
+    Two-level (memory + disk) LRU cache of synthesized phrases.
+    The disk level is bounded by max_disk_bytes (least recently used files
+    are deleted first); the memory level by max_memory_bytes.
+    """
+
+    def __init__(self, cache_dir: Path, voice: str, rate: int,
+                 max_disk_bytes: int = 50 * 1024 * 1024, max_memory_bytes: int = 8 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.voice = voice
+        self.rate = rate
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        normalized = " ".join(text.lower().split())
+        return hashlib.sha1(f"{self.voice}|{self.rate}|{normalized}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.wav"
+
+    def _remember(self, key: str, audio: CachedAudio) -> None:
+        """Insert into the memory LRU (caller holds the lock)."""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old.frames)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio.frames)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.frames)
+
+    def get(self, text: str):
+        """
+        Look up a phrase.
+
+        Args:
+            text: Phrase text
+
+        Returns:
+            CachedAudio, or None on a miss
+        """
+        key = self._key(text)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return audio
+        path = self._path(key)
+        audio = _read_wav(path)
+        with self._lock:
+            if audio is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, audio)
+        try:
+            # Touch so disk eviction sees it as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        return audio
+
+    def __contains__(self, text: str) -> bool:
+        key = self._key(text)
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self._path(key).exists()
+
+    def render(self, text: str, engine) -> bool:
+        """
+        Synthesize a phrase with a pyttsx3 engine and store it.
+        Must be called from the thread that owns the engine.
+
+        Args:
+            text: Phrase text
+            engine: Initialized pyttsx3 engine
+
+        Returns:
+            True if the phrase is now cached
+        """
+        key = self._key(text)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(suffix=".wav", dir=str(self.cache_dir))
+        os.close(fd)
+        try:
+            engine.save_to_file(text, tmp_name)
+            engine.runAndWait()
+            audio = _read_wav(Path(tmp_name))
+            if audio is None or not audio.frames:
+                return False
+            os.replace(tmp_name, self._path(key))
+        except Exception as e:
+            _log.warning("TTS cache render failed for '%s': %s", text, e)
+            return False
+        finally:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+        with self._lock:
+            self._remember(key, audio)
+        self._evict_disk()
+        return True
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used WAVs until the cache fits max_disk_bytes."""
+        try:
+            entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(self.cache_dir) if e.name.endswith(".wav")]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+
+
+def play(audio: CachedAudio, should_stop=None) -> None:
+    """
+    Play cached PCM through the default output device and block until done.
+
+    Args:
+        audio: Phrase to play
+        should_stop: Optional callable polled during playback; playback is
+            cut short on the calling thread once it returns True
+    """
+    import numpy as np
+    import sounddevice as sd
+
+    # 8-bit WAV is unsigned, wider widths are signed
+    dtype = {1: np.uint8, 2: np.int16, 4: np.int32}.get(audio.sample_width)
+    if dtype is None:
+        raise ValueError(f"Unsupported sample width {audio.sample_width}")
+    samples = np.frombuffer(audio.frames, dtype=dtype)
+    if audio.channels > 1:
+        samples = samples.reshape(-1, audio.channels)
+    sd.play(samples, audio.sample_rate)
+    if should_stop is None:
+        sd.wait()
+        return
+    stream = sd.get_stream()
+    while stream.active:
+        if should_stop():
+            sd.stop()
+            return
+        time.sleep(0.02)
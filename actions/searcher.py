@@ -4,6 +4,10 @@ Searches the web and summarizes results using DuckDuckGo.
 """
 
 import requests
+import config
+import log
+
+_log = log.get_logger("searcher")
 
 
 def web_search(query: str) -> str:
@@ -19,7 +23,7 @@ def web_search(query: str) -> str:
     """
     try:
         # DuckDuckGo API endpoint
-        url = "https://api.duckduckgo.com"
+        url = config.DUCKDUCKGO_API_URL
         params = {
             "q": query,
             "format": "json",
@@ -44,5 +48,5 @@ def web_search(query: str) -> str:
         
         return result
     except Exception as e:
-        print(f"Error during web search: {e}")
+        _log.warning("Error during web search: %s", e)
         return f"Search failed: {str(e)}"
@@ -4,6 +4,9 @@ Execute whitelisted shell commands only.
 """
 
 import subprocess
+import log
+
+_log = log.get_logger("shell_ops")
 
 # Frozenset of allowed commands
 ALLOWED_COMMANDS = frozenset({"ls", "pwd", "git", "echo", "python", "pip", "open"})
@@ -50,5 +53,5 @@ def run_command(cmd: str) -> str:
     except subprocess.TimeoutExpired:
         raise ValueError("Command execution timed out (10s limit)")
     except Exception as e:
-        print(f"Error executing command: {e}")
+        _log.error("Error executing command: %s", e)
         raise ValueError(f"Command execution failed: {e}")
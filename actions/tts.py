@@ -1,31 +1,66 @@
 """
 Text-to-Speech action module using pyttsx3.
 Runs a background thread with a queue to avoid blocking the main thread.
+Text is spoken one sentence at a time so speech starts sooner and can be
+interrupted when a new command begins. Fixed phrases are played from a
+pre-rendered audio cache when available.
+The speech engine is initialized on the worker thread, so importing this
+module does not wait for eSpeak probes or pyttsx3 driver startup.
 """
 
 import threading
-import queue
-import time
 import os
+import re
 import subprocess
-
-try:
-    import pyttsx3
-except Exception:
-    pyttsx3 = None
+from collections import deque
+from string import Formatter
 
 import config
+import log
+import metrics
+import tracing
+from actions import phrase_cache
+
+_log = log.get_logger("tts")
+
+# Sentence boundary: terminal punctuation followed by whitespace
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+
+# Queue marker that stops the worker
+_SHUTDOWN = "shutdown"
 
 
 class TTSWorker(threading.Thread):
     def __init__(self):
         super().__init__(daemon=True)
-        self.q = queue.Queue()
+        self._cond = threading.Condition()
+        self._items = deque()
+        self._generation = 0
+        self._current = None  # Generation of the utterance being spoken, None when idle
         self.engine = None
-        self._init_engine()
+        self.cache = None
+        self._to_render = []
+        self.ready = threading.Event()
+
+    def _init_cache(self):
+        """Set up the phrase cache and queue the warm-up phrases for rendering."""
+        if not self.engine or not config.TTS_CACHE_ENABLED:
+            return
+        try:
+            voice = self.engine.getProperty('voice') or str(config.TTS_VOICE_INDEX)
+        except Exception:
+            voice = str(config.TTS_VOICE_INDEX)
+        self.cache = phrase_cache.PhraseCache(
+            config.TTS_CACHE_DIR, voice, config.TTS_RATE,
+            max_disk_bytes=config.TTS_CACHE_MAX_BYTES,
+            max_memory_bytes=config.TTS_CACHE_MEMORY_BYTES,
+        )
+        self._to_render = [p for p in config.TTS_CACHE_PHRASES if p not in self.cache]
 
     def _init_engine(self):
-        if pyttsx3 is None:
+        try:
+            import pyttsx3
+        except Exception:
             return
         
         # Try eSpeak first (more voices available)
@@ -56,10 +91,10 @@ class TTSWorker(threading.Thread):
                     if voices and config.TTS_VOICE_INDEX < len(voices):
                         self.engine.setProperty('voice', voices[config.TTS_VOICE_INDEX].id)
                     self.engine.setProperty('rate', config.TTS_RATE)
-                    print(f"✓ TTS: Using eSpeak (voice {config.TTS_VOICE_INDEX}, rate {config.TTS_RATE})")
+                    _log.info("✓ TTS: Using eSpeak (voice %s, rate %s)", config.TTS_VOICE_INDEX, config.TTS_RATE)
                     return
             except Exception as e:
-                print(f"⚠ eSpeak init: {type(e).__name__} - will use SAPI instead")
+                _log.warning("⚠ eSpeak init: %s - will use SAPI instead", type(e).__name__)
         
         # Fallback to Windows SAPI (built-in, always available, recommended)
         try:
@@ -68,39 +103,211 @@ class TTSWorker(threading.Thread):
             if voices and config.TTS_VOICE_INDEX < len(voices):
                 self.engine.setProperty('voice', voices[config.TTS_VOICE_INDEX].id)
             self.engine.setProperty('rate', config.TTS_RATE)
-            print(f"✓ TTS: Using Windows SAPI (voice {config.TTS_VOICE_INDEX}, rate {config.TTS_RATE})")
+            _log.info("✓ TTS: Using Windows SAPI (voice %s, rate %s)", config.TTS_VOICE_INDEX, config.TTS_RATE)
         except Exception as e:
-            print(f"✗ TTS initialization failed: {e}")
+            _log.error("✗ TTS initialization failed: %s", e)
             self.engine = None
 
+    def enqueue(self, parts: list, coalesce_key: str = None) -> None:
+        """
+        Queue an utterance to speak.
+        If coalesce_key is given, queued utterances with the same key that
+        have not started yet are dropped so only the latest one is spoken.
+
+        Args:
+            parts: List of (text, cacheable) tuples, spoken in order.
+                Cacheable parts are rendered into the phrase cache after
+                their first use.
+            coalesce_key: Optional category for coalescing
+        """
+        with self._cond:
+            if coalesce_key is not None:
+                self._items = deque(item for item in self._items if item[1] != coalesce_key)
+            self._items.append((parts, coalesce_key, tracing.current()))
+            self._cond.notify()
+
+    def interrupt(self) -> None:
+        """
+        Drop everything queued and cut off the sentence being spoken.
+        Only the generation changes here; the worker notices it and stops
+        the engine or playback on its own thread.
+        """
+        with self._cond:
+            self._items.clear()
+            self._generation += 1
+
+    def _stale(self) -> bool:
+        """True once the utterance being spoken has been interrupted."""
+        return self._current is not None and self._current != self._generation
+
+    def _on_word(self, name, location, length) -> None:
+        # Engine callback, runs on this thread inside runAndWait
+        if self._stale():
+            self.engine.stop()
+
+    def shutdown(self) -> None:
+        """Stop the worker after the current sentence."""
+        with self._cond:
+            self._items.clear()
+            self._items.append((_SHUTDOWN, None, None))
+            self._generation += 1
+            self._cond.notify()
+
     def run(self):
-        while True:
+        # The engine belongs to this thread (SAPI is COM, single-threaded apartment)
+        try:
+            self._init_engine()
+            self._init_cache()
+        except Exception as e:
+            _log.error("✗ TTS initialization failed: %s", e)
+        finally:
+            self.ready.set()
+        if self.engine:
             try:
-                text = self.q.get()
-                if text is None:
+                self.engine.connect('started-word', self._on_word)
+            except Exception as e:
+                _log.warning("TTS word callback unavailable; interrupts wait for the sentence to end: %s", e)
+        while True:
+            with self._cond:
+                while not self._items:
+                    if self._to_render:
+                        break
+                    self._cond.wait()
+                if not self._items:
+                    # Idle: render one pending phrase into the cache, then look again
+                    phrase = self._to_render.pop(0)
+                    parts = None
+                else:
+                    parts, _, trace = self._items.popleft()
+                    generation = self._generation
+            if parts is None:
+                if self.cache is not None and phrase not in self.cache:
+                    self.cache.render(phrase, self.engine)
+                continue
+            if parts == _SHUTDOWN:
+                break
+            self._current = generation
+            for text, cacheable in parts:
+                if not self._speak_part(text, cacheable, generation, trace):
                     break
-                if not self.engine:
+            self._current = None
+
+    def _speak_part(self, text: str, cacheable: bool, generation: int, trace=None) -> bool:
+        """
+        Speak one part sentence by sentence, so the first sentence starts
+        right away and an interrupt takes effect at the next boundary.
+
+        Returns:
+            False if the utterance was interrupted
+        """
+        for sentence in split_sentences(text):
+            audio = self.cache.get(sentence) if self.cache is not None else None
+            with self._cond:
+                if self._generation != generation:
+                    return False
+            if trace is not None:
+                trace.mark("tts_start")
+            try:
+                if audio is not None:
+                    phrase_cache.play(audio, self._stale)
+                elif not self.engine:
                     # Fallback: print if engine unavailable
-                    print(f"TTS: {text}")
-                    continue
-                self.engine.say(text)
-                self.engine.runAndWait()
+                    _log.info("TTS: %s", sentence)
+                else:
+                    self.engine.say(sentence)
+                    self.engine.runAndWait()
+                    if cacheable and self.cache is not None:
+                        with self._cond:
+                            if sentence not in self._to_render:
+                                self._to_render.append(sentence)
             except Exception as e:
-                print(f"TTS error: {e}")
-            finally:
-                time.sleep(0.01)
+                _log.error("TTS error: %s", e)
+        return True
+
+
+def split_sentences(text: str):
+    """
+    Yield speakable chunks of text, one sentence at a time.
+    Sentences longer than config.TTS_MAX_CHUNK_CHARS are split at commas.
+
+    Args:
+        text: Text to speak
+
+    Yields:
+        Non-empty sentence strings
+    """
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= config.TTS_MAX_CHUNK_CHARS:
+            yield sentence
+            continue
+        chunk = ""
+        for part in sentence.split(","):
+            candidate = f"{chunk},{part}" if chunk else part
+            if chunk and len(candidate) > config.TTS_MAX_CHUNK_CHARS:
+                yield chunk.strip()
+                chunk = part
+            else:
+                chunk = candidate
+        if chunk.strip():
+            yield chunk.strip()
 
 
 _tts_worker = TTSWorker()
 _tts_worker.start()
+metrics.gauge("jarvis_tts_queue_depth", "Utterances waiting to be spoken", lambda: len(_tts_worker._items))
+
 
+def speak(text: str, coalesce_key: str = None) -> None:
+    """
+    Queue text to speak asynchronously.
 
-def speak(text: str) -> None:
-    """Queue text to speak asynchronously."""
+    Args:
+        text: Text to speak
+        coalesce_key: Optional category (e.g., "ack"); a newer message with the
+            same key replaces older ones that are still waiting
+    """
     try:
-        _tts_worker.q.put_nowait(text)
+        _tts_worker.enqueue([(text, False)], coalesce_key)
     except Exception as e:
-        print(f"Failed to enqueue TTS text: {e}")
+        _log.warning("Failed to enqueue TTS text: %s", e)
 
 
+def speak_template(template: str, coalesce_key: str = None, **values) -> None:
+    """
+    Queue a templated phrase such as "Typing {text} now".
+    The literal fragments ("Typing", "now") and short numbers are served
+    from the phrase cache, so an acknowledgement starts without waiting on
+    the speech engine; only the variable part is synthesized live.
 
+    Args:
+        template: str.format-style template
+        coalesce_key: Optional category, as for speak()
+        **values: Values for the template fields
+    """
+    parts = []
+    try:
+        for literal, field, _, _ in Formatter().parse(template):
+            if literal.strip():
+                parts.append((literal.strip(), True))
+            if field:
+                value = str(values[field])
+                parts.append((value, value.isdigit() and len(value) <= 3))
+        _tts_worker.enqueue(parts, coalesce_key)
+    except Exception as e:
+        _log.warning("Failed to enqueue TTS text: %s", e)
+
+
+def wait_ready(timeout: float = None) -> bool:
+    """Wait until the speech engine has been initialized (or failed to)."""
+    return _tts_worker.ready.wait(timeout)
+
+
+def interrupt() -> None:
+    """Stop speaking now and discard queued speech (barge-in)."""
+    try:
+        _tts_worker.interrupt()
+    except Exception as e:
+        _log.warning("Failed to interrupt TTS: %s", e)
@@ -1,9 +1,24 @@
 """
 Typing Action Module
 Types text at the current cursor position using pynput.
+Short strings are typed key by key; long dictation is pasted through the
+clipboard (which is saved and restored) or typed in paced chunks.
 """
 
+import sys
+import threading
+import time
 from pynput.keyboard import Controller, Key
+import config
+import log
+import metrics
+
+_log = log.get_logger("typer")
+
+try:
+    import pyperclip
+except Exception:
+    pyperclip = None
 
 controller = Controller()
 
@@ -12,24 +27,119 @@ _last_typed_text = None
 _last_typed_time = 0
 _DEBOUNCE_SECONDS = 0.6
 
+# Serializes clipboard save -> paste -> restore so overlapping pastes can't clobber each other
+_clipboard_lock = threading.Lock()
+
+# Throughput per strategy is chars_total / seconds_sum
+CHARS = metrics.counter("jarvis_typed_chars_total", "Characters typed, by strategy", ("strategy",))
+SECONDS = metrics.histogram(
+    "jarvis_type_seconds", "Wall time of typing calls, by strategy", metrics.LATENCY_BUCKETS, ("strategy",),
+)
+
+
+def _record(strategy: str, chars: int, seconds: float) -> None:
+    CHARS.inc(strategy, amount=chars)
+    SECONDS.observe(seconds, strategy)
+
+
+def choose_strategy(text: str) -> str:
+    """
+    Pick a typing strategy for text.
+
+    Args:
+        text: Text about to be typed
+
+    Returns:
+        "keys" for short text, "paste" for long text when the clipboard is
+        usable, otherwise "chunked". config.TYPING_STRATEGY overrides "auto".
+    """
+    strategy = config.TYPING_STRATEGY
+    if strategy != "auto":
+        return strategy
+    if len(text) <= config.TYPING_PASTE_THRESHOLD:
+        return "keys"
+    return "paste" if pyperclip is not None else "chunked"
+
 
-def type_text(text: str) -> None:
+def _paste_modifier():
+    return Key.cmd if sys.platform == "darwin" else Key.ctrl
+
+
+def _type_keys(text: str) -> None:
+    controller.type(text)
+
+
+def _type_chunked(text: str) -> None:
+    """Type in fixed-size chunks with a pause in between so the target app keeps up."""
+    size = max(int(config.TYPING_CHUNK_SIZE), 1)
+    pause = config.TYPING_CHUNK_PAUSE
+    for i in range(0, len(text), size):
+        if i:
+            time.sleep(pause)
+        controller.type(text[i:i + size])
+
+
+def _type_paste(text: str) -> None:
+    """
+    Paste text via the clipboard, then restore the previous clipboard.
+    Restoring waits briefly because the target app reads the clipboard
+    asynchronously after the paste shortcut.
+    """
+    with _clipboard_lock:
+        try:
+            saved = pyperclip.paste()
+        except Exception:
+            saved = None
+        pyperclip.copy(text)
+        with controller.pressed(_paste_modifier()):
+            controller.press("v")
+            controller.release("v")
+        time.sleep(config.TYPING_CLIPBOARD_RESTORE_DELAY)
+        if saved is not None:
+            try:
+                pyperclip.copy(saved)
+            except Exception as e:
+                _log.warning("Could not restore clipboard: %s", e)
+
+
+_STRATEGIES = {
+    "keys": _type_keys,
+    "chunked": _type_chunked,
+    "paste": _type_paste,
+}
+
+
+def type_text(text: str, strategy: str = None) -> None:
     """
     Type text at the current cursor position.
     Handles single characters, full sentences, punctuation.
-    
+
     Args:
         text: The text to type (e.g., "hello world" or "the letter a")
+        strategy: "keys", "chunked" or "paste"; chosen automatically by length if None
     """
     global _last_typed_text, _last_typed_time
     try:
-        import time
         # Simple debounce: skip if same text typed very recently
         now = time.time()
         if _last_typed_text == text and (now - _last_typed_time) < _DEBOUNCE_SECONDS:
             return
-        controller.type(text)
+        strategy = strategy or choose_strategy(text)
+        if strategy == "paste" and pyperclip is None:
+            strategy = "chunked"
+        handler = _STRATEGIES.get(strategy, _type_keys)
+        start = time.perf_counter()
+        try:
+            handler(text)
+        except Exception as e:
+            if handler is _type_keys:
+                raise
+            # Clipboard or pacing failure: fall back to plain key events
+            _log.warning("Typing strategy '%s' failed (%s), typing key by key", strategy, e)
+            strategy = "keys"
+            _type_keys(text)
+        _record(strategy, len(text), time.perf_counter() - start)
         _last_typed_text = text
         _last_typed_time = now
     except Exception as e:
-        print(f"Error typing text: {e}")
+        _log.error("Error typing text: %s", e)
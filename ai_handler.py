@@ -1,14 +1,20 @@
 """
 AI Handler Module
-Routes voice commands to Groq or OpenRouter with automatic fallback.
-Parses JSON responses and handles errors gracefully.
+Routes voice commands to the AI backends in config.AI_BACKENDS (a local
+OpenAI-compatible server, Groq, OpenRouter, ...) in priority order with
+automatic fallback. Parses JSON responses and handles errors gracefully.
 """
 
 import json
 import re
-from groq import Groq as GroqClient
-from openai import OpenAI
+import threading
+import time
 import config
+import log
+import metrics
+import tracing
+
+_log = log.get_logger("ai")
 
 # System prompt for AI backend
 SYSTEM_PROMPT = """You are Jarvis, a voice assistant. You receive a transcribed voice command.
@@ -19,21 +25,30 @@ web_search(query)         → search the web, summarize result in 1-2 sentences
 watch_youtube(query)      → open YouTube video search results for given query
 open_app(name)            → open application by name
 create_file(name,content) → create file in sandbox workspace only
-read_file(name)           → read file from sandbox workspace
+read_file(name, mode, lines, start, end, pattern) → read file from sandbox workspace;
+                          mode is one of: preview (default), head, tail, range, grep
+search_files(query)       → search the user's own notes/files in the workspace (offline)
 run_command(cmd)          → shell command, ONLY from allowlist: [ls, pwd, git, echo, python, pip, open]
 clipboard_read()
 clipboard_write(text)
 system_info(metric)       → metric is one of: time, battery, disk
+type(text)                → type text at the cursor
+delete_chars(count)       → delete characters before the cursor
+delete_words(count)       → delete words before the cursor
 respond(text)             → just answer verbally/visually, no other action
 
 Response format:
-{"action": "action_name", "params": {...}, "answer": "short human-readable result or confirmation, max 2 sentences"}"""
+{"action": "action_name", "params": {...}, "answer": "short human-readable result or confirmation, max 2 sentences"}
+
+If the command asks for several things, return ONE plan instead of a single action.
+Steps run in parallel unless "after" lists the ids of steps that must finish first:
+{"action": "plan", "params": {"steps": [{"id": "1", "action": "type", "params": {"text": "hello"}, "after": []}, {"id": "2", "action": "delete_words", "params": {"count": 1}, "after": ["1"]}]}, "answer": "..."}"""
 
 
 def ask_ai(prompt: str) -> dict:
     """
-    Send a prompt to the AI backend (Groq or OpenRouter).
-    Automatically retries with fallback backend on error.
+    Send a prompt to the AI backends in order (see backend_order).
+    Automatically retries with the next backend on error.
     Returns parsed JSON response.
     
     Args:
@@ -43,23 +58,11 @@ def ask_ai(prompt: str) -> dict:
         Parsed JSON dict with keys: action, params, answer
         On error, returns safe fallback response
     """
-    
-    # Try primary backend first
-    primary_backend = config.AI_BACKEND
-    backends = [primary_backend]
-    
-    # Add fallback backend
-    fallback = "openrouter" if primary_backend == "groq" else "groq"
-    backends.append(fallback)
-    
-    for backend in backends:
+    for backend, spec in backend_order():
         try:
-            if backend == "groq":
-                response = _call_groq(prompt)
-            else:
-                response = _call_openrouter(prompt)
+            response = _call_backend(backend, spec, prompt)
             
-            print(f"[DEBUG] Raw response from {backend}: {response[:200] if len(response) > 200 else response}")
+            _log.debug("Raw response from %s: %.200s", backend, response)
             
             # Parse JSON with improved handling
             parsed = _parse_json_response(response, prompt)
@@ -71,17 +74,20 @@ def ask_ai(prompt: str) -> dict:
             return parsed
         
         except json.JSONDecodeError as e:
-            print(f"JSON parse error from {backend}: {e}")
+            _log.error("JSON parse error from %s: %s", backend, e)
+            metrics.BACKEND_ERRORS.inc(backend, "parse")
             continue
         except ValueError as e:
-            print(f"Validation error from {backend}: {e}")
+            _log.error("Validation error from %s: %s", backend, e)
+            metrics.BACKEND_ERRORS.inc(backend, "validation")
             continue
         except Exception as e:
-            print(f"Error with {backend} backend: {e}")
+            _log.error("Error with %s backend: %s", backend, e)
+            metrics.BACKEND_ERRORS.inc(backend, "request")
             continue
     
     # All backends failed, return safe fallback
-    print("All AI backends failed, returning fallback response")
+    _log.warning("All AI backends failed, returning fallback response")
     return {
         "action": "respond",
         "params": {},
@@ -152,11 +158,26 @@ def _parse_json_response(response_text: str, prompt: str) -> dict:
     }
 
 
-def _call_groq(prompt: str) -> str:
+def backend_order() -> list:
+    """
+    Enabled backends in the order they are tried: config.AI_BACKEND first
+    if set, then by ascending priority.
+    
+    Returns:
+        List of (name, settings) pairs from config.AI_BACKENDS
+    """
+    backends = [(name, spec) for name, spec in config.AI_BACKENDS.items() if spec.get("enabled", True)]
+    backends.sort(key=lambda item: (item[0] != config.AI_BACKEND, item[1].get("priority", 100)))
+    return backends
+
+
+def _call_backend(backend: str, spec: dict, prompt: str) -> str:
     """
-    Call Groq API.
+    Call one configured backend.
     
     Args:
+        backend: Name in config.AI_BACKENDS
+        spec: Its settings
         prompt: User prompt
         
     Returns:
@@ -165,31 +186,91 @@ def _call_groq(prompt: str) -> str:
     Raises:
         Exception: On API error
     """
-    if not config.GROQ_API_KEY:
-        raise ValueError("GROQ_API_KEY is not configured")
-    
-    client = GroqClient(api_key=config.GROQ_API_KEY)
+    if not spec.get("api_key"):
+        raise ValueError(f"No API key configured for the {backend} backend")
     
-    message = client.chat.completions.create(
-        model=config.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.3,
-        max_tokens=500
+    return _complete(_get_client(backend, spec), spec["model"], prompt, backend)
+
+
+def _groq_client(spec: dict):
+    from groq import Groq as GroqClient
+    kwargs = {"base_url": spec["base_url"]} if spec.get("base_url") else {}
+    return GroqClient(api_key=spec["api_key"], timeout=spec.get("timeout", 30),
+                      max_retries=spec.get("max_retries", 2), **kwargs)
+
+
+def _openai_client(spec: dict):
+    from openai import OpenAI
+    return OpenAI(
+        api_key=spec["api_key"],
+        base_url=spec.get("base_url") or None,
+        timeout=spec.get("timeout", 30),
+        max_retries=spec.get("max_retries", 2),
+        default_headers=spec.get("headers"),
     )
+
+
+# Client factories by backend "type"; each takes the backend's settings dict
+_PROVIDERS = {
+    "groq": _groq_client,
+    "openai": _openai_client,
+}
+
+
+def register_provider(name: str, factory) -> None:
+    """
+    Add a backend type usable in config.AI_BACKENDS.
     
-    return message.choices[0].message.content
+    Args:
+        name: Value of the entries' "type" key
+        factory: Callable taking the settings dict and returning a client
+            with an OpenAI-style chat.completions.create(stream=True)
+    """
+    _PROVIDERS[name] = factory
 
 
+# Backend clients, created on first use and reused so connections stay open
+_clients = {}
+_clients_lock = threading.Lock()
 
-def _call_openrouter(prompt: str) -> str:
+
+def _get_client(backend: str, spec: dict):
+    """
+    Get or create the SDK client for a backend.
+    The groq and openai SDKs are imported by the factories rather than at
+    module import, since they are slow to load and unused until the first AI call.
+    A client is rebuilt if the backend's settings change.
     """
-    Call OpenRouter API via OpenAI client.
+    cached = _clients.get(backend)
+    if cached is None or cached[0] != spec:
+        with _clients_lock:
+            cached = _clients.get(backend)
+            if cached is None or cached[0] != spec:
+                factory = _PROVIDERS.get(spec.get("type"))
+                if factory is None:
+                    raise ValueError(f"Unknown AI backend type {spec.get('type')!r} for {backend}")
+                cached = (dict(spec), factory(spec))
+                _clients[backend] = cached
+    return cached[1]
+
+
+def preload() -> None:
+    """Create clients for the configured backends now (call from a background thread at startup)."""
+    for backend, spec in backend_order():
+        if spec.get("api_key"):
+            _get_client(backend, spec)
+
+
+def _complete(client, model: str, prompt: str, backend: str) -> str:
+    """
+    Run a streamed chat completion and return the full text.
+    Streaming lets the trace record time to first token as well as the total.
     
     Args:
+        client: Groq or OpenAI-compatible client
+        model: Model name
         prompt: User prompt
+        backend: Backend name for the trace
         
     Returns:
         AI response text
@@ -197,23 +278,36 @@ def _call_openrouter(prompt: str) -> str:
     Raises:
         Exception: On API error
     """
-    if not config.OPENROUTER_API_KEY:
-        raise ValueError("OPENROUTER_API_KEY is not configured")
-    
-    client = OpenAI(
-        api_key=config.OPENROUTER_API_KEY,
-        base_url="https://openrouter.ai/api/v1",
-        default_headers={"HTTP-Referer": "jarvis-assistant"}
-    )
-    
-    message = client.chat.completions.create(
-        model=config.OPENROUTER_MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.3,
-        max_tokens=500
-    )
+    start = time.perf_counter()
+    first_token = None
+    completed = False
+    parts = []
+    try:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=500,
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                parts.append(delta)
+        completed = True
+    finally:
+        end = time.perf_counter()
+        metrics.BACKEND_SECONDS.observe(end - start, backend, "ok" if completed else "error")
+        trace = tracing.current()
+        if trace is not None:
+            trace.add_span("llm_ttfb", start, first_token or end, backend=backend)
+            trace.add_span("llm", start, end, backend=backend, ok=first_token is not None)
     
-    return message.choices[0].message.content
+    return "".join(parts)
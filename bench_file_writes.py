@@ -0,0 +1,73 @@
+"""
+File write throughput benchmark
+Compares per-call open/append/close with the buffered AppendJournal, and
+atomic create_file-style writes with and without fsync.
+Run: python bench_file_writes.py [appends]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from actions.file_writer import AppendJournal, atomic_write
+
+PHRASE = "and then we should probably move the standup to thursday morning. "
+
+
+def bench_naive(path: Path, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        with path.open("a", encoding="utf-8") as f:
+            f.write(PHRASE)
+    return time.perf_counter() - start
+
+
+def bench_journal(path: Path, n: int, durable: bool) -> float:
+    journal = AppendJournal(flush_seconds=1.0, durable=durable)
+    start = time.perf_counter()
+    for _ in range(n):
+        journal.append(path, PHRASE)
+    journal.close_all()
+    return time.perf_counter() - start
+
+
+def bench_atomic(directory: Path, n: int, durable: bool) -> float:
+    content = PHRASE * 50
+    start = time.perf_counter()
+    for i in range(n):
+        atomic_write(directory / f"note{i % 10}.txt", content, durable)
+    return time.perf_counter() - start
+
+
+def main():
+    n = 20000
+    if len(sys.argv) > 1:
+        try:
+            n = int(sys.argv[1])
+        except Exception:
+            pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        rows = [
+            ("append: open/write/close per call", n, bench_naive(tmp / "naive.txt", n)),
+            ("append: journal (buffered)", n, bench_journal(tmp / "journal.txt", n, durable=False)),
+            ("append: journal (fsync per flush)", n, bench_journal(tmp / "journal_sync.txt", n, durable=True)),
+        ]
+        expected = len(PHRASE) * n
+        for name in ("naive.txt", "journal.txt", "journal_sync.txt"):
+            size = (tmp / name).stat().st_size
+            if size != expected:
+                print(f"WARNING: {name} has {size} bytes, expected {expected}")
+
+        writes = max(n // 100, 10)
+        rows.append(("create: atomic rename", writes, bench_atomic(tmp, writes, durable=False)))
+        rows.append(("create: atomic rename + fsync", writes, bench_atomic(tmp, writes, durable=True)))
+
+    print(f"{'benchmark':<38} {'ops':>7} {'seconds':>9} {'ops/sec':>12}")
+    for name, ops, seconds in rows:
+        print(f"{name:<38} {ops:>7} {seconds:>9.3f} {ops / seconds:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,483 @@
+"""
+Pipeline benchmark
+Times each stage of the voice pipeline offline: transcription, routing
+(fast path and AI), AI response parsing, the action handlers, and whole
+commands end to end. Network services are replaced by the local stubs in
+bench_stubs.py; keyboard, speech and overlay side effects are disabled.
+Results are written as JSON so runs can be compared between commits.
+
+Fixture audio: every WAV in bench_fixtures/ named after its transcript
+("jarvis what time is it.wav"), plus phrases synthesized with espeak when it
+is installed. Transcription benchmarks are skipped without faster-whisper
+or fixtures; AI benchmarks are skipped without the openai SDK.
+
+Usage:
+    python bench_pipeline.py                      # run everything, write bench_results/<time>-<commit>.json
+    python bench_pipeline.py --only route,parse   # benchmarks whose name starts with one of these
+    python bench_pipeline.py --repeat 50 --llm-latency 0.3
+    python bench_pipeline.py --compare OLD.json NEW.json [--threshold 0.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from array import array
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+FIXTURE_DIR = REPO_DIR / "bench_fixtures"
+RESULTS_DIR = REPO_DIR / "bench_results"
+
+# Synthesized with espeak when available (written to the run's temp dir)
+SPOKEN_PHRASES = [
+    "jarvis what time is it",
+    "jarvis type hello world",
+    "jarvis search the web for python",
+]
+
+# Compound commands, AI-routed commands and raw AI replies used by several benchmarks
+FASTPATH_COMMANDS = ["type hello world", "delete three words", "search my notes for standup", "delete 12 characters"]
+COMPOUND_COMMAND = "type hello then delete two words and then type goodbye"
+LLM_COMMANDS = ["what is the capital of france", "what time is it", "search the web for python", "check the time then the disk"]
+RAW_RESPONSES = {
+    "clean": '{"action": "system_info", "params": {"metric": "time"}, "answer": "Checking the time"}',
+    "fenced": '```json\n{"action": "web_search", "params": {"query": "python"}, "answer": "Searching"}\n```',
+    "plan": json.dumps({"action": "plan", "params": {"steps": [
+        {"id": str(i), "action": "type", "params": {"text": f"line {i}"}, "after": [str(i - 1)] if i > 1 else []}
+        for i in range(1, 6)]}, "answer": "Typing five lines"}),
+    "prose": 'Sure! Here you go: {"action": "respond", "params": {}, "answer": "Paris."} Hope that helps.',
+    "garbage": "I'm sorry, I can't help with that request right now.",
+}
+
+
+# ==================== ENVIRONMENT ====================
+
+def _seed_workspace() -> None:
+    """Notes for the file and notes-search benchmarks."""
+    import config
+    for i in range(20):
+        (config.WORKSPACE_DIR / f"note{i}.md").write_text(
+            f"# Note {i}\nstandup moved to thursday\n" + "lorem ipsum dolor sit amet\n" * 200, encoding="utf-8")
+
+
+# ==================== MEASUREMENT ====================
+
+class Skip(Exception):
+    """Raised by a benchmark whose dependencies or fixtures are unavailable."""
+
+
+def measure(func, repeat: int, warmup: int = 1) -> dict:
+    """
+    Call func repeatedly and summarize wall-clock latency.
+
+    Args:
+        func: Callable taking the iteration index (negative during warmup)
+        repeat: Timed iterations
+        warmup: Untimed iterations first (client creation, imports, caches)
+
+    Returns:
+        Dict with n, errors, mean/p50/p95/min/max in milliseconds, and the last error
+    """
+    import tracing
+    for i in range(warmup):
+        try:
+            func(-1 - i)
+        except Exception:
+            pass
+    samples, errors, last_error = [], 0, None
+    for i in range(repeat):
+        start = time.perf_counter()
+        try:
+            func(i)
+        except Exception as e:
+            errors += 1
+            last_error = f"{type(e).__name__}: {e}"
+        samples.append(1000 * (time.perf_counter() - start))
+    samples.sort()
+    result = {
+        "n": len(samples),
+        "errors": errors,
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else 0.0,
+        "p50_ms": round(tracing.percentile(samples, 50), 3),
+        "p95_ms": round(tracing.percentile(samples, 95), 3),
+        "min_ms": round(samples[0], 3) if samples else 0.0,
+        "max_ms": round(samples[-1], 3) if samples else 0.0,
+    }
+    if last_error:
+        result["last_error"] = last_error
+    return result
+
+
+def _wait_all(action_dict: dict):
+    """Submit an action (or plan) and wait for it, as the listener does for answering actions."""
+    from actions import dispatch
+    spec, future = dispatch.submit(action_dict)
+    if spec is not None:
+        return dispatch.wait(spec, future)
+    return None
+
+
+# ==================== FIXTURE AUDIO ====================
+
+def read_wav(path: Path):
+    """
+    Load a 16-bit PCM WAV as mono floats in [-1, 1].
+
+    Returns:
+        Tuple of (samples list, sample rate)
+    """
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path.name}: only 16-bit PCM is supported")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        pcm = array("h", wf.readframes(wf.getnframes()))
+    if sys.byteorder == "big":
+        pcm.byteswap()
+    return [s / 32768.0 for s in pcm[::channels]], rate
+
+
+def _resample(samples: list, rate: int, target: int = 16000) -> list:
+    """Linear resampling; espeak writes 22.05 kHz and Whisper expects 16 kHz."""
+    if rate == target or not samples:
+        return samples
+    step = rate / target
+    out = []
+    position = 0.0
+    last = len(samples) - 1
+    while position < last:
+        i = int(position)
+        frac = position - i
+        out.append(samples[i] * (1 - frac) + samples[i + 1] * frac)
+        position += step
+    return out
+
+
+def load_fixtures(tmp: Path) -> list:
+    """
+    Collect (expected transcript, samples) pairs at 16 kHz from bench_fixtures/
+    and, if espeak is installed, from synthesized phrases.
+    """
+    paths = sorted(FIXTURE_DIR.glob("*.wav")) if FIXTURE_DIR.is_dir() else []
+    espeak = shutil.which("espeak-ng") or shutil.which("espeak")
+    if espeak:
+        for phrase in SPOKEN_PHRASES:
+            path = tmp / f"{phrase}.wav"
+            try:
+                subprocess.run([espeak, "-w", str(path), phrase], check=True, capture_output=True, timeout=30)
+                paths.append(path)
+            except Exception:
+                pass
+    fixtures = []
+    for path in paths:
+        try:
+            samples, rate = read_wav(path)
+        except Exception:
+            continue
+        fixtures.append((path.stem, _resample(samples, rate)))
+    return fixtures
+
+
+# ==================== BENCHMARKS ====================
+
+def bench_parse(repeat: int, **_) -> dict:
+    import ai_handler
+    results = {}
+    for name, raw in RAW_RESPONSES.items():
+        results[f"parse/{name}"] = measure(
+            lambda i, raw=raw: ai_handler._parse_json_response(raw, "what time is it"), repeat * 20)
+    return results
+
+
+def _reset_debounce() -> None:
+    """Forget recent commands so a repeat is routed again, not answered "Already done"."""
+    import command_router
+    getattr(command_router.route, "_recent_commands", {}).clear()
+
+
+def _route(command: str) -> dict:
+    import command_router
+    _reset_debounce()
+    return command_router.route(command)
+
+
+def bench_route_fastpath(repeat: int, **_) -> dict:
+    results = {}
+    for command in FASTPATH_COMMANDS:
+        results[f"route/fastpath/{command}"] = measure(lambda i, command=command: _route(command), repeat * 20)
+    results["route/fastpath/compound"] = measure(lambda i: _route(COMPOUND_COMMAND), repeat * 20)
+    return results
+
+
+def _require_openai() -> None:
+    try:
+        import openai  # noqa: F401
+    except ImportError:
+        raise Skip("openai SDK not installed")
+
+
+def bench_route_llm(repeat: int, **_) -> dict:
+    _require_openai()
+    import command_router
+    return {
+        f"route/llm/{command}": measure(lambda i, command=command: command_router.route(command), repeat)
+        for command in LLM_COMMANDS
+    }
+
+
+def bench_actions(repeat: int, **_) -> dict:
+    results = {}
+    cases = {
+        "system_info": {"action": "system_info", "params": {"metric": "time"}},
+        "create_file": {"action": "create_file", "params": {"name": "bench.md", "content": "hello\n" * 500}},
+        "read_file/preview": {"action": "read_file", "params": {"name": "note1.md"}},
+        "read_file/grep": {"action": "read_file", "params": {"name": "note2.md", "mode": "grep", "pattern": "standup"}},
+        "search_files": {"action": "search_files", "params": {"query": "standup thursday"}},
+        "web_search": {"action": "web_search", "params": {"query": "python"}},
+        "watch_youtube": {"action": "watch_youtube", "params": {"query": "highlights"}},
+        "delete_words": {"action": "delete_words", "params": {"count": 3}},
+    }
+    for name, action in cases.items():
+        results[f"action/{name}"] = measure(lambda i, action=action: _wait_all(action), repeat)
+    results["action/type"] = measure(
+        lambda i: _wait_all({"action": "type", "params": {"text": f"hello world {i}"}}), repeat)
+    return results
+
+
+def bench_transcribe(repeat: int, fixtures: list, **_) -> dict:
+    if not fixtures:
+        raise Skip("no fixture audio (add WAVs to bench_fixtures/ or install espeak)")
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        raise Skip("faster-whisper not installed")
+    import transcriber
+    results = {}
+    measure(lambda i: transcriber.preload(), 1, warmup=0)
+    for expected, samples in fixtures:
+        transcripts = []
+
+        def run(i, samples=samples, transcripts=transcripts):
+            transcripts.append(transcriber.transcribe(samples, sample_rate=16000))
+
+        stats = measure(run, repeat)
+        stats["audio_seconds"] = round(len(samples) / 16000, 3)
+        stats["rtf"] = round(stats["p50_ms"] / 1000 / stats["audio_seconds"], 4) if stats["audio_seconds"] else None
+        stats["transcript"] = transcripts[-1] if transcripts else ""
+        stats["expected"] = expected
+        results[f"transcribe/{expected}"] = stats
+    return results
+
+
+def bench_transcribe_cascade(repeat: int, fixtures: list, **_) -> dict:
+    """
+    WHISPER_MODEL alone versus the fast-model cascade (WHISPER_FAST_MODEL,
+    tiny.en if unset) over all fixtures, with the cascade's escalation rate.
+    """
+    if not fixtures:
+        raise Skip("no fixture audio (add WAVs to bench_fixtures/ or install espeak)")
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        raise Skip("faster-whisper not installed")
+    import config
+    import transcriber
+    fast_model = config.WHISPER_FAST_MODEL or "tiny.en"
+    previous = config.WHISPER_FAST_MODEL
+
+    def run(i):
+        transcriber.transcribe(fixtures[i % len(fixtures)][1], sample_rate=16000)
+
+    try:
+        config.WHISPER_FAST_MODEL = ""
+        transcriber.preload()
+        baseline = measure(run, repeat * len(fixtures))
+        config.WHISPER_FAST_MODEL = fast_model
+        transcriber.preload()
+        measure(run, 1)  # warm-up; not counted below
+        before = transcriber.cascade_stats()
+        cascade = measure(run, repeat * len(fixtures), warmup=0)
+        after = transcriber.cascade_stats()
+    finally:
+        config.WHISPER_FAST_MODEL = previous
+    escalated = after["escalated"] - before["escalated"]
+    decided = escalated + after["accepted"] - before["accepted"]
+    cascade["escalation_rate"] = round(escalated / decided, 4) if decided else None
+    cascade["fast_model"] = fast_model
+    cascade["mean_speedup"] = round(baseline["mean_ms"] / cascade["mean_ms"], 3) if cascade["mean_ms"] else None
+    return {
+        f"transcribe/cascade/{config.WHISPER_MODEL}-only": baseline,
+        f"transcribe/cascade/{fast_model}->{config.WHISPER_MODEL}": cascade,
+    }
+
+
+def bench_end_to_end(repeat: int, fixtures: list, **_) -> dict:
+    import bench_stubs
+    import transcriber
+    run = bench_stubs.listener_runner()
+    results = {}
+    # Text in: transcription replaced by the transcript itself, everything after it is real
+    original = transcriber.transcribe
+    commands = [f"jarvis {c}" for c in FASTPATH_COMMANDS[:2] + [COMPOUND_COMMAND]]
+    try:
+        import openai  # noqa: F401
+        commands += [f"jarvis {c}" for c in LLM_COMMANDS[:2]]
+    except ImportError:
+        pass
+    try:
+        for command in commands:
+            def text_run(i, command=command):
+                transcriber.transcribe = lambda audio, sample_rate=16000: f"{command} {i}" if "type" in command else command
+                _reset_debounce()
+                run([0.0] * 1600)
+            results[f"e2e/text/{command}"] = measure(text_run, repeat)
+    finally:
+        transcriber.transcribe = original
+    # Audio in: the full pipeline from samples to finished action
+    try:
+        import faster_whisper  # noqa: F401
+        for expected, samples in fixtures:
+            results[f"e2e/audio/{expected}"] = measure(lambda i, samples=samples: run(samples), repeat)
+    except ImportError:
+        pass
+    return results
+
+
+BENCHMARKS = [
+    ("parse", bench_parse),
+    ("route/fastpath", bench_route_fastpath),
+    ("route/llm", bench_route_llm),
+    ("action", bench_actions),
+    ("transcribe", bench_transcribe),
+    ("transcribe/cascade", bench_transcribe_cascade),
+    ("e2e", bench_end_to_end),
+]
+
+
+# ==================== RESULTS ====================
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, timeout=5)
+        sha = out.stdout.strip() or "unknown"
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                               capture_output=True, text=True, timeout=5).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except Exception:
+        return "unknown"
+
+
+def compare(old_path: Path, new_path: Path, threshold: float) -> int:
+    """
+    Print p50/p95 changes between two result files.
+
+    Args:
+        old_path: Baseline results JSON
+        new_path: Candidate results JSON
+        threshold: Relative p50 increase (0.15 = 15%) reported as a regression
+
+    Returns:
+        Number of regressions (used as the exit status)
+    """
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+    print(f"baseline {old['meta']['commit']}  vs  candidate {new['meta']['commit']}  (threshold {threshold:.0%})")
+    print(f"{'benchmark':<52}{'old p50':>10}{'new p50':>10}{'change':>9}{'old p95':>10}{'new p95':>10}")
+    regressions = 0
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a, b = old["results"].get(name), new["results"].get(name)
+        if a is None or b is None:
+            print(f"{name:<52}{'only in ' + ('candidate' if a is None else 'baseline'):>20}")
+            continue
+        change = (b["p50_ms"] - a["p50_ms"]) / a["p50_ms"] if a["p50_ms"] else 0.0
+        flag = ""
+        # Sub-50µs timings are mostly noise
+        if change > threshold and b["p50_ms"] - a["p50_ms"] > 0.05:
+            flag = "  REGRESSION"
+            regressions += 1
+        if b.get("errors", 0) > a.get("errors", 0):
+            flag += "  MORE ERRORS"
+        print(f"{name:<52}{a['p50_ms']:>10.2f}{b['p50_ms']:>10.2f}{change:>+9.0%}{a['p95_ms']:>10.2f}{b['p95_ms']:>10.2f}{flag}")
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline stage-level benchmarks for the Jarvis pipeline")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed iterations per benchmark (fast ones run 20x more)")
+    parser.add_argument("--only", default="", help="Comma-separated benchmark name prefixes")
+    parser.add_argument("--llm-latency", type=float, default=0.15, help="Stub AI time to first byte, seconds")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="Stub DuckDuckGo/yt-dlp latency, seconds")
+    parser.add_argument("--output", help="Results file (default bench_results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative p50 slowdown reported by --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(Path(args.compare[0]), Path(args.compare[1]), args.threshold) else 0
+
+    import bench_stubs
+    stub = bench_stubs.StubServer(ttfb=args.llm_latency, search_latency=args.search_latency).start()
+    with tempfile.TemporaryDirectory(prefix="jarvis-bench-") as tmp:
+        tmp = Path(tmp)
+        bench_stubs.install_fake_ytdlp(tmp / "bin", latency=args.search_latency)
+        os.environ["PATH"] = f"{tmp / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"
+        bench_stubs.isolate(tmp, stub.url)
+        _seed_workspace()
+        bench_stubs.silence_side_effects()
+        fixtures = load_fixtures(tmp)
+
+        prefixes = [p.strip() for p in args.only.split(",") if p.strip()]
+        results, skipped = {}, {}
+        for name, bench in BENCHMARKS:
+            if prefixes and not any(name.startswith(p) or p.startswith(name) for p in prefixes):
+                continue
+            print(f"running {name}...", flush=True)
+            try:
+                found = bench(repeat=args.repeat, fixtures=fixtures)
+            except Skip as e:
+                skipped[name] = str(e)
+                print(f"  skipped: {e}")
+                continue
+            for key, stats in found.items():
+                if prefixes and not any(key.startswith(p) for p in prefixes):
+                    continue
+                results[key] = stats
+                error = f"  errors={stats['errors']} ({stats.get('last_error', '')[:60]})" if stats["errors"] else ""
+                if stats.get("escalation_rate") is not None:
+                    error += f"  escalated {stats['escalation_rate']:.0%}"
+                print(f"  {key:<60} p50 {stats['p50_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms{error}")
+    stub.stop()
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "llm_latency": args.llm_latency,
+            "search_latency": args.search_latency,
+            "fixtures": len(fixtures),
+            "skipped": skipped,
+        },
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nWrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Benchmark stubs
+Local stand-ins for the network services the pipeline calls, so benchmarks
+run offline with controlled latency:
+- an OpenAI-compatible /v1/chat/completions endpoint (streaming and not)
+- a DuckDuckGo instant-answer endpoint
+- a fake yt-dlp executable
+plus helpers that isolate config and silence keyboard, speech, overlay and
+browser side effects. Used by bench_pipeline.py and replay.py.
+"""
+
+import contextlib
+import json
+import os
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Canned AI replies: first rule whose keyword appears in the user prompt wins
+DEFAULT_AI_RULES = [
+    ("search", {"action": "web_search", "params": {"query": "python"}, "answer": "Searching for python"}),
+    ("watch", {"action": "watch_youtube", "params": {"query": "highlights"}, "answer": "Opening YouTube"}),
+    ("time", {"action": "system_info", "params": {"metric": "time"}, "answer": "Checking the time"}),
+    ("then", {"action": "plan", "params": {"steps": [
+        {"id": "1", "action": "system_info", "params": {"metric": "time"}, "after": []},
+        {"id": "2", "action": "system_info", "params": {"metric": "disk"}, "after": []},
+    ]}, "answer": "Checking time and disk"}),
+]
+DEFAULT_AI_REPLY = {"action": "respond", "params": {}, "answer": "Paris is the capital of France."}
+
+DDG_REPLY = {
+    "AbstractText": "Python is a high-level, general-purpose programming language. "
+                    "Its design philosophy emphasizes code readability.",
+    "Results": [],
+}
+
+
+class StubServer:
+    """
+    Threaded HTTP server on 127.0.0.1 serving the AI and search stubs.
+
+    Attributes:
+        ttfb: Seconds before the first byte of an AI reply
+        chunk_delay: Seconds between streamed AI chunks
+        search_latency: Seconds before the DuckDuckGo reply
+        rules: List of (keyword, reply dict) for AI replies
+        requests: Count of requests served, by path
+    """
+
+    def __init__(self, ttfb: float = 0.15, chunk_delay: float = 0.005, search_latency: float = 0.05, rules=None):
+        self.ttfb = ttfb
+        self.chunk_delay = chunk_delay
+        self.search_latency = search_latency
+        self.rules = DEFAULT_AI_RULES if rules is None else rules
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="bench-stub")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reply_for(self, prompt: str) -> dict:
+        lowered = prompt.lower()
+        for keyword, reply in self.rules:
+            if keyword in lowered:
+                return reply
+        return DEFAULT_AI_REPLY
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                # DuckDuckGo instant answers: GET /?q=...&format=json
+                stub._count("ddg")
+                time.sleep(stub.search_latency)
+                self._send_json(DDG_REPLY)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                stub._count("chat")
+                prompt = next((m.get("content", "") for m in reversed(request.get("messages", []))
+                               if m.get("role") == "user"), "")
+                content = json.dumps(stub.reply_for(prompt))
+                time.sleep(stub.ttfb)
+                if request.get("stream"):
+                    self._stream(request.get("model", "stub"), content)
+                else:
+                    self._send_json(_completion(request.get("model", "stub"), content))
+
+            def _stream(self, model: str, content: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+                for i, piece in enumerate(pieces):
+                    if i:
+                        time.sleep(stub.chunk_delay)
+                    self._chunk(f"data: {json.dumps(_chunk(model, piece))}\n\n")
+                self._chunk(f"data: {json.dumps(_chunk(model, None, finish='stop'))}\n\n")
+                self._chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, text: str) -> None:
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def _completion(model: str, content: str) -> dict:
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _chunk(model: str, content, finish=None) -> dict:
+    delta = {} if content is None else {"role": "assistant", "content": content}
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+
+
+def install_fake_ytdlp(directory: Path, video_id: str = "dQw4w9WgXcQ", latency: float = 0.05) -> Path:
+    """
+    Write a fake yt-dlp executable that prints a one-entry search result.
+    Prepend the returned directory to PATH to use it.
+
+    Args:
+        directory: Where to write the script
+        video_id: Video id to report
+        latency: Seconds the fake "search" takes
+
+    Returns:
+        The directory containing the script
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps({"entries": [{"id": video_id, "title": "bench"}]})
+    script = (
+        f"import sys, time\n"
+        f"time.sleep({latency!r})\n"
+        f"sys.stdout.write({payload!r})\n"
+    )
+    runner = directory / "yt_dlp_stub.py"
+    runner.write_text(script, encoding="utf-8")
+    if os.name == "nt":
+        (directory / "yt-dlp.bat").write_text(f'@"{sys.executable}" "{runner}" %*\n', encoding="utf-8")
+    else:
+        exe = directory / "yt-dlp"
+        exe.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{runner}" "$@"\n', encoding="utf-8")
+        exe.chmod(exe.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return directory
+
+
+# ==================== PIPELINE ISOLATION ====================
+
+def isolate(tmp: Path, stub_url: str = None) -> None:
+    """
+    Point config at throwaway paths, and the AI and search backends at a
+    stub server. Must run before other Jarvis modules are imported.
+
+    Args:
+        tmp: Directory for the workspace, indexes and caches
+        stub_url: StubServer.url, or None to keep the configured backends
+    """
+    import config
+    config.WORKSPACE_DIR = Path(tmp) / "workspace"
+    config.WORKSPACE_DIR.mkdir(parents=True, exist_ok=True)
+    config.FULLTEXT_DB_PATH = Path(tmp) / "fulltext.db"
+    config.TTS_CACHE_ENABLED = False
+    config.TYPING_STRATEGY = "keys"
+    config.PRELOAD_IN_BACKGROUND = False
+    config.TRACE_ENABLED = False
+    config.METRICS_ENABLED = False
+    config.RECORD_SESSIONS = False
+    config.LOG_CONSOLE = False
+    config.LOG_FILE = None
+    if stub_url:
+        # The stub stands in for a local OpenAI-compatible server; nothing else is tried
+        config.AI_BACKENDS = {"local": {
+            "type": "openai", "base_url": f"{stub_url}/v1", "model": "stub", "api_key": "bench",
+            "timeout": 30, "max_retries": 0, "priority": 0,
+        }}
+        config.AI_BACKEND = ""
+        config.DUCKDUCKGO_API_URL = stub_url
+
+
+class NullController:
+    """Stands in for pynput's keyboard Controller; counts events instead of sending them."""
+
+    def __init__(self):
+        self.events = 0
+
+    def press(self, key):
+        self.events += 1
+
+    def release(self, key):
+        self.events += 1
+
+    def type(self, text):
+        self.events += len(text)
+
+    def tap(self, key):
+        self.events += 2
+
+    def pressed(self, *keys):
+        self.events += 2 * len(keys)
+        return contextlib.nullcontext()
+
+
+def silence_side_effects() -> None:
+    """Disable keystrokes, speech, overlay windows and the browser."""
+    import webbrowser
+    webbrowser.open = lambda *args, **kwargs: True
+    for name in ("actions.typer", "actions.deleter"):
+        try:
+            module = __import__(name, fromlist=["controller"])
+            module.controller = NullController()
+        except Exception:
+            pass
+    try:
+        from actions import overlay
+        overlay.show_answer = lambda text: None
+        overlay.show_output = lambda title, text: None
+    except Exception:
+        pass
+    try:
+        from actions import tts
+        tts.speak = lambda text, coalesce_key=None: None
+        tts.speak_template = lambda template, coalesce_key=None, **values: None
+    except Exception:
+        pass
+
+
+def listener_runner():
+    """
+    Return run(audio, sample_rate=16000, trace=None, recording=None), which
+    drives AudioListener._transcribe_and_route and waits for every action it
+    starts, so the call's duration covers the whole command.
+    """
+    import listener
+    import recorder
+    import tracing
+    from actions import dispatch
+    audio_listener = listener.AudioListener()
+    futures = []
+    original_submit = dispatch.submit
+
+    def tracking_submit(action_dict):
+        spec, future = original_submit(action_dict)
+        if future is not None:
+            futures.append(future)
+        return spec, future
+
+    def run(audio, sample_rate=16000, trace=None, recording=None):
+        futures.clear()
+        listener.dispatch.submit = tracking_submit
+        try:
+            with tracing.use(trace), recorder.use(recording):
+                audio_listener._transcribe_and_route(audio, sample_rate)
+                for future in futures:
+                    future.result(timeout=30)
+        finally:
+            listener.dispatch.submit = original_submit
+
+    return run
@@ -0,0 +1,125 @@
+"""
+Transcription pool benchmark
+Measures decode throughput (seconds of audio transcribed per wall-clock
+second) for the in-process model, for the in-process micro-batcher
+(transcribe_batch) fed by --batch-max concurrent callers, and for
+transcribe_pool with 1..N worker processes, each fed by as many concurrent
+callers as it has workers.
+On a machine with N free cores the pool should scale close to linearly
+until memory bandwidth or the cores run out.
+
+Fixture audio comes from bench_pipeline.load_fixtures (bench_fixtures/ and
+espeak); without any, a synthetic 3 s tone is used, which still exercises
+the full decode. Requires faster-whisper.
+
+Usage:
+    python bench_transcribe_pool.py                   # 1..cpu_count workers
+    python bench_transcribe_pool.py --workers 1,2,4 --requests 24
+    python bench_transcribe_pool.py --model tiny --cpu-threads 1
+    python bench_transcribe_pool.py --workers 1 --batch-max 8 --batch-wait-ms 50
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def _fixtures(tmp: Path) -> list:
+    import bench_pipeline
+    fixtures = [samples for _, samples in bench_pipeline.load_fixtures(tmp)]
+    if not fixtures:
+        print("No fixture audio found; using a synthetic 3 s tone")
+        fixtures = [[0.3 * math.sin(2 * math.pi * 220 * i / 16000) for i in range(3 * 16000)]]
+    return fixtures
+
+
+def _run(transcribe, fixtures: list, requests: int, concurrency: int) -> dict:
+    """Decode `requests` clips with `concurrency` callers; returns wall time and throughput."""
+    clips = [fixtures[i % len(fixtures)] for i in range(requests)]
+    audio_seconds = sum(len(clip) for clip in clips) / 16000
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(transcribe, clips))
+    wall = time.perf_counter() - start
+    return {"wall": wall, "audio_seconds": audio_seconds, "throughput": audio_seconds / wall}
+
+
+def main(argv=None) -> int:
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Throughput of the multi-process transcription pool")
+    parser.add_argument("--workers", default=",".join(str(n) for n in range(1, cores + 1)),
+                        help="Comma-separated worker counts to measure (default 1..cpu_count)")
+    parser.add_argument("--requests", type=int, default=0, help="Clips decoded per run (default 4 x most workers)")
+    parser.add_argument("--cpu-threads", type=int, default=0, help="Threads per worker model (0 = cores / workers)")
+    parser.add_argument("--model", help="Whisper model to load instead of config.WHISPER_MODEL")
+    parser.add_argument("--batch-max", type=int, default=8, help="Batch size for the micro-batching run (1 = skip it)")
+    parser.add_argument("--batch-wait-ms", type=float, default=30, help="Batch window for the micro-batching run")
+    parser.add_argument("--skip-baseline", action="store_true", help="Do not measure the in-process model")
+    args = parser.parse_args(argv)
+
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        print("faster-whisper is not installed; nothing to measure")
+        return 1
+
+    import config
+    import transcribe_pool
+    import transcriber
+    if args.model:
+        config.WHISPER_MODEL = args.model
+    counts = sorted({int(n) for n in args.workers.split(",") if n.strip()})
+    requests = args.requests or 4 * max(counts)
+
+    with tempfile.TemporaryDirectory(prefix="jarvis-bench-") as tmp:
+        fixtures = _fixtures(Path(tmp))
+    print(f"{cores} cores, model {config.WHISPER_MODEL}, {requests} clips per run, {len(fixtures)} distinct clips\n")
+    print(f"{'setup':<24}{'wall s':>10}{'audio s/s':>12}{'speedup':>10}")
+
+    if not args.skip_baseline:
+        config.TRANSCRIBE_WORKERS = 0
+        transcriber.preload()
+        transcriber.transcribe(fixtures[0])  # warm-up
+        result = _run(transcriber.transcribe, fixtures, requests, 1)
+        print(f"{'in-process':<24}{result['wall']:>10.2f}{result['throughput']:>12.2f}{'':>10}")
+
+    if args.batch_max > 1:
+        import transcribe_batch
+        batcher = transcribe_batch.Batcher(transcribe_batch.decode_batch, args.batch_max, args.batch_wait_ms / 1000)
+        try:
+            batcher.transcribe(fixtures[0], 16000)  # warm-up
+            result = _run(lambda clip: batcher.transcribe(clip, 16000), fixtures, requests, args.batch_max)
+        finally:
+            batcher.close()
+        label = f"batched <={args.batch_max} ({args.batch_wait_ms:g}ms)"
+        print(f"{label:<24}{result['wall']:>10.2f}{result['throughput']:>12.2f}{'':>10}")
+
+    base = None
+    for count in counts:
+        pool = transcribe_pool.TranscriptionPool(count, cpu_threads=args.cpu_threads)
+        try:
+            deadline = time.monotonic() + 600
+            while pool.stats()["alive"] < count:
+                if time.monotonic() > deadline:
+                    print(f"{count} workers did not start", file=sys.stderr)
+                    return 1
+                time.sleep(0.1)
+            for _ in range(count):
+                pool.transcribe(fixtures[0], 16000)  # warm-up
+            result = _run(lambda clip: pool.transcribe(clip, 16000), fixtures, requests, count)
+        finally:
+            pool.close()
+        base = base or result["throughput"]
+        label = f"pool x{count} ({pool.cpu_threads} thr)"
+        print(f"{label:<24}{result['wall']:>10.2f}{result['throughput']:>12.2f}{result['throughput'] / base:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    # Guard required: workers are spawned and re-import this module
+    sys.exit(main())
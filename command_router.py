@@ -9,42 +9,109 @@ import json
 from word2number import w2n
 import config
 import ai_handler
-from actions import typer, deleter, overlay
+import metrics
+import tracing
 
 
-def route(transcript: str) -> dict:
+# Clause boundaries in compound commands: "then" or "and" before a fast-path verb,
+# so dictation like "type I'll call you and then we'll talk" stays one clause
+_STEP_SPLIT_RE = re.compile(
+    r"\s*,?\s+(?:(?:and\s+)?then|and)\s+(?=(?:type|delete|search|find)\b)",
+    re.IGNORECASE,
+)
+
+
+def route(transcript: str, announce: bool = True) -> dict:
     """
     Route a transcript to either hardcoded command handler or AI.
     Hardcoded commands are matched first via regex for speed.
+    Compound commands ("type hello then delete two words") become a plan:
+    built locally when every step is a hardcoded command, otherwise by a
+    single AI call for the whole utterance.
+    Actions are executed by the caller through actions.dispatch.
     
     Args:
         transcript: Transcribed voice command (should have wake word already stripped)
+        announce: Debounce repeated fast-path commands and speak an
+            acknowledgement (off in server mode, where commands come from
+            several clients and nothing is spoken locally)
         
     Returns:
         Dict with keys: action, params, answer (for consistency with AI responses)
     """
+    clauses = split_steps(transcript)
+    if len(clauses) > 1:
+        steps = [_match_hardcoded(clause) for clause in clauses]
+        if all(steps):
+            _record_route("fastpath", len(steps))
+            return _sequential_plan(steps)
+        # "type meet and then delete the draft later" is dictation: type it all
+        if not re.match(r"type\s", transcript, re.IGNORECASE):
+            _record_route("llm", len(clauses))
+            return ai_handler.ask_ai(transcript)
     
-    # Simple in-memory debounce to avoid executing identical commands twice in quick succession
-    if not hasattr(route, "_recent_commands"):
-        route._recent_commands = {}
-    import time
-    now = time.time()
+    result = _match_hardcoded(transcript)
+    if result:
+        _record_route("fastpath")
+        return _announce(result) if announce else result
+    
+    # No hardcoded match, route to AI
+    _record_route("llm")
+    return ai_handler.ask_ai(transcript)
+
+
+def _record_route(route_name: str, steps: int = 1) -> None:
+    """Count the route taken and tag the current trace with it."""
+    metrics.COMMANDS.inc(route_name)
+    trace = tracing.current()
+    if trace is not None:
+        trace.set(route=route_name, steps=steps)
+
+
+def strip_wake_word(transcript: str):
+    """
+    Remove the wake word (and punctuation after it) from the start of a transcript.
+    
+    Args:
+        transcript: Full transcript, e.g. "Jarvis, type hello"
+        
+    Returns:
+        The command ("" if nothing follows the wake word), or None if the
+        transcript does not start with the wake word
+    """
+    # Allow punctuation like commas after the wake word
+    pattern = rf"^\s*{re.escape(config.WAKE_NAME)}\b[\s,:-]*?(.*)$"
+    m = re.match(pattern, transcript, re.IGNORECASE)
+    if not m:
+        return None
+    # Remove leading non-word characters (commas, punctuation, etc.) and surrounding whitespace
+    return re.sub(r"^[\s\W_]+", "", m.group(1)).strip()
+
+
+def split_steps(transcript: str) -> list:
+    """
+    Split a compound command into its clauses.
+    
+    Args:
+        transcript: Command with the wake word stripped
+        
+    Returns:
+        List of non-empty clauses (a single element for simple commands)
+    """
+    return [c.strip() for c in _STEP_SPLIT_RE.split(transcript) if c.strip()]
 
+
+def _match_hardcoded(transcript: str):
+    """
+    Match one clause against the hardcoded commands without executing it.
+    
+    Returns:
+        Action dict, or None if the clause needs the AI
+    """
     # Handle "type" command
     type_match = re.match(r"type\s+(.+)", transcript, re.IGNORECASE)
     if type_match:
         text_to_type = type_match.group(1).strip()
-        last = route._recent_commands.get(("type", text_to_type))
-        if last and (now - last) < 1.0:
-            return {"action": "type", "params": {"text": text_to_type}, "answer": f"Already typed: {text_to_type}"}
-        route._recent_commands[("type", text_to_type)] = now
-        # Announce via TTS, then type
-        try:
-            from actions import tts
-            tts.speak(f"Typing {text_to_type} now")
-        except Exception:
-            pass
-        typer.type_text(text_to_type)
         return {
             "action": "type",
             "params": {"text": text_to_type},
@@ -54,19 +121,8 @@ def route(transcript: str) -> dict:
     # Handle "delete N characters" command
     delete_chars_match = re.match(r"delete\s+(\w+)\s+characters?", transcript, re.IGNORECASE)
     if delete_chars_match:
-        num_str = delete_chars_match.group(1).lower()
         try:
-            count = _parse_number(num_str)
-            last = route._recent_commands.get(("delete_chars", count))
-            if last and (now - last) < 1.0:
-                return {"action": "delete_chars", "params": {"count": count}, "answer": f"Already deleted {count} characters."}
-            route._recent_commands[("delete_chars", count)] = now
-            try:
-                from actions import tts
-                tts.speak(f"Deleting {count} characters now")
-            except Exception:
-                pass
-            deleter.delete_chars(count)
+            count = _parse_number(delete_chars_match.group(1).lower())
             return {
                 "action": "delete_chars",
                 "params": {"count": count},
@@ -78,19 +134,8 @@ def route(transcript: str) -> dict:
     # Handle "delete N words" command
     delete_words_match = re.match(r"delete\s+(\w+)\s+words?", transcript, re.IGNORECASE)
     if delete_words_match:
-        num_str = delete_words_match.group(1).lower()
         try:
-            count = _parse_number(num_str)
-            last = route._recent_commands.get(("delete_words", count))
-            if last and (now - last) < 1.0:
-                return {"action": "delete_words", "params": {"count": count}, "answer": f"Already deleted {count} words."}
-            route._recent_commands[("delete_words", count)] = now
-            try:
-                from actions import tts
-                tts.speak(f"Deleting {count} words now")
-            except Exception:
-                pass
-            deleter.delete_words(count)
+            count = _parse_number(delete_words_match.group(1).lower())
             return {
                 "action": "delete_words",
                 "params": {"count": count},
@@ -99,8 +144,72 @@ def route(transcript: str) -> dict:
         except ValueError:
             pass  # Fall through to AI
     
-    # No hardcoded match, route to AI
-    return ai_handler.ask_ai(transcript)
+    # Handle "search my notes/files for X" (answered locally by the full-text index)
+    search_match = re.match(r"(?:search|find)\s+(?:in\s+)?(?:my\s+)?(?:notes|files)\s+(?:for|about)\s+(.+)", transcript, re.IGNORECASE)
+    if search_match:
+        query = search_match.group(1).strip().rstrip(".?!")
+        return {
+            "action": "search_files",
+            "params": {"query": query},
+            "answer": f"Searching your notes for {query}"
+        }
+    
+    return None
+
+
+# Spoken acknowledgement per hardcoded action, so the user hears it before the keys land
+_ACKS = {
+    "type": ("Typing {text} now", "text"),
+    "delete_chars": ("Deleting {count} characters now", "count"),
+    "delete_words": ("Deleting {count} words now", "count"),
+}
+
+
+def _announce(result: dict) -> dict:
+    """
+    Debounce and acknowledge a single hardcoded command.
+    Identical commands within a second are turned into a no-op response.
+    """
+    # Simple in-memory debounce to avoid executing identical commands twice in quick succession
+    if not hasattr(route, "_recent_commands"):
+        route._recent_commands = {}
+    import time
+    now = time.time()
+    
+    action = result["action"]
+    if action not in _ACKS:
+        return result
+    template, field = _ACKS[action]
+    value = result["params"][field]
+    last = route._recent_commands.get((action, value))
+    if last and (now - last) < 1.0:
+        return {"action": "respond", "params": {}, "answer": f"Already done: {result['answer']}"}
+    route._recent_commands[(action, value)] = now
+    if config.HEADLESS:
+        return result
+    try:
+        from actions import tts
+        tts.speak_template(template, coalesce_key="ack", **{field: value})
+    except Exception:
+        pass
+    return result
+
+
+def _sequential_plan(steps: list) -> dict:
+    """Chain locally matched steps into a plan where each waits for the previous one."""
+    plan_steps = []
+    for index, step in enumerate(steps, 1):
+        plan_steps.append({
+            "id": str(index),
+            "action": step["action"],
+            "params": step["params"],
+            "after": [str(index - 1)] if index > 1 else [],
+        })
+    return {
+        "action": "plan",
+        "params": {"steps": plan_steps},
+        "answer": " ".join(step["answer"] for step in steps)
+    }
 
 
 def _parse_number(num_str: str) -> int:
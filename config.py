@@ -11,6 +11,22 @@ import os
 WAKE_NAME = "jarvis"  # Configurable wake word (case-insensitive)
 # Whisper model choices: tiny, base, small, medium, large
 WHISPER_MODEL = "small"
+# Cascade: decode with this fast model first and re-decode with WHISPER_MODEL only
+# when unsure (both stay loaded); "" disables. In-process decoding only
+WHISPER_FAST_MODEL = ""  # e.g. "tiny.en" or "base.en"
+CASCADE_MIN_AVG_LOGPROB = -0.6  # Escalate if a segment's mean token log-probability is lower
+CASCADE_MAX_NO_SPEECH_PROB = 0.4  # Escalate if a segment is more likely than this to be non-speech
+CASCADE_REQUIRE_WAKE_WORD = True  # Escalate if the fast transcript does not start with WAKE_NAME
+# Decode in separate processes, each with its own model, so concurrent commands
+# (server mode, replay) do not queue on one model; 0 decodes in this process
+TRANSCRIBE_WORKERS = 0
+TRANSCRIBE_CPU_THREADS = 0  # Threads per worker model (0 = cores split evenly across workers)
+TRANSCRIBE_TIMEOUT = 60  # Seconds before a decode is abandoned and its worker restarted
+TRANSCRIBE_HEALTH_SECONDS = 10  # Interval between pings of idle workers
+# In-process only (TRANSCRIBE_WORKERS = 0): concurrent requests arriving close together
+# are decoded in one batched call; a longer wait fills bigger batches but delays each one
+TRANSCRIBE_BATCH_MAX = 1  # Requests per batch (1 = no batching)
+TRANSCRIBE_BATCH_WAIT_MS = 30  # Longest a batch stays open after its first request arrives
 
 # ==================== WORKSPACE & FILES ====================
 WORKSPACE_DIR = Path("~/jarvis/workspace").expanduser()
@@ -21,32 +37,173 @@ try:
 except Exception as e:
     print(f"Warning: Could not create workspace directory at {WORKSPACE_DIR}: {e}")
 
-# ==================== AI BACKEND ====================
-# Primary backend: "groq" or "openrouter"
-AI_BACKEND = "groq"
+# Spoken file names are matched fuzzily against an index of the workspace
+FILE_INDEX_POLL_SECONDS = 2.0  # Minimum time between directory mtime polls
+FILE_INDEX_MIN_SCORE = 0.5  # Minimum match score (0-1) to accept a fuzzy match
+
+# Large files are never read whole: bigger than FILE_PREVIEW_BYTES -> preview only
+FILE_PREVIEW_BYTES = 64 * 1024  # Files up to this size are returned in full
+FILE_PREVIEW_LINES = 40  # Lines shown when previewing a larger file
+FILE_READ_MAX_BYTES = 256 * 1024  # Cap on text returned by head/tail/range/grep
+FILE_GREP_MAX_MATCHES = 20  # Stop searching a file after this many matches
+
+# Appends are buffered and written in batches; create_file writes atomically
+FILE_APPEND_FLUSH_SECONDS = 1.0  # Max time an append waits in memory
+FILE_APPEND_FLUSH_BYTES = 64 * 1024  # Flush a file's buffer once it reaches this size
+FILE_APPEND_IDLE_SECONDS = 30.0  # Close a file handle after this long without appends
+FILE_DURABLE_WRITES = False  # fsync after every write/flush (slower, survives power loss)
+
+# Offline full-text search over workspace notes (SQLite FTS5)
+FULLTEXT_DB_PATH = Path("~/jarvis/fulltext.db").expanduser()
+FULLTEXT_EXTENSIONS = frozenset({".txt", ".md", ".rst", ".log", ".csv", ".json", ".py", ".html"})
+FULLTEXT_MAX_FILE_BYTES = 2 * 1024 * 1024  # Only the first 2 MB of each file is indexed
+FULLTEXT_MAX_RESULTS = 3
 
-# Groq Configuration (Primary)
+# ==================== AI BACKEND ====================
+# Groq Configuration
 # Load keys from environment variables for safety (do NOT commit keys to git)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
-# OpenRouter Configuration (Fallback)
+# OpenRouter Configuration
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "mistralai/Mistral-7B-Instruct-v0.1")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# Local OpenAI-compatible server (llama.cpp `llama-server`, vLLM, Ollama, LM Studio)
+# on this machine or the LAN; commands answered here never leave your network
+LOCAL_AI_URL = os.getenv("JARVIS_LOCAL_AI_URL", "")  # e.g. http://127.0.0.1:8080/v1; empty disables
+LOCAL_AI_MODEL = os.getenv("JARVIS_LOCAL_AI_MODEL", "local")
+
+# Backends are tried in priority order (lowest first) until one answers.
+#   type: "groq" (groq SDK) or "openai" (any OpenAI-compatible API)
+#   timeout: seconds per request; max_retries: SDK retries before falling back
+# Entries without an api_key, or with enabled=False, are skipped
+AI_BACKENDS = {
+    "local": {
+        "type": "openai", "base_url": LOCAL_AI_URL, "model": LOCAL_AI_MODEL, "api_key": "local",
+        "timeout": 10, "max_retries": 0, "priority": 0, "enabled": bool(LOCAL_AI_URL),
+    },
+    "groq": {
+        "type": "groq", "model": GROQ_MODEL, "api_key": GROQ_API_KEY,
+        "timeout": 15, "max_retries": 2, "priority": 1,
+    },
+    "openrouter": {
+        "type": "openai", "base_url": OPENROUTER_BASE_URL, "model": OPENROUTER_MODEL, "api_key": OPENROUTER_API_KEY,
+        "timeout": 30, "max_retries": 2, "priority": 2, "headers": {"HTTP-Referer": "jarvis-assistant"},
+    },
+}
+# Name of a backend to try before all others regardless of priority ("" = by priority)
+AI_BACKEND = ""
 
 # ==================== TEXT-TO-SPEECH ====================
 # Run `python list_voices.py` to see available voices
 TTS_VOICE_INDEX = 0  # Voice index (0 is default, try 1, 2, etc.)
 TTS_RATE = 140  # Words per minute (typical range: 80-200)
+TTS_MAX_CHUNK_CHARS = 200  # Long sentences are split at commas beyond this length
+
+# Pre-rendered audio for fixed phrases (acknowledgements start without engine latency)
+TTS_CACHE_ENABLED = True
+TTS_CACHE_DIR = Path("~/jarvis/tts_cache").expanduser()
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024  # On-disk limit, least recently used evicted first
+TTS_CACHE_MEMORY_BYTES = 8 * 1024 * 1024  # In-memory limit for decoded PCM
+# Rendered in the background at startup; other fixed phrases are added after first use
+TTS_CACHE_PHRASES = ["Typing", "now", "Deleting", "characters now", "words now"] + [str(n) for n in range(1, 21)]
+
+# ==================== TYPING ====================
+# "auto" types short text key by key and pastes long text via the clipboard;
+# force one with "keys", "chunked" or "paste"
+TYPING_STRATEGY = "auto"
+TYPING_PASTE_THRESHOLD = 40  # Characters above which "auto" switches to pasting
+TYPING_CHUNK_SIZE = 50  # Characters per burst for the "chunked" strategy
+TYPING_CHUNK_PAUSE = 0.02  # Seconds between chunks (raise if the target app drops keys)
+TYPING_CLIPBOARD_RESTORE_DELAY = 0.15  # Seconds to wait before restoring the clipboard
+
+# Deleting at least this many characters first removes whole line segments
+# (Shift+Home, measured via the clipboard) before selecting the rest
+DELETE_LINE_SELECT_THRESHOLD = 80
+DELETE_CLIPBOARD_WAIT = 0.05  # Seconds to wait for a copy to reach the clipboard
 
 # ==================== UI & DISPLAY ====================
 OVERLAY_DURATION = 5  # Seconds before overlay auto-dismisses
+# Scrollable viewer for file/command/clipboard output
+OVERLAY_VIEWER_DURATION = 20  # Seconds of inactivity before the viewer closes
+OVERLAY_VIEWER_LINES = 20  # Visible rows
+OVERLAY_VIEWER_COLUMNS = 90  # Visible width in characters
+OVERLAY_VIEWER_MAX_LINE_CHARS = 400  # Longer lines are truncated on screen
+HEADLESS = False  # No overlay or speech; set by `python main.py --serve`
+
+# ==================== APPLICATIONS ====================
+# Minimum fuzzy-match score (0-1) before open_app launches the best match
+APP_LAUNCHER_MIN_SCORE = 0.45
+# Only GUI apps (.desktop entries, app bundles, Start Menu) are launchable by default;
+# True also indexes every $PATH executable
+APP_LAUNCHER_SCAN_PATH = False
+# Never launched by open_app, whatever the source
+APP_LAUNCHER_DENYLIST = frozenset({
+    "reboot", "poweroff", "shutdown", "halt", "init", "telinit", "systemctl", "loginctl",
+    "rm", "rmdir", "dd", "mkfs", "fdisk", "parted", "wipefs", "shred", "format", "diskpart",
+    "kill", "killall", "pkill", "sudo", "su", "doas", "pkexec", "chmod", "chown", "passwd",
+})
+
+# ==================== ACTIONS ====================
+ACTION_MAX_WORKERS = 4  # Actions running concurrently
+ACTION_MAX_PENDING = 8  # Actions allowed to queue before new ones are rejected
+ACTION_DEFAULT_TIMEOUT = 10  # Seconds, unless an action declares its own
+PLAN_MAX_STEPS = 8  # Most steps accepted in one multi-action plan
+
+# ==================== STARTUP ====================
+# Load the speech model, AI clients, TTS engine and overlay in the background
+# once the mouse listener is live (otherwise each loads on first use)
+PRELOAD_IN_BACKGROUND = True
+
+# ==================== DIAGNOSTICS ====================
+LOG_LEVEL = "INFO"  # DEBUG adds raw AI responses and audio diagnostics
+LOG_CONSOLE = True  # Also write log lines to stdout
+LOG_FILE = Path("~/jarvis/jarvis.log").expanduser()  # JSON lines; None to disable
+LOG_MAX_BYTES = 5 * 1024 * 1024  # Rotate the log file at this size
+LOG_BACKUPS = 3  # Rotated log files to keep
+LOG_QUEUE_SIZE = 10000  # Records buffered for the writer thread before new ones are dropped
+TRACE_ENABLED = True  # Record per-command latency traces
+TRACE_FILE = Path("~/jarvis/traces.jsonl").expanduser()  # Report: python tracing.py --since 60
+TRACE_MAX_BYTES = 5 * 1024 * 1024  # Rotate the trace file at this size
+TRACE_BACKUPS = 3  # Rotated trace files to keep
+TRACE_GRACE_SECONDS = 5.0  # Wait for late spans (overlay, TTS, background actions) before writing
+METRICS_ENABLED = True  # Serve Prometheus metrics at http://METRICS_HOST:METRICS_PORT/metrics
+METRICS_HOST = "127.0.0.1"  # Keep on localhost; metrics include command counts
+METRICS_PORT = 9464
+# Opt-in: keep each utterance (audio, transcript, routed action, stage timings)
+# as a local corpus for replay.py; audio never leaves this machine
+RECORD_SESSIONS = False
+RECORD_DIR = Path("~/jarvis/corpus").expanduser()
+RECORD_MAX_BYTES = 500 * 1024 * 1024  # Recording stops once the corpus reaches this size
+
+# ==================== SERVER MODE ====================
+# `python main.py --serve`: HTTP/WebSocket API for thin clients, one shared model
+SERVER_HOST = "127.0.0.1"  # "0.0.0.0" accepts other machines (set SERVER_TOKEN first)
+SERVER_PORT = 8765
+SERVER_TOKEN = os.getenv("JARVIS_SERVER_TOKEN", "")  # If set, clients send "Authorization: Bearer <token>"
+SERVER_WORKERS = 4  # Requests processed at once (transcription, routing, action)
+SERVER_MAX_QUEUE = 32  # Requests waiting across all clients before new ones get 503
+SERVER_MAX_PER_CLIENT = 4  # Requests one client may have in flight before it gets 429
+SERVER_MAX_AUDIO_SECONDS = 30  # Longer uploads and streams are rejected
+SERVER_REQUEST_TIMEOUT = 60  # Seconds a request may take, queueing included
+# Actions on the user's own desktop are returned for the client to perform, not run on the server
+SERVER_CLIENT_ACTIONS = frozenset({
+    "type", "delete_chars", "delete_words", "open_app", "watch_youtube", "clipboard_write", "clipboard_read",
+})
+
+# ==================== COMMAND-LINE CLIENT ====================
+# The running assistant takes text commands from `./jarvis` on this Unix socket
+# (owner-only); None disables it. The client also reads JARVIS_SOCKET
+DAEMON_SOCKET = Path(os.getenv("JARVIS_SOCKET", "~/jarvis/jarvis.sock")).expanduser()
 
 # ==================== SEARCH ====================
 SEARCH_ENGINE = "duckduckgo"  # Free, no API key required
+DUCKDUCKGO_API_URL = "https://api.duckduckgo.com"
 
 
-# Safety: warn if API keys are not set
-if not GROQ_API_KEY and not OPENROUTER_API_KEY:
-    print("⚠️ Warning: No AI API keys found in environment. AI features will be disabled until you set GROQ_API_KEY or OPENROUTER_API_KEY.")
+# Safety: warn if no AI backend can be used
+if not any(spec.get("api_key") and spec.get("enabled", True) for spec in AI_BACKENDS.values()):
+    print("⚠️ Warning: No AI API keys found in environment. AI features will be disabled until you set GROQ_API_KEY, OPENROUTER_API_KEY or JARVIS_LOCAL_AI_URL.")
 
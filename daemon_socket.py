@@ -0,0 +1,156 @@
+"""
+Daemon Socket Module
+Local control socket for the running assistant. The `jarvis` command-line
+client sends text commands (or paths to WAV files) over a Unix socket, and
+they run through the same warm pipeline as spoken ones: loaded speech
+model, open AI connections, caches. Scripts get an answer in milliseconds
+instead of paying a cold start per run.
+
+The socket file is created owner-only (0600); anyone who can open it can
+run commands as this user, like the mouse listener.
+
+Protocol: one JSON object per line each way, any number per connection.
+    {"text": "what time is it", "wake": false}
+    {"wav": "/abs/path/command.wav", "wake": false}
+    {"ping": true}
+Answered with the server.handle_command result ({transcript, command,
+action, params, answer, executed, ms}), {"pong": pid}, or {"error": "..."}.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import config
+import log
+import metrics
+
+_log = log.get_logger("daemon_socket")
+
+REQUESTS = metrics.counter("jarvis_daemon_requests_total", "Daemon socket requests, by kind and status", ("kind", "status"))
+
+_MAX_LINE_BYTES = 64 * 1024
+
+
+def _handle(request: dict) -> dict:
+    """Run one client request and return its response."""
+    import server
+    if request.get("ping"):
+        return {"pong": os.getpid()}
+    require_wake = bool(request.get("wake"))
+    if "text" in request:
+        text = request["text"]
+        if not isinstance(text, str) or not text.strip():
+            raise server.RequestError("'text' must be a non-empty string")
+        return server.handle_command(text, require_wake, local=True)
+    if "wav" in request:
+        try:
+            with open(request["wav"], "rb") as f:
+                samples, sample_rate = server._decode_wav(f.read())
+        except (OSError, TypeError) as e:
+            raise server.RequestError(f"Cannot read WAV: {e}")
+        server._check_duration(samples, sample_rate)
+        return server.handle_audio(samples, sample_rate, require_wake, local=True)
+    raise server.RequestError("Expected 'text', 'wav' or 'ping'")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline(_MAX_LINE_BYTES + 1)
+            if not line:
+                return
+            kind = "invalid"
+            oversized = len(line) > _MAX_LINE_BYTES
+            # Skip the rest of an oversized line so it is answered once, not parsed as more requests
+            chunk = line
+            while oversized and chunk and not chunk.endswith(b"\n"):
+                chunk = self.rfile.readline(_MAX_LINE_BYTES + 1)
+            try:
+                if oversized:
+                    raise ValueError(f"Request longer than {_MAX_LINE_BYTES} bytes")
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+                kind = "ping" if request.get("ping") else "wav" if "wav" in request else "text"
+                response = _handle(request)
+                REQUESTS.inc(kind, "ok")
+            except Exception as e:
+                REQUESTS.inc(kind, "error")
+                _log.warning("Daemon socket request failed: %s", e)
+                response = {"error": str(e)}
+            try:
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+_server = None
+_lock = threading.Lock()
+
+
+def _in_use(path) -> bool:
+    """True if another process is already answering on the socket."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def start(path=None):
+    """
+    Listen for CLI clients on a background thread.
+
+    Args:
+        path: Socket path (config.DAEMON_SOCKET if None)
+
+    Returns:
+        The running server, or None if sockets are unavailable or another
+        instance owns the path
+    """
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        path = path or config.DAEMON_SOCKET
+        if not hasattr(socket, "AF_UNIX"):
+            _log.warning("Unix sockets are not available on this platform; the jarvis CLI is disabled")
+            return None
+        if os.path.exists(path):
+            if _in_use(path):
+                _log.warning("Another Jarvis is already listening on %s; CLI socket not started", path)
+                return None
+            os.unlink(path)  # Left behind by a process that did not exit cleanly
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        server = _Server(str(path), _Handler)
+        os.chmod(path, 0o600)
+        threading.Thread(target=server.serve_forever, daemon=True, name="jarvis-daemon-socket").start()
+        _server = server
+        _log.info("✓ CLI socket listening on %s", path)
+        return server
+
+
+def stop() -> None:
+    """Stop listening and remove the socket file."""
+    global _server
+    with _lock:
+        if _server is None:
+            return
+        path = _server.server_address
+        _server.shutdown()
+        _server.server_close()
+        _server = None
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
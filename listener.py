@@ -4,13 +4,19 @@ Listens for middle mouse button (scroll wheel), records audio on press, transcri
 Runs in background thread without blocking main process.
 """
 
+import sys
 import threading
-import sounddevice as sd
+import time
 from pynput import mouse
 import config
+import log
 import transcriber
 import command_router
-from actions import overlay
+import recorder
+import tracing
+from actions import dispatch, overlay
+
+_log = log.get_logger("listener")
 
 
 class AudioListener:
@@ -21,6 +27,7 @@ class AudioListener:
         self.audio_buffer = []
         self.mouse_listener = None
         self.sample_rate = 16000  # Whisper expects 16kHz
+        self.trace = None
     
     def start(self) -> None:
         """Start listening for middle-click events."""
@@ -28,7 +35,7 @@ class AudioListener:
             on_click=self._on_click
         )
         self.mouse_listener.start()
-        print("✓ Listening for middle-click... (Press scroll wheel to activate)")
+        _log.info("✓ Listening for middle-click... (Press scroll wheel to activate)")
     
     def stop(self) -> None:
         """Stop listening for events."""
@@ -55,7 +62,15 @@ class AudioListener:
         if not self.is_recording:
             self.is_recording = True
             self.audio_buffer = []
-            print("[REC]", end=" ", flush=True)
+            # Session recording keeps stage timings even when tracing is off
+            self.trace = tracing.start_trace(required=config.RECORD_SESSIONS)
+            _log.info("[REC]")
+            
+            # Barge-in: a new command makes any speech still playing stale.
+            # Only if TTS is already loaded; importing it here would delay recording.
+            tts = sys.modules.get("actions.tts")
+            if tts is not None:
+                tts.interrupt()
             
             # Start recording in dedicated thread
             threading.Thread(target=self._record_audio, daemon=True).start()
@@ -63,6 +78,8 @@ class AudioListener:
     def _record_audio(self) -> None:
         """Record audio until is_recording is False."""
         try:
+            # Imported here so startup does not load PortAudio (preloaded in the background)
+            import sounddevice as sd
             with sd.InputStream(
                 channels=1,
                 samplerate=self.sample_rate,
@@ -73,7 +90,7 @@ class AudioListener:
                     data, _ = stream.read(1024)
                     self.audio_buffer.append(data)
         except Exception as e:
-            print(f"\nMicrophone error: {e}")
+            _log.error("Microphone error: %s", e)
             self.is_recording = False
     
     def _stop_and_process(self) -> None:
@@ -82,13 +99,21 @@ class AudioListener:
             return
         
         self.is_recording = False
-        print("[END]")
+        _log.info("[END]")
+        
+        trace = self.trace
+        if trace is not None:
+            trace.released = time.perf_counter()
+            trace.add_span("capture", trace.started, trace.released)
         
         if not self.audio_buffer:
-            print("No audio captured")
+            _log.info("No audio captured")
+            if trace is not None:
+                trace.finish()
             return
         
         # Concatenate audio chunks
+        concat_start = time.perf_counter()
         try:
             # Flatten all audio chunks into a single buffer
             audio_data = []
@@ -98,16 +123,33 @@ class AudioListener:
                 else:
                     audio_data.extend(chunk)
         except Exception as e:
-            print(f"Error processing audio: {e}")
+            _log.error("Error processing audio: %s", e)
+            if trace is not None:
+                trace.finish()
             return
+        if trace is not None:
+            trace.add_span("concat", concat_start, time.perf_counter())
+        
+        recording = recorder.start(audio_data, self.sample_rate)
         
         # Process in background thread to avoid blocking
         threading.Thread(
-            target=self._transcribe_and_route,
-            args=(audio_data, self.sample_rate),
+            target=self._traced_transcribe_and_route,
+            args=(audio_data, self.sample_rate, trace, recording),
             daemon=True
         ).start()
     
+    def _traced_transcribe_and_route(self, audio_data, sample_rate: int, trace, recording=None) -> None:
+        """Run _transcribe_and_route with the command's trace (and recording) current on this thread."""
+        with tracing.use(trace), recorder.use(recording):
+            try:
+                self._transcribe_and_route(audio_data, sample_rate)
+            finally:
+                if recording is not None:
+                    recording.finish(trace)
+                if trace is not None:
+                    trace.finish()
+    
     def _transcribe_and_route(self, audio_data, sample_rate: int) -> None:
         """
         Transcribe audio and route command.
@@ -115,136 +157,82 @@ class AudioListener:
         """
         try:
             # Transcribe
-            transcript = transcriber.transcribe(audio_data, sample_rate=sample_rate)
+            with tracing.span("transcribe"):
+                transcript = transcriber.transcribe(audio_data, sample_rate=sample_rate)
+            recorder.note(transcript=transcript)
             if not transcript:
-                print("Transcription failed or produced empty result")
+                _log.warning("Transcription failed or produced empty result")
                 return
             
-            print(f"Transcript: {transcript}")
+            _log.info("Transcript: %s", transcript)
             
-            # Check for wake word (allow punctuation like commas after the wake word)
-            import re
-            pattern = rf"^\s*{re.escape(config.WAKE_NAME)}\b[\s,:-]*?(.*)$"
-            m = re.match(pattern, transcript, re.IGNORECASE)
-            if not m:
-                print(f"No wake word detected (looking for: {config.WAKE_NAME})")
+            # Check for wake word
+            with tracing.span("wake"):
+                command = command_router.strip_wake_word(transcript)
+            if command is None:
+                _log.info("No wake word detected (looking for: %s)", config.WAKE_NAME)
                 return
-            # Extract command after wake word and sanitize leading punctuation/whitespace
-            command = m.group(1)
-            # Remove leading non-word characters (commas, punctuation, etc.) and surrounding whitespace
-            command = re.sub(r"^[\s\W_]+", "", command).strip()
             if not command:
-                print("No command after wake word")
+                _log.info("No command after wake word")
                 return
             
-            print(f"Command: {command}")
+            _log.info("Command: %s", command)
             
             # Route command
-            result = command_router.route(command)
-            
-            # Execute action based on result
-            self._execute_action(result)
+            with tracing.span("route"):
+                result = command_router.route(command)
+            recorder.note(command=command, action=dict(result))
+            
+            # Start the action on the action pool
+            spec, future = self._execute_action(result)
+            
+            # Actions that produce the answer (e.g. notes search) are awaited;
+            # everything else runs in parallel with the overlay
+            if spec is not None and spec.answers:
+                try:
+                    answer = dispatch.wait(spec, future)
+                    if answer:
+                        result["answer"] = answer
+                except Exception as e:
+                    _log.error("Error executing action: %s", e)
+                    result["answer"] = f"Error: {e}"
+            elif future is not None:
+                future.add_done_callback(_report_action_error)
             
             # Show answer overlay
             answer_text = result.get("answer", "Done")
+            recorder.note(answer=answer_text)
             overlay.show_answer(answer_text)
         
         except Exception as e:
-            print(f"Error processing command: {e}")
+            _log.error("Error processing command: %s", e)
             overlay.show_answer(f"Error: {str(e)}")
     
-    def _execute_action(self, action_dict: dict) -> None:
+    def _execute_action(self, action_dict: dict):
         """
-        Execute the action from the AI response or hardcoded handler.
+        Start the action from the AI response or hardcoded handler,
+        including multi-step plans.
         
         Args:
             action_dict: Dict with keys: action, params, answer
+            
+        Returns:
+            Tuple of (ActionSpec, Future) from dispatch.submit, or (None, None)
         """
         try:
-            action = action_dict.get("action", "respond")
-            params = action_dict.get("params", {})
-            
-            # Hardcoded actions are already executed by command_router
-            # So we only handle AI-returned actions here
-            
-            if action == "web_search":
-                from actions import searcher
-                query = params.get("query", "")
-                if query:
-                    result = searcher.web_search(query)
-                    print(f"Search result: {result}")
-            
-            elif action == "watch_youtube":
-                from actions import youtube
-                query = params.get("query", "")
-                if query:
-                    youtube.watch_youtube(query)
-            
-            elif action == "open_app":
-                from actions import shell_ops
-                app_name = params.get("name", "")
-                if app_name:
-                    try:
-                        shell_ops.run_command(f"open {app_name}")
-                    except Exception:
-                        print(f"Could not open app: {app_name}")
-            
-            elif action == "create_file":
-                from actions import file_ops
-                filename = params.get("name", "")
-                content = params.get("content", "")
-                if filename:
-                    file_ops.create_file(filename, content)
-            
-            elif action == "read_file":
-                from actions import file_ops
-                filename = params.get("name", "")
-                if filename:
-                    content = file_ops.read_file(filename)
-                    print(f"File content: {content}")
-            
-            elif action == "run_command":
-                from actions import shell_ops
-                cmd = params.get("cmd", "")
-                if cmd:
-                    output = shell_ops.run_command(cmd)
-                    print(f"Command output: {output}")
-            
-            elif action == "clipboard_write":
-                import pyperclip
-                text = params.get("text", "")
-                if text:
-                    pyperclip.copy(text)
-            
-            elif action == "clipboard_read":
-                import pyperclip
-                content = pyperclip.paste()
-                print(f"Clipboard: {content}")
-            
-            elif action == "system_info":
-                import platform
-                import psutil
-                import datetime
-                metric = params.get("metric", "time")
-                if metric == "time":
-                    info = str(datetime.datetime.now().strftime("%H:%M:%S"))
-                elif metric == "battery":
-                    try:
-                        info = f"{psutil.sensors_battery().percent}%"
-                    except Exception:
-                        info = "Battery info unavailable"
-                elif metric == "disk":
-                    info = f"{psutil.disk_usage('/').percent}% used"
-                else:
-                    info = "Unknown metric"
-                print(f"System info: {info}")
-            
-            elif action == "respond":
-                # Just show the answer (already handled by overlay)
-                pass
-        
-        except Exception as e:
-            print(f"Error executing action: {e}")
+            return dispatch.submit(action_dict)
+        except ValueError as e:
+            # Keep the AI's answer; the action itself is skipped
+            _log.error("Error executing action: %s", e)
+            return None, None
+
+
+def _report_action_error(future) -> None:
+    """Print errors from actions nobody waits on."""
+    error = future.exception()
+    if error is not None:
+        _log.error("Error executing action: %s", error)
+        overlay.show_answer(f"Error: {error}")
 
 
 # Global listener instance
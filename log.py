@@ -0,0 +1,199 @@
+"""
+Log Module
+Leveled, structured logging that never blocks the pipeline threads.
+Records are put on a bounded queue and written by a background thread to
+the console (plain text, as before) and to a size-rotated JSONL file.
+Disabled levels cost one integer comparison; messages use lazy %-style
+formatting, so arguments are only formatted if the record is written.
+
+Usage:
+    import log
+    _log = log.get_logger("listener")
+    _log.info("Transcript: %s", transcript)
+    _log.debug("Raw response from %s: %.200s", backend, text, extra={"backend": backend})
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import config
+
+# Attributes every LogRecord has; anything else came from extra= and is a structured field
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class _DroppingQueueHandler(logging.Handler):
+    """
+    Enqueue records without blocking. When the writer falls behind and the
+    queue is full, records are dropped and counted instead of stalling the caller.
+    """
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__()
+        self.queue = record_queue
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # Format in the writer thread, but resolve args now: they may be mutated later
+            record.msg = record.getMessage()
+            record.args = None
+            record.exc_text = logging.Formatter().formatException(record.exc_info) if record.exc_info else None
+            record.exc_info = None
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Plain messages for INFO (matching the old print output), level prefix otherwise."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if record.levelno != logging.INFO:
+            message = f"[{record.levelname}] {message}"
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, plus extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _Writer(threading.Thread):
+    """Background thread that hands queued records to the real handlers."""
+
+    _STOP = object()
+
+    def __init__(self, record_queue: queue.Queue, handlers: list):
+        super().__init__(daemon=True, name="jarvis-log")
+        self.queue = record_queue
+        self.handlers = handlers
+
+    def run(self):
+        # Opened here so startup does not import logging.handlers or touch the disk
+        file_handler = _make_file_handler()
+        if file_handler is not None:
+            self.handlers.append(file_handler)
+        while True:
+            record = self.queue.get()
+            if record is self._STOP:
+                break
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    try:
+                        handler.handle(record)
+                    except Exception:
+                        pass
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        # Blocking put: the writer is draining, so this waits at most for the backlog
+        try:
+            self.queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.join(timeout)
+
+
+def _make_file_handler():
+    if not config.LOG_FILE:
+        return None
+    from logging.handlers import RotatingFileHandler
+    try:
+        config.LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            config.LOG_FILE, maxBytes=config.LOG_MAX_BYTES,
+            backupCount=config.LOG_BACKUPS, encoding="utf-8", delay=True,
+        )
+    except OSError as e:
+        print(f"Log file unavailable: {e}")
+        return None
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+_root = logging.getLogger("jarvis")
+_queue_handler = None
+_writer = None
+_setup_lock = threading.Lock()
+
+
+def setup(level: str = None) -> None:
+    """
+    Configure the "jarvis" logger tree (idempotent; runs on first import).
+
+    Args:
+        level: Level name such as "DEBUG" or "INFO" (config.LOG_LEVEL if None)
+    """
+    global _queue_handler, _writer
+    with _setup_lock:
+        _root.setLevel(getattr(logging, (level or config.LOG_LEVEL).upper(), logging.INFO))
+        if _writer is not None:
+            return
+        record_queue = queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        handlers = []
+        if config.LOG_CONSOLE:
+            console = logging.StreamHandler(sys.stdout)
+            console.setFormatter(ConsoleFormatter())
+            handlers.append(console)
+        _writer = _Writer(record_queue, handlers)
+        _writer.start()
+        _queue_handler = _DroppingQueueHandler(record_queue)
+        _root.addHandler(_queue_handler)
+        _root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the logger for a module, e.g. get_logger("listener")."""
+    return _root.getChild(name)
+
+
+def dropped() -> int:
+    """Number of records dropped because the writer could not keep up."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def flush(timeout: float = 2.0) -> None:
+    """Wait (up to timeout seconds) until queued records have been written."""
+    if _queue_handler is None:
+        return
+    deadline = time.monotonic() + timeout
+    while not _queue_handler.queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def shutdown() -> None:
+    """Write everything still queued and stop the writer thread."""
+    global _writer
+    with _setup_lock:
+        if _writer is not None:
+            _writer.stop()
+            _writer = None
+
+
+setup()
+atexit.register(shutdown)
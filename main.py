@@ -2,44 +2,91 @@
 Jarvis Voice Assistant
 Production-ready voice assistant with offline speech recognition.
 Entry point - starts all listeners and keeps the application running.
+Heavy subsystems (speech model, AI SDKs, TTS engine, Tk overlay) load on
+first use or in the background after the mouse listener is live.
+
+Usage:
+    python main.py                    # run the assistant
+    python main.py --serve            # headless API server for thin clients (see server.py)
+    python main.py --profile-startup  # report import/init times and exit
+While running, ./jarvis sends text commands over a local socket (see daemon_socket.py).
 """
 
+import importlib
 import signal
 import sys
-import config
-import listener
+import threading
+import time
 
 
-def main() -> None:
+def main(profiler=None, serve: bool = False) -> None:
     """
     Start Jarvis assistant.
-    Initialize configuration, start audio listener, keep running.
+    Initialize configuration, start audio listener (or the API server), keep running.
+    
+    Args:
+        profiler: startup_profiler.ImportProfiler when run with --profile-startup
+        serve: Run headless as an HTTP/WebSocket server instead of listening
+            for the mouse and microphone
     """
+    import config
+    import metrics
+    if serve:
+        # No overlay window or speech on the server; pynput is never imported
+        config.HEADLESS = True
+    
     print("=" * 60)
     print("JARVIS VOICE ASSISTANT")
     print("=" * 60)
     print(f"\nWake word: '{config.WAKE_NAME}' (case-insensitive)")
     print(f"Whisper model: {config.WHISPER_MODEL}")
-    print(f"AI backend: {config.AI_BACKEND}")
+    import ai_handler
+    print(f"AI backends: {', '.join(name for name, _ in ai_handler.backend_order()) or 'none'}")
     print(f"Workspace: {config.WORKSPACE_DIR}")
+    if serve:
+        print(f"Mode: server on {config.SERVER_HOST}:{config.SERVER_PORT}")
     print("\n" + "=" * 60)
     print("STARTUP NOTES:")
     print("= First run will download Whisper model (~1.5GB, takes 1-2 mins)")
     print("= Make sure to set API keys in config.py:")
     print(f"  - GROQ_API_KEY (for Groq backend)")
     print(f"  - OPENROUTER_API_KEY (for fallback)")
+    print(f"  - or JARVIS_LOCAL_AI_URL for a local OpenAI-compatible server")
     print("= Microphone may request permissions on first run")
     print("=" * 60 + "\n")
     
-    # Start listening for middle-click
+    # Start listening for middle-click (or for clients)
     try:
-        listener.start_listener()
+        if serve:
+            import server
+            server.start()
+        else:
+            import listener
+            listener.start_listener()
+        if profiler is not None:
+            import startup_profiler
+            profiler.phase("mouse listener live", time.perf_counter() - startup_profiler.PROCESS_START)
+        
+        if config.METRICS_ENABLED:
+            metrics.start_server()
+        if config.DAEMON_SOCKET and profiler is None:
+            import daemon_socket
+            daemon_socket.start()
+        
+        preloads = _start_preloads(profiler) if config.PRELOAD_IN_BACKGROUND or profiler else []
+        if profiler is not None:
+            for thread in preloads:
+                thread.join()
+            profiler.uninstall()
+            print("\n" + profiler.report())
+            _stop()
+            return
+        
         print("\nTo quit: Press Ctrl+C")
         
         # Keep main thread alive. Use a simple cross-platform sleep loop
         # instead of signal.pause() which is not available on Windows.
         signal.signal(signal.SIGINT, _signal_handler)
-        import time
         try:
             while True:
                 time.sleep(1)
@@ -48,19 +95,82 @@ def main() -> None:
     
     except KeyboardInterrupt:
         print("\nShutting down...")
-        listener.stop_listener()
+        _stop()
         sys.exit(0)
     except Exception as e:
         print(f"Fatal error: {e}")
         sys.exit(1)
 
 
+def _preload_steps() -> list:
+    """Subsystems a first command needs, as (name, loader) pairs."""
+    import config
+    if config.HEADLESS:
+        return [
+            ("speech model", lambda: importlib.import_module("transcriber").preload()),
+            ("AI clients", lambda: importlib.import_module("ai_handler").preload()),
+        ]
+    return [
+        ("audio (sounddevice)", lambda: importlib.import_module("sounddevice")),
+        ("speech model", lambda: importlib.import_module("transcriber").preload()),
+        ("AI clients", lambda: importlib.import_module("ai_handler").preload()),
+        ("text-to-speech", lambda: importlib.import_module("actions.tts").wait_ready(30)),
+        ("overlay (Tk)", lambda: importlib.import_module("actions.overlay").wait_ready(10)),
+    ]
+
+
+def _start_preloads(profiler=None) -> list:
+    """
+    Load heavy subsystems on background threads so the first command does
+    not pay for them. Each step runs on its own thread; the speech model
+    dominates and should not hold up the others.
+    
+    Returns:
+        The started threads
+    """
+    def run(name, load):
+        start = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            import log
+            log.get_logger("main").error("Preload of %s failed: %s", name, e)
+        if profiler is not None:
+            profiler.phase(f"preload {name}", time.perf_counter() - start)
+    
+    threads = []
+    for name, load in _preload_steps():
+        thread = threading.Thread(target=run, args=(name, load), daemon=True, name=f"preload-{name}")
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def _stop() -> None:
+    """Stop whichever front ends (mouse listener, API server, CLI socket) are running."""
+    listener = sys.modules.get("listener")
+    if listener is not None:
+        listener.stop_listener()
+    server = sys.modules.get("server")
+    if server is not None:
+        server.stop()
+    daemon_socket = sys.modules.get("daemon_socket")
+    if daemon_socket is not None:
+        daemon_socket.stop()
+
+
 def _signal_handler(signum, frame) -> None:
     """Handle Ctrl+C gracefully."""
     print("\n\nShutting down...")
-    listener.stop_listener()
+    _stop()
     sys.exit(0)
 
 
 if __name__ == "__main__":
-    main()
+    if "--profile-startup" in sys.argv[1:]:
+        import startup_profiler
+        _profiler = startup_profiler.ImportProfiler()
+        _profiler.install()
+        main(_profiler, serve="--serve" in sys.argv[1:])
+    else:
+        main(serve="--serve" in sys.argv[1:])
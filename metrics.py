@@ -0,0 +1,304 @@
+"""
+Metrics Module
+In-process counters, gauges and histograms for a long-running assistant,
+served on localhost in Prometheus text format.
+Updates go to per-thread shards, so instrumenting the hot path takes no
+lock; shards are summed only when the endpoint is scraped, and a thread's
+shard is folded into a shared base when the thread exits.
+"""
+
+import os
+import threading
+import weakref
+from bisect import bisect_left
+import config
+import log
+
+_log = log.get_logger("metrics")
+
+
+class _Owner:
+    """Held in one thread's local storage, so it is collected when the thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Shards:
+    """
+    One dict per live thread; writers never share a dict, readers copy each
+    one. When a thread exits its counts are folded into a base shard, so
+    short-lived threads (one per command or request) do not pile up.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._live = {}
+        self._base = {}
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            owner = _Owner()
+            self._local.shard = shard
+            self._local.owner = owner
+            weakref.finalize(owner, self._fold, id(owner), shard)
+            with self._lock:
+                self._live[id(owner)] = shard
+        return shard
+
+    def _fold(self, key: int, shard: dict) -> None:
+        # The owning thread has exited, so nothing writes to shard any more
+        with self._lock:
+            self._live.pop(key, None)
+            for labels, value in shard.items():
+                base = self._base.get(labels)
+                if base is None:
+                    self._base[labels] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    for i, item in enumerate(value):
+                        base[i] += item
+                else:
+                    self._base[labels] = base + value
+
+    def snapshots(self) -> list:
+        # Copied under the lock so a shard being folded is never counted twice;
+        # dict.copy() runs without releasing the GIL, so it never sees a half-applied update
+        with self._lock:
+            return [{k: list(v) if isinstance(v, list) else v for k, v in self._base.items()}] + \
+                [shard.copy() for shard in self._live.values()]
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards()
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        shard = self._shards.mine()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def collect(self) -> list:
+        totals = {}
+        for shard in self._shards.snapshots():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return [f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in sorted(totals.items())]
+
+
+class Gauge:
+    """Value read from a callback at scrape time (queue depths, memory)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, func):
+        self.name = name
+        self.help = help
+        self.func = func
+
+    def collect(self) -> list:
+        try:
+            return [f"{self.name} {float(self.func())}"]
+        except Exception:
+            return []
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        shard = self._shards.mine()
+        state = shard.get(labelvalues)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[labelvalues] = state
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> list:
+        merged = {}
+        for shard in self._shards.snapshots():
+            for key, state in shard.items():
+                total = merged.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+                for i, value in enumerate(list(state)):
+                    total[i] += value
+        lines = []
+        for key, state in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _labels(self.labelnames + ("le",), key + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            base = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{base} {state[-1]}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, help: str, labelnames: tuple = ()) -> Counter:
+    """Get or create a counter."""
+    return _register(Counter(name, help, labelnames))
+
+
+def histogram(name: str, help: str, buckets: tuple, labelnames: tuple = ()) -> Histogram:
+    """Get or create a histogram."""
+    return _register(Histogram(name, help, buckets, labelnames))
+
+
+def gauge(name: str, help: str, func) -> Gauge:
+    """
+    Register a gauge whose value is func() at scrape time.
+    A later registration under the same name replaces the callback.
+    """
+    metric = Gauge(name, help, func)
+    with _registry_lock:
+        _registry[name] = metric
+    return metric
+
+
+def render() -> str:
+    """Return all metrics in Prometheus text exposition format."""
+    with _registry_lock:
+        entries = list(_registry.values())
+    lines = []
+    for metric in entries:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+def _rss_bytes() -> float:
+    """Resident set size of this process."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+# ==================== STANDARD METRICS ====================
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COMMANDS = counter("jarvis_commands_total", "Commands handled, by route", ("route",))
+BACKEND_ERRORS = counter("jarvis_ai_backend_errors_total", "Failed AI backend calls", ("backend", "kind"))
+BACKEND_SECONDS = histogram(
+    "jarvis_ai_backend_seconds", "AI backend request latency, by backend and outcome", LATENCY_BUCKETS,
+    ("backend", "outcome"),
+)
+STAGE_SECONDS = histogram("jarvis_stage_seconds", "Per-command stage latency from traces", LATENCY_BUCKETS, ("stage",))
+TRANSCRIBE_RTF = histogram(
+    "jarvis_transcription_rtf", "Decode time divided by audio duration",
+    (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0),
+)
+gauge("jarvis_process_resident_memory_bytes", "Resident memory of the assistant process", _rss_bytes)
+
+
+# ==================== HTTP ENDPOINT ====================
+
+def _make_handler():
+    # http.server (and the ssl/http.client it pulls in) is imported only when serving
+    from http.server import BaseHTTPRequestHandler
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the console
+            pass
+
+    return _Handler
+
+
+_server = None
+
+
+def start_server(host: str = None, port: int = None):
+    """
+    Serve /metrics on a background thread.
+
+    Args:
+        host: Bind address (config.METRICS_HOST if None)
+        port: Port (config.METRICS_PORT if None)
+
+    Returns:
+        The running server, or None if it could not bind
+    """
+    global _server
+    if _server is not None:
+        return _server
+    host = host or config.METRICS_HOST
+    port = config.METRICS_PORT if port is None else port
+    from http.server import ThreadingHTTPServer
+    try:
+        _server = ThreadingHTTPServer((host, port), _make_handler())
+    except OSError as e:
+        _log.warning("Metrics endpoint unavailable on %s:%s: %s", host, port, e)
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, daemon=True, name="jarvis-metrics").start()
+    _log.info("✓ Metrics: http://%s:%s/metrics", host, _server.server_address[1])
+    return _server
+
+
+def stop_server() -> None:
+    """Stop the metrics endpoint if it is running."""
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,217 @@
+"""
+Recorder Module
+Opt-in session recording (config.RECORD_SESSIONS) for a regression and
+performance corpus. Each captured utterance is saved to config.RECORD_DIR:
+the audio as compressed 16-bit PCM (.npz, or .wav without numpy) and one
+line in index.jsonl with the transcript, the command, the routed action
+and the stage timings from its trace. replay.py pushes a corpus back
+through the pipeline and reports latency and drift.
+
+Usage (inside the pipeline):
+    recording = recorder.start(audio, sample_rate)
+    with recorder.use(recording):
+        recorder.note(transcript=transcript)
+    recording.finish(trace)
+"""
+
+import json
+import threading
+import time
+import wave
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+import config
+import log
+
+_log = log.get_logger("recorder")
+
+INDEX_NAME = "index.jsonl"
+AUDIO_DIR_NAME = "audio"
+
+
+class Recording:
+    """
+    One utterance: its audio plus fields noted while the pipeline runs.
+
+    Attributes:
+        audio: Audio samples (floats in [-1, 1]) or None
+        sample_rate: Sample rate of audio
+        fields: Values passed to note() (transcript, command, action, ...)
+    """
+
+    def __init__(self, audio=None, sample_rate: int = 16000):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.fields = {}
+        self.wall_time = time.time()
+
+    def note(self, **fields) -> None:
+        self.fields.update(fields)
+
+    def finish(self, trace=None) -> None:
+        """
+        Save the recording. With a trace, saving waits until the trace is
+        complete so late spans (action, overlay, TTS) are included.
+        """
+        if trace is None:
+            _corpus.save(self, None)
+        else:
+            trace.on_finish(lambda record: _corpus.save(self, record))
+
+
+class Corpus:
+    """An on-disk corpus: index.jsonl plus one audio file per entry."""
+
+    def __init__(self, directory: Path, max_bytes: int = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size = None
+        self._full_logged = False
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_NAME
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.directory.rglob("*") if p.is_file())
+        return self._size
+
+    def save(self, recording: Recording, trace_record) -> None:
+        """Write the audio file and append the index entry (called off the pipeline threads)."""
+        with self._lock:
+            try:
+                (self.directory / AUDIO_DIR_NAME).mkdir(parents=True, exist_ok=True)
+                # Measured before writing, so the new entry is only added once below
+                size = self._current_size()
+                if self.max_bytes and size >= self.max_bytes:
+                    if not self._full_logged:
+                        _log.warning("Recording corpus at %s is full (%d bytes); not recording",
+                                     self.directory, size)
+                        self._full_logged = True
+                    return
+                entry_id = trace_record["trace_id"] if trace_record else f"{int(recording.wall_time * 1000):x}"
+                audio_path = save_audio(self.directory / AUDIO_DIR_NAME / entry_id, recording.audio, recording.sample_rate)
+                entry = {
+                    "id": entry_id,
+                    "time": recording.wall_time,
+                    "audio": audio_path.relative_to(self.directory).as_posix(),
+                    "sample_rate": recording.sample_rate,
+                    "audio_seconds": round(len(recording.audio) / recording.sample_rate, 3),
+                    **recording.fields,
+                }
+                if trace_record:
+                    entry["route"] = trace_record.get("route")
+                    entry["spans"] = trace_record.get("spans", [])
+                line = json.dumps(entry, default=str, ensure_ascii=False) + "\n"
+                with self.index_path.open("a", encoding="utf-8") as f:
+                    f.write(line)
+                self._size = size + audio_path.stat().st_size + len(line.encode("utf-8"))
+            except Exception as e:
+                _log.error("Could not save recording: %s", e)
+
+    def entries(self) -> list:
+        """Return the index entries in recording order."""
+        entries = []
+        try:
+            with self.index_path.open(encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue
+        except OSError:
+            pass
+        return entries
+
+    def load_audio(self, entry: dict):
+        """Return (samples, sample_rate) for an index entry."""
+        return load_audio(self.directory / entry["audio"])
+
+
+def save_audio(stem: Path, audio, sample_rate: int) -> Path:
+    """
+    Save float samples as 16-bit PCM: compressed .npz with numpy, .wav otherwise.
+
+    Returns:
+        Path of the written file
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        pcm = (np.clip(np.asarray(audio, dtype=np.float32).ravel(), -1.0, 1.0) * 32767).astype(np.int16)
+        path = stem.with_suffix(".npz")
+        with path.open("wb") as f:
+            np.savez_compressed(f, audio=pcm, sample_rate=np.int32(sample_rate))
+        return path
+    pcm = array("h", (int(max(-1.0, min(1.0, float(s))) * 32767) for s in audio))
+    path = stem.with_suffix(".wav")
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    return path
+
+
+def load_audio(path: Path):
+    """
+    Load audio written by save_audio.
+
+    Returns:
+        Tuple of (float samples, sample rate); a numpy array for .npz files
+    """
+    path = Path(path)
+    if path.suffix == ".npz":
+        import numpy as np
+        with np.load(path) as data:
+            return data["audio"].astype(np.float32) / 32768.0, int(data["sample_rate"])
+    with wave.open(str(path), "rb") as wf:
+        rate = wf.getframerate()
+        pcm = array("h", wf.readframes(wf.getnframes()))
+    return [s / 32768.0 for s in pcm], rate
+
+
+_corpus = Corpus(config.RECORD_DIR, config.RECORD_MAX_BYTES)
+_local = threading.local()
+
+
+def start(audio, sample_rate: int):
+    """
+    Begin recording an utterance.
+
+    Returns:
+        Recording, or None when config.RECORD_SESSIONS is off
+    """
+    if not config.RECORD_SESSIONS:
+        return None
+    return Recording(audio, sample_rate)
+
+
+def current():
+    """Return the recording active on this thread, or None."""
+    return getattr(_local, "recording", None)
+
+
+@contextmanager
+def use(recording):
+    """Make recording current on this thread for the enclosed block."""
+    previous = current()
+    _local.recording = recording
+    try:
+        yield recording
+    finally:
+        _local.recording = previous
+
+
+def note(**fields) -> None:
+    """Attach fields (transcript, command, action) to the current recording, if any."""
+    recording = current()
+    if recording is not None:
+        recording.note(**fields)
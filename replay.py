@@ -0,0 +1,259 @@
+"""
+Session replay
+Pushes a corpus recorded with RECORD_SESSIONS = True back through the
+pipeline (transcription, wake word, routing, actions) with keyboard,
+speech, overlay and browser side effects disabled, and reports per-stage
+latency against the recorded timings plus any transcript or action drift.
+
+The AI backend is replaced by the local stub from bench_stubs.py, answering
+each command with the action recorded for it, so drift reflects this code
+rather than the model; pass --live-ai to use the configured backends.
+Utterances run one at a time; --speed keeps the recorded gaps between them.
+
+Usage:
+    python replay.py                      # config.RECORD_DIR, back to back
+    python replay.py --speed 1            # original pace (4 = four times faster)
+    python replay.py --text               # skip speech recognition, replay recorded transcripts
+    python replay.py --corpus DIR --limit 50 --output replay.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Spans that make up the command itself; marks (overlay, TTS start) are measured from release
+PIPELINE_STAGES = ("transcribe", "wake", "route", "action")
+
+
+def normalize(text: str) -> list:
+    """Lowercase words without punctuation, for transcript comparison."""
+    return re.sub(r"[^\w\s']", " ", (text or "").lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance divided by the reference length."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        row = [i]
+        for j, h in enumerate(hyp, 1):
+            row.append(min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = row
+    return previous[-1] / len(ref)
+
+
+def action_key(action) -> str:
+    """Canonical form of a routed action (name and params; the answer text is ignored)."""
+    if not action:
+        return ""
+    return json.dumps({"action": action.get("action"), "params": action.get("params", {})}, sort_keys=True)
+
+
+def command_ms(spans: list):
+    """Milliseconds from the first to the end of the last pipeline stage span, or None."""
+    stages = [s for s in spans if s["name"] in PIPELINE_STAGES]
+    if not stages:
+        return None
+    return max(s["start_ms"] + s["duration_ms"] for s in stages) - min(s["start_ms"] for s in stages)
+
+
+def _stage_durations(rows: list) -> dict:
+    durations = {}
+    for spans in rows:
+        for span in spans:
+            durations.setdefault(span["name"], []).append(span["duration_ms"])
+        total = command_ms(spans)
+        if total is not None:
+            durations.setdefault("command", []).append(total)
+    return durations
+
+
+def replay(entries: list, corpus, text_only: bool, speed: float, max_gap: float, stub=None) -> list:
+    """
+    Run each entry through the pipeline.
+
+    Args:
+        entries: Corpus index entries in recording order
+        corpus: recorder.Corpus the entries came from
+        text_only: Use the recorded transcript instead of transcribing
+        speed: 0 runs back to back, 1 keeps recorded gaps, N divides them by N
+        max_gap: Longest pause between utterances, in seconds
+        stub: StubServer whose replies are set to each entry's recorded action
+
+    Returns:
+        One result dict per entry
+    """
+    import bench_stubs
+    import recorder
+    import tracing
+    import transcriber
+    run = bench_stubs.listener_runner()
+    original_transcribe = transcriber.transcribe
+    results = []
+    previous_time = None
+    started = None
+    try:
+        for entry in entries:
+            if speed > 0 and previous_time is not None:
+                gap = min(max_gap, max(0.0, entry["time"] - previous_time) / speed)
+                delay = started + gap - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            previous_time = entry["time"]
+            started = time.perf_counter()
+
+            if stub is not None and entry.get("command") and entry.get("action"):
+                stub.rules = [(entry["command"].lower(), entry["action"])]
+            if text_only:
+                audio, sample_rate = [0.0] * 1600, entry.get("sample_rate", 16000)
+                recorded = entry.get("transcript", "")
+                transcriber.transcribe = lambda audio, sample_rate=16000, text=recorded: text
+            else:
+                audio, sample_rate = corpus.load_audio(entry)
+
+            trace = tracing.Trace(f"replay-{entry['id']}", persist=False)
+            collected = recorder.Recording()
+            error = None
+            try:
+                run(audio, sample_rate, trace, collected)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            wall_ms = 1000 * (time.perf_counter() - started)
+
+            fields = collected.fields
+            results.append({
+                "id": entry["id"],
+                "recorded_transcript": entry.get("transcript", ""),
+                "transcript": fields.get("transcript", ""),
+                "wer": round(word_error_rate(entry.get("transcript", ""), fields.get("transcript", "")), 4),
+                "recorded_action": entry.get("action"),
+                "action": fields.get("action"),
+                "action_match": action_key(entry.get("action")) == action_key(fields.get("action")),
+                "recorded_spans": entry.get("spans", []),
+                "spans": trace.to_dict()["spans"],
+                "wall_ms": round(wall_ms, 3),
+                "error": error,
+            })
+    finally:
+        transcriber.transcribe = original_transcribe
+    return results
+
+
+def report(results: list, text_only: bool) -> dict:
+    """
+    Print and return latency distributions and drift.
+
+    Returns:
+        Dict with "stages" (recorded vs replayed p50/p95/p99 per stage) and "drift"
+    """
+    import tracing
+    recorded = _stage_durations([r["recorded_spans"] for r in results])
+    replayed = _stage_durations([r["spans"] for r in results])
+
+    def stats(values):
+        if not values:
+            return None
+        values = sorted(values)
+        return {p: round(tracing.percentile(values, n), 3) for p, n in (("p50", 50), ("p95", 95), ("p99", 99))}
+
+    stages = {}
+    print(f"{len(results)} utterances replayed")
+    print(f"{'stage':<14}{'recorded p50':>14}{'p95':>10}{'replayed p50':>14}{'p95':>10}{'count':>7}")
+    order = list(PIPELINE_STAGES) + ["command"]
+    names = [n for n in order if n in recorded or n in replayed]
+    names += sorted((set(recorded) | set(replayed)) - set(names))
+    for name in names:
+        a, b = stats(recorded.get(name)), stats(replayed.get(name))
+        stages[name] = {"recorded": a, "replayed": b, "count": len(replayed.get(name, []))}
+
+        def cell(s, key):
+            return f"{s[key]:.1f}" if s else "-"
+
+        print(f"{name:<14}{cell(a, 'p50'):>14}{cell(a, 'p95'):>10}{cell(b, 'p50'):>14}{cell(b, 'p95'):>10}"
+              f"{stages[name]['count']:>7}")
+
+    transcript_drift = [r for r in results if not text_only and normalize(r["transcript"]) != normalize(r["recorded_transcript"])]
+    action_drift = [r for r in results if not r["action_match"]]
+    errors = [r for r in results if r["error"]]
+    mean_wer = sum(r["wer"] for r in results) / len(results) if results and not text_only else 0.0
+    print()
+    if not text_only:
+        print(f"Transcript drift: {len(transcript_drift)}/{len(results)} (mean WER {mean_wer:.1%})")
+        for r in transcript_drift[:10]:
+            print(f"  {r['id']}: {r['recorded_transcript']!r} -> {r['transcript']!r}")
+    print(f"Action drift: {len(action_drift)}/{len(results)}")
+    for r in action_drift[:10]:
+        print(f"  {r['id']}: {action_key(r['recorded_action']) or '-'} -> {action_key(r['action']) or '-'}")
+    if errors:
+        print(f"Errors: {len(errors)}")
+        for r in errors[:10]:
+            print(f"  {r['id']}: {r['error']}")
+    return {
+        "stages": stages,
+        "drift": {
+            "transcripts": len(transcript_drift),
+            "mean_wer": round(mean_wer, 4),
+            "actions": len(action_drift),
+            "errors": len(errors),
+        },
+    }
+
+
+def main(argv=None) -> int:
+    import config
+    parser = argparse.ArgumentParser(description="Replay a recorded Jarvis session corpus")
+    parser.add_argument("--corpus", default=str(config.RECORD_DIR), help="Corpus directory")
+    parser.add_argument("--speed", type=float, default=0, help="0 = back to back, 1 = original pace, N = N times faster")
+    parser.add_argument("--max-gap", type=float, default=10.0, help="Longest pause between utterances, seconds")
+    parser.add_argument("--text", action="store_true", help="Replay recorded transcripts, skipping speech recognition")
+    parser.add_argument("--live-ai", action="store_true", help="Use the configured AI backends instead of the stub")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N utterances")
+    parser.add_argument("--output", help="Write per-utterance results and the summary as JSON")
+    args = parser.parse_args(argv)
+
+    import bench_stubs
+    stub = None if args.live_ai else bench_stubs.StubServer(ttfb=0.0, chunk_delay=0.0).start()
+    with tempfile.TemporaryDirectory(prefix="jarvis-replay-") as tmp:
+        bench_stubs.isolate(Path(tmp), stub.url if stub else None)
+        import recorder
+        corpus = recorder.Corpus(Path(args.corpus).expanduser())
+        entries = corpus.entries()
+        if args.limit:
+            entries = entries[:args.limit]
+        if not entries:
+            print(f"No recordings in {corpus.index_path}")
+            return 1
+        text_only = args.text
+        if not text_only:
+            try:
+                import faster_whisper  # noqa: F401
+            except ImportError:
+                print("faster-whisper not installed; replaying recorded transcripts (--text)")
+                text_only = True
+        bench_stubs.silence_side_effects()
+        results = replay(entries, corpus, text_only, args.speed, args.max_gap, stub)
+    if stub is not None:
+        stub.stop()
+
+    summary = report(results, text_only)
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "corpus": str(args.corpus),
+            "text_only": text_only,
+            "speed": args.speed,
+            "live_ai": args.live_ai,
+            "summary": summary,
+            "results": results,
+        }, indent=2, default=str), encoding="utf-8")
+        print(f"\nWrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
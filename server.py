@@ -0,0 +1,658 @@
+"""
+Server Module
+Headless mode (`python main.py --serve`) for one machine serving several
+thin clients. Audio uploads, PCM streamed over a WebSocket and text commands
+go through the same transcriber -> command_router -> actions.dispatch
+pipeline as the mouse listener, on one shared warm model, and each request
+gets back {transcript, command, action, params, answer, executed}.
+
+Admission control: requests run on a fixed pool of SERVER_WORKERS threads
+fed by a fair scheduler that serves clients round-robin, so one busy client
+cannot starve the others. A client with SERVER_MAX_PER_CLIENT requests in
+flight gets 429; once SERVER_MAX_QUEUE requests are waiting, everyone gets
+503 with Retry-After until the queue drains.
+
+API:
+    POST /v1/command   {"text": "what time is it"}
+    POST /v1/audio     WAV body, or raw mono PCM with ?rate=16000&format=s16le|f32le
+                       (&wake=1 to require the wake word, as the listener does)
+    GET  /v1/stream    WebSocket. Text frames: {"type": "start", "rate": 16000,
+                       "format": "s16le", "wake": false}, then binary PCM frames,
+                       then {"type": "end"}; or {"type": "command", "text": "..."}.
+                       Each end/command is answered with one result text frame.
+    GET  /v1/health    Queue state
+Admission is keyed on the client's address; an X-Jarvis-Client header only
+labels its requests in the log.
+Actions that act on the user's desktop (SERVER_CLIENT_ACTIONS) are returned
+unexecuted for the client to perform.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import struct
+import threading
+import time
+import wave
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+import config
+import log
+import metrics
+import tracing
+
+_log = log.get_logger("server")
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_MAX_RATE = 48000
+_MAX_TEXT_BYTES = 64 * 1024
+
+REQUESTS = metrics.counter("jarvis_server_requests_total", "Server requests, by kind and status", ("kind", "status"))
+QUEUE_SECONDS = metrics.histogram(
+    "jarvis_server_queue_seconds", "Time server requests waited for a worker", metrics.LATENCY_BUCKETS,
+)
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted (status 429 or 503)."""
+
+    def __init__(self, message: str, status: int, retry_after: int = 1):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RequestError(Exception):
+    """Raised for a malformed request (status 400 or 413)."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class FairScheduler:
+    """
+    Fixed worker pool with one FIFO per client, served round-robin.
+
+    Args:
+        workers: Worker threads (requests processed at once)
+        max_queue: Requests waiting (not yet running) across all clients
+        max_per_client: Requests one client may have waiting or running
+    """
+
+    def __init__(self, workers: int, max_queue: int, max_per_client: int):
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self._queues = OrderedDict()  # client -> deque of (fn, future, enqueued_at)
+        self._in_flight = {}  # client -> waiting + running
+        self._queued = 0
+        self._running = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._work, daemon=True, name=f"jarvis-server-{i}") for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, client: str, fn) -> Future:
+        """
+        Queue fn() for a client.
+
+        Raises:
+            Overloaded: If the client or the server is at its limit
+        """
+        with self._cond:
+            if self._closed:
+                raise Overloaded("Server is shutting down", 503)
+            if self._in_flight.get(client, 0) >= self.max_per_client:
+                raise Overloaded(f"Too many requests in flight for {client}", 429)
+            if self._queued >= self.max_queue:
+                raise Overloaded("Server is busy", 503, retry_after=max(1, self._queued // max(1, len(self._threads))))
+            future = Future()
+            self._queues.setdefault(client, deque()).append((fn, future, time.perf_counter()))
+            self._in_flight[client] = self._in_flight.get(client, 0) + 1
+            self._queued += 1
+            self._cond.notify()
+        return future
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"queued": self._queued, "running": self._running, "clients": len(self._in_flight)}
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _next(self):
+        # The first client in line gets one job, then goes to the back if it has more
+        client, jobs = next(iter(self._queues.items()))
+        job = jobs.popleft()
+        del self._queues[client]
+        if jobs:
+            self._queues[client] = jobs
+        return client, job
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queues and not self._closed:
+                    self._cond.wait()
+                if not self._queues:
+                    return
+                client, (fn, future, enqueued_at) = self._next()
+                self._queued -= 1
+                self._running += 1
+            QUEUE_SECONDS.observe(time.perf_counter() - enqueued_at)
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn())
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._in_flight[client] -= 1
+                    if not self._in_flight[client]:
+                        del self._in_flight[client]
+
+
+# ==================== PIPELINE ====================
+
+def _decode_pcm(data: bytes, fmt: str):
+    """Little-endian mono PCM bytes to float samples in [-1, 1]."""
+    if fmt not in ("s16le", "f32le"):
+        raise RequestError(f"Unsupported format '{fmt}' (use s16le or f32le)")
+    width = 2 if fmt == "s16le" else 4
+    if len(data) % width:
+        raise RequestError("PCM length is not a whole number of samples")
+    try:
+        import numpy as np
+        if fmt == "s16le":
+            return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        return np.frombuffer(data, dtype="<f4").astype(np.float32)
+    except ImportError:
+        pass
+    samples = array("h" if fmt == "s16le" else "f", data)
+    if struct.pack("=h", 1) != struct.pack("<h", 1):
+        samples.byteswap()
+    return [s / 32768.0 for s in samples] if fmt == "s16le" else list(samples)
+
+
+def _decode_wav(data: bytes):
+    """Return (samples, sample rate) from a 16-bit PCM WAV (first channel)."""
+    try:
+        with wave.open(BytesIO(data), "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise RequestError("Only 16-bit PCM WAV is supported")
+            channels = wf.getnchannels()
+            rate = wf.getframerate()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise RequestError(f"Invalid WAV: {e}")
+    samples = _decode_pcm(frames, "s16le")
+    return samples[::channels], rate
+
+
+def _parse_rate(value) -> int:
+    """Sample rate from a query string or stream start message (RequestError if not a number)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"Invalid sample rate {value!r}")
+
+
+def _check_duration(samples, sample_rate: int) -> None:
+    if not 8000 <= sample_rate <= _MAX_RATE:
+        raise RequestError(f"Sample rate {sample_rate} out of range (8000-{_MAX_RATE})")
+    if len(samples) > config.SERVER_MAX_AUDIO_SECONDS * sample_rate:
+        raise RequestError(f"Audio longer than {config.SERVER_MAX_AUDIO_SECONDS}s", 413)
+
+
+def _step_actions(result: dict) -> list:
+    if result.get("action") == "plan":
+        steps = result.get("params", {}).get("steps") or []
+        return [step.get("action") for step in steps if isinstance(step, dict)]
+    return [result.get("action")]
+
+
+def _execute(result: dict, local: bool = False) -> bool:
+    """
+    Run the routed action on the server and wait for it, unless it acts on
+    the client's desktop. Answering actions replace result["answer"].
+
+    Args:
+        result: Routed command
+        local: The client is on this machine (daemon socket), so desktop
+            actions run here too
+
+    Returns:
+        True if the action ran here
+    """
+    from actions import dispatch
+    if not local and any(name in config.SERVER_CLIENT_ACTIONS for name in _step_actions(result)):
+        return False
+    try:
+        spec, future = dispatch.submit(result)
+        if spec is None:
+            return True
+        value = dispatch.wait(spec, future)
+        if spec.answers and value:
+            result["answer"] = value
+    except Exception as e:
+        _log.error("Error executing action: %s", e)
+        result["answer"] = f"Error: {e}"
+        result["error"] = str(e)
+    return True
+
+
+def _traced(fn, source: str = "server") -> dict:
+    """Run fn() under a new trace tagged with where the request came from."""
+    trace = tracing.start_trace()
+    with tracing.use(trace):
+        try:
+            if trace is not None:
+                trace.set(source=source)
+            return fn()
+        finally:
+            if trace is not None:
+                trace.finish()
+
+
+def _route_and_execute(text: str, transcript, require_wake: bool, local: bool = False) -> dict:
+    import command_router
+    with tracing.span("wake"):
+        command = command_router.strip_wake_word(text)
+    if command is None and not require_wake:
+        command = text.strip()
+    if not command:
+        return {"transcript": transcript, "command": command, "action": "respond", "params": {},
+                "answer": "", "executed": False}
+    with tracing.span("route"):
+        result = command_router.route(command, announce=False)
+    executed = _execute(result, local)
+    return {"transcript": transcript, "command": command, **result, "executed": executed}
+
+
+def handle_command(text: str, require_wake: bool = False, local: bool = False) -> dict:
+    """
+    Route a text command and run its action (called on a worker thread).
+
+    Args:
+        text: Command, with or without the wake word
+        require_wake: Ignore text that does not start with the wake word
+        local: Also run desktop actions (caller is on this machine)
+
+    Returns:
+        Dict with transcript (None), command, action, params, answer, executed, ms
+    """
+    start = time.perf_counter()
+    response = _traced(lambda: _route_and_execute(text, None, require_wake, local), "cli" if local else "server")
+    response["ms"] = round(1000 * (time.perf_counter() - start), 1)
+    return response
+
+
+def handle_audio(samples, sample_rate: int, require_wake: bool = False, local: bool = False) -> dict:
+    """
+    Transcribe audio on the shared model, then handle the transcript as a
+    command (called on a worker thread).
+
+    Returns:
+        Dict as for handle_command, plus transcribe_ms
+    """
+    import transcriber
+    start = time.perf_counter()
+    timings = {}
+
+    def run():
+        with tracing.span("transcribe"):
+            transcript = transcriber.transcribe(samples, sample_rate=sample_rate)
+        timings["transcribe_ms"] = round(1000 * (time.perf_counter() - start), 1)
+        if not transcript:
+            return {"transcript": "", "command": None, "action": "respond", "params": {},
+                    "answer": "", "executed": False}
+        return _route_and_execute(transcript, transcript, require_wake, local)
+
+    response = _traced(run, "cli" if local else "server")
+    response.update(timings)
+    response["ms"] = round(1000 * (time.perf_counter() - start), 1)
+    return response
+
+
+# ==================== WEBSOCKET ====================
+
+class _WebSocket:
+    """Minimal RFC 6455 server side: text/binary messages, ping/pong, close."""
+
+    def __init__(self, rfile, wfile, max_message: int):
+        self.rfile = rfile
+        self.wfile = wfile
+        self.max_message = max_message
+        self._send_lock = threading.Lock()
+
+    def _read(self, n: int) -> bytes:
+        data = self.rfile.read(n)
+        if len(data) < n:
+            raise ConnectionError("WebSocket closed")
+        return data
+
+    def _frame(self):
+        head = self._read(2)
+        fin, opcode = head[0] & 0x80, head[0] & 0x0F
+        masked, length = head[1] & 0x80, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self._read(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self._read(8))[0]
+        if not masked:
+            raise ConnectionError("Client frames must be masked")
+        if length > self.max_message:
+            raise RequestError("WebSocket frame too large", 413)
+        mask = self._read(4)
+        payload = self._read(length)
+        if length:
+            # Unmask the whole payload as one big integer XOR instead of byte by byte
+            key = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+        return bool(fin), opcode, payload
+
+    def receive(self):
+        """
+        Return the next (opcode, payload) data message (1 = text, 2 = binary),
+        answering pings; None once the client closes.
+        """
+        message, message_opcode = bytearray(), None
+        while True:
+            fin, opcode, payload = self._frame()
+            if opcode == 0x8:
+                self.send(0x8, payload[:2])
+                return None
+            if opcode == 0x9:
+                self.send(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            if opcode in (0x1, 0x2):
+                message, message_opcode = bytearray(payload), opcode
+            elif opcode == 0x0 and message_opcode is not None:
+                message += payload
+            else:
+                raise ConnectionError(f"Unexpected WebSocket opcode {opcode}")
+            if len(message) > self.max_message:
+                raise RequestError("WebSocket message too large", 413)
+            if fin:
+                return message_opcode, bytes(message)
+
+    def send(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            head = struct.pack(">BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            head = struct.pack(">BBH", 0x80 | opcode, 126, length)
+        else:
+            head = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+        with self._send_lock:
+            self.wfile.write(head + payload)
+            self.wfile.flush()
+
+    def send_json(self, payload: dict) -> None:
+        self.send(0x1, json.dumps(payload).encode("utf-8"))
+
+
+# ==================== HTTP ====================
+
+_scheduler = None
+_server = None
+_lock = threading.Lock()
+
+
+def _run(client: str, kind: str, fn) -> dict:
+    """Admit fn() through the scheduler and wait for its result (raises Overloaded/TimeoutError)."""
+    try:
+        future = _scheduler.submit(client, fn)
+    except Overloaded as e:
+        REQUESTS.inc(kind, str(e.status))
+        raise
+    try:
+        result = future.result(timeout=config.SERVER_REQUEST_TIMEOUT)
+    except FutureTimeout:
+        future.cancel()
+        REQUESTS.inc(kind, "504")
+        raise TimeoutError(f"Request took longer than {config.SERVER_REQUEST_TIMEOUT}s")
+    except Exception:
+        REQUESTS.inc(kind, "500")
+        raise
+    REQUESTS.inc(kind, "200")
+    return result
+
+
+def _make_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            headers = getattr(self, "headers", None)
+            label = headers.get("X-Jarvis-Client") if headers else None
+            _log.debug("%s%s %s", self.address_string(), f" ({label})" if label else "", format % args)
+
+        def _client(self) -> str:
+            # The peer address, not X-Jarvis-Client: a header would let one caller pose as many
+            return self.client_address[0]
+
+        def _authorized(self, query: dict) -> bool:
+            if not config.SERVER_TOKEN:
+                return True
+            header = self.headers.get("Authorization", "")
+            token = header[7:] if header.startswith("Bearer ") else query.get("token", [""])[0]
+            return hmac.compare_digest(token.encode(), config.SERVER_TOKEN.encode())
+
+        def _send_json(self, status: int, payload: dict, headers: dict = None) -> None:
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_error(self, error: Exception) -> None:
+            if isinstance(error, Overloaded):
+                self._send_json(error.status, {"error": str(error)}, {"Retry-After": str(error.retry_after)})
+            elif isinstance(error, RequestError):
+                self._send_json(error.status, {"error": str(error)})
+            elif isinstance(error, TimeoutError):
+                self._send_json(504, {"error": str(error)})
+            else:
+                _log.error("Server request failed: %s", error)
+                self._send_json(500, {"error": str(error)})
+
+        def _body(self, limit: int) -> bytes:
+            try:
+                length = int(self.headers.get("Content-Length", ""))
+            except ValueError:
+                length = -1
+            if length < 0:
+                # Body length unknown: the connection cannot be reused
+                self.close_connection = True
+                raise RequestError("Content-Length must be a non-negative integer")
+            if length > limit:
+                # Unread body: the connection cannot be reused
+                self.close_connection = True
+                raise RequestError(f"Body larger than {limit} bytes", 413)
+            return self.rfile.read(length)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            if not self._authorized(query):
+                self._send_json(401, {"error": "Unauthorized"})
+            elif url.path == "/v1/health":
+                self._send_json(200, {"status": "ok", **_scheduler.stats()})
+            elif url.path == "/v1/stream":
+                self._websocket(query)
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            if not self._authorized(query):
+                self._send_json(401, {"error": "Unauthorized"})
+                return
+            try:
+                if url.path == "/v1/command":
+                    try:
+                        text = json.loads(self._body(_MAX_TEXT_BYTES) or b"{}").get("text", "")
+                    except (ValueError, AttributeError):
+                        raise RequestError("Body must be JSON like {\"text\": \"...\"}")
+                    if not isinstance(text, str) or not text.strip():
+                        raise RequestError("Missing \"text\"")
+                    result = _run(self._client(), "command", lambda: handle_command(text))
+                elif url.path == "/v1/audio":
+                    body = self._body(config.SERVER_MAX_AUDIO_SECONDS * _MAX_RATE * 4 + 1024)
+                    wake = query.get("wake", ["0"])[0] in ("1", "true")
+                    if self.headers.get("Content-Type", "").startswith(("audio/wav", "audio/x-wav", "audio/wave")) \
+                            or body[:4] == b"RIFF":
+                        samples, rate = _decode_wav(body)
+                    else:
+                        rate = _parse_rate(query.get("rate", ["16000"])[0])
+                        samples = _decode_pcm(body, query.get("format", ["s16le"])[0])
+                    _check_duration(samples, rate)
+                    result = _run(self._client(), "audio", lambda: handle_audio(samples, rate, wake))
+                else:
+                    self._send_json(404, {"error": "Not found"})
+                    return
+            except Exception as e:
+                self._send_error(e)
+                return
+            self._send_json(200, result)
+
+        def _websocket(self, query: dict) -> None:
+            key = self.headers.get("Sec-WebSocket-Key")
+            if self.headers.get("Upgrade", "").lower() != "websocket" or not key:
+                self._send_json(400, {"error": "Expected a WebSocket upgrade"})
+                return
+            accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()).decode("ascii")
+            self.send_response(101)
+            self.send_header("Upgrade", "websocket")
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Sec-WebSocket-Accept", accept)
+            self.end_headers()
+            self.close_connection = True
+            ws = _WebSocket(self.rfile, self.wfile, config.SERVER_MAX_AUDIO_SECONDS * _MAX_RATE * 4)
+            client = self._client()
+            stream = None  # {"rate", "format", "wake", "data"} between start and end
+            try:
+                while True:
+                    message = ws.receive()
+                    if message is None:
+                        return
+                    opcode, payload = message
+                    try:
+                        if opcode == 0x2:
+                            if stream is None:
+                                raise RequestError("Send {\"type\": \"start\"} before audio")
+                            stream["data"] += payload
+                            width = 2 if stream["format"] == "s16le" else 4
+                            if len(stream["data"]) > config.SERVER_MAX_AUDIO_SECONDS * stream["rate"] * width:
+                                stream = None
+                                raise RequestError(f"Audio longer than {config.SERVER_MAX_AUDIO_SECONDS}s", 413)
+                            continue
+                        request = json.loads(payload.decode("utf-8"))
+                        if not isinstance(request, dict):
+                            raise RequestError("Message must be a JSON object")
+                        kind = request.get("type")
+                        if kind == "start":
+                            stream = {
+                                "rate": _parse_rate(request.get("rate", 16000)),
+                                "format": request.get("format", "s16le"),
+                                "wake": bool(request.get("wake", False)),
+                                "data": bytearray(),
+                            }
+                            _check_duration([], stream["rate"])
+                        elif kind == "end":
+                            if stream is None:
+                                raise RequestError("No audio stream started")
+                            samples = _decode_pcm(bytes(stream["data"]), stream["format"])
+                            rate, wake = stream["rate"], stream["wake"]
+                            stream = None
+                            ws.send_json(_run(client, "stream", lambda: handle_audio(samples, rate, wake)))
+                        elif kind == "command":
+                            text = request.get("text", "")
+                            if not isinstance(text, str) or not text.strip():
+                                raise RequestError("Missing \"text\"")
+                            ws.send_json(_run(client, "command", lambda: handle_command(text)))
+                        else:
+                            raise RequestError(f"Unknown message type {kind!r}")
+                    except (Overloaded, RequestError, TimeoutError, ValueError) as e:
+                        reply = {"error": str(e), "status": getattr(e, "status", 504 if isinstance(e, TimeoutError) else 400)}
+                        if isinstance(e, Overloaded):
+                            reply["retry_after"] = e.retry_after
+                        ws.send_json(reply)
+            except (ConnectionError, OSError):
+                return
+            except RequestError as e:
+                # Oversized frame: close with "message too big"
+                try:
+                    ws.send(0x8, struct.pack(">H", 1009) + str(e).encode("utf-8")[:120])
+                except OSError:
+                    pass
+
+    return _Handler
+
+
+def start(host: str = None, port: int = None):
+    """
+    Start the API server on background threads.
+
+    Args:
+        host: Bind address (config.SERVER_HOST if None)
+        port: Port (config.SERVER_PORT if None; 0 picks a free port)
+
+    Returns:
+        The running ThreadingHTTPServer
+
+    Raises:
+        OSError: If the address cannot be bound
+    """
+    global _scheduler, _server
+    with _lock:
+        if _server is not None:
+            return _server
+        from http.server import ThreadingHTTPServer
+        host = host or config.SERVER_HOST
+        port = config.SERVER_PORT if port is None else port
+        _scheduler = FairScheduler(config.SERVER_WORKERS, config.SERVER_MAX_QUEUE, config.SERVER_MAX_PER_CLIENT)
+        metrics.gauge("jarvis_server_queued", "Server requests waiting for a worker", lambda: _scheduler.stats()["queued"])
+        metrics.gauge("jarvis_server_running", "Server requests being processed", lambda: _scheduler.stats()["running"])
+        server = ThreadingHTTPServer((host, port), _make_handler())
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True, name="jarvis-server").start()
+        _server = server
+        if host not in ("127.0.0.1", "localhost", "::1") and not config.SERVER_TOKEN:
+            _log.warning("Server is reachable from other machines without a token; set JARVIS_SERVER_TOKEN")
+        _log.info("✓ Serving on http://%s:%s (POST /v1/command, /v1/audio; WebSocket /v1/stream)",
+                  host, server.server_address[1])
+        return server
+
+
+def stop() -> None:
+    """Stop accepting requests and shut the server down."""
+    global _scheduler, _server
+    with _lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
+        if _scheduler is not None:
+            _scheduler.close()
+            _scheduler = None
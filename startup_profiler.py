@@ -0,0 +1,114 @@
+"""
+Startup Profiler Module
+Measures per-module import time and named init phases for
+`python main.py --profile-startup`.
+Import times are collected by a meta path finder that wraps each module's
+loader; self time excludes the modules it imported in turn.
+"""
+
+import importlib.abc
+import sys
+import threading
+import time
+
+# Set when this module is imported; main.py imports it first in profile mode
+PROCESS_START = time.perf_counter()
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Delegates to the real loader and times exec_module."""
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Records cumulative and self import time for every module loaded while installed."""
+
+    def __init__(self):
+        self.modules = {}  # name -> [cumulative, self]
+        self.phases = []  # (name, seconds)
+        self._local = threading.local()
+        self._busy = threading.local()
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path, target=None):
+        if getattr(self._busy, "active", False):
+            return None
+        self._busy.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self, name)
+                    return spec
+            return None
+        finally:
+            self._busy.active = False
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name: str) -> None:
+        # [name, start, time spent in nested imports]
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str) -> None:
+        stack = self._stack()
+        _, start, nested = stack.pop()
+        elapsed = time.perf_counter() - start
+        self.modules[name] = [elapsed, elapsed - nested]
+        if stack:
+            stack[-1][2] += elapsed
+
+    def phase(self, name: str, seconds: float) -> None:
+        """Record a named init phase (e.g. "mouse listener live")."""
+        self.phases.append((name, seconds))
+
+    def report(self, top: int = 25) -> str:
+        """
+        Format the slowest modules by self time, then the init phases.
+
+        Args:
+            top: Number of modules to list
+
+        Returns:
+            Multi-line report
+        """
+        lines = [f"{'module':<40}{'self ms':>10}{'cumulative ms':>15}"]
+        ranked = sorted(self.modules.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (cumulative, own) in ranked[:top]:
+            lines.append(f"{name:<40}{1000 * own:>10.1f}{1000 * cumulative:>15.1f}")
+        lines.append(f"({len(self.modules)} modules imported)")
+        lines.append("")
+        lines.append(f"{'phase':<40}{'ms':>10}")
+        for name, seconds in self.phases:
+            lines.append(f"{name:<40}{1000 * seconds:>10.1f}")
+        return "\n".join(lines)
@@ -4,7 +4,7 @@
 import ai_handler
 import config
 
-print(f"Testing with {config.AI_BACKEND} backend...\n")
+print(f"Testing with backends: {', '.join(name for name, _ in ai_handler.backend_order())}...\n")
 
 # Test YouTube command
 prompt = "let's watch lebron highlights"
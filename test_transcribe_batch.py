@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""Quick test of batched transcription (transcribe_batch.decode_batch)."""
+
+import numpy as np
+import faster_whisper
+import transcribe_batch
+
+print(f"faster-whisper {getattr(faster_whisper, '__version__', 'unknown')}")
+
+# Two short clips of different lengths: a tone and silence
+rate = 16000
+tone = (0.3 * np.sin(2 * np.pi * 220 * np.arange(rate) / rate)).astype(np.float32)
+silence = np.zeros(rate // 2, dtype=np.float32)
+
+texts = transcribe_batch.decode_batch([tone, silence])
+print(f"Result: {texts}")
+assert len(texts) == 2 and all(isinstance(text, str) for text in texts), texts
+mode = "one at a time" if transcribe_batch._batched_unavailable else "batched"
+print(f"\n✓ Test result: two clips decoded {mode}")
@@ -0,0 +1,293 @@
+"""
+Tracing Module
+Per-command latency traces. A trace starts when the middle button is pressed
+and collects monotonic spans for each pipeline stage (capture, transcription,
+routing, LLM, action, overlay, TTS). Finished traces are appended to a
+rotating JSONL file; run this module as a script for p50/p95/p99 per stage.
+
+Usage:
+    python tracing.py --since 60
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+import config
+import log
+import metrics
+
+_log = log.get_logger("tracing")
+
+
+class Trace:
+    """Spans for one command, timed against time.perf_counter()."""
+
+    def __init__(self, trace_id: str, persist: bool = True):
+        self.id = trace_id
+        # False for traces kept only for session recording (TRACE_ENABLED off)
+        self.persist = persist
+        self.wall_time = time.time()
+        self.started = time.perf_counter()
+        # Reference point for marks: end of capture (button release)
+        self.released = self.started
+        self.spans = []
+        self.attributes = {}
+        self._marks = set()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def add_span(self, name: str, start: float, end: float, **attributes) -> None:
+        """Record a span from perf_counter() timestamps."""
+        span = {
+            "name": name,
+            "start_ms": round(1000 * (start - self.started), 3),
+            "duration_ms": round(1000 * (end - start), 3),
+        }
+        if attributes:
+            span.update(attributes)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time the enclosed block as a span."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), **attributes)
+
+    def mark(self, name: str) -> None:
+        """Record the time from button release until now, once per name."""
+        with self._lock:
+            if name in self._marks:
+                return
+            self._marks.add(name)
+        self.add_span(name, self.released, time.perf_counter())
+
+    def set(self, **attributes) -> None:
+        """Attach trace-level attributes (e.g. the route taken)."""
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def on_finish(self, callback) -> None:
+        """Call callback(trace_dict) once the trace is complete (after the grace period)."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def finish(self) -> None:
+        """
+        Write the trace after config.TRACE_GRACE_SECONDS, so spans that land
+        after the command returns (overlay, TTS start, background actions)
+        are included.
+        """
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        timer = threading.Timer(config.TRACE_GRACE_SECONDS, _write, args=(self,))
+        timer.daemon = True
+        timer.start()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "trace_id": self.id,
+                "time": self.wall_time,
+                **self.attributes,
+                "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+            }
+
+
+_counter = itertools.count(1)
+_local = threading.local()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def start_trace(required: bool = False):
+    """
+    Begin a new trace and make it current on this thread.
+
+    Args:
+        required: Return a trace even when tracing is disabled; it then
+            collects spans for on_finish callbacks but is not written
+
+    Returns:
+        Trace, or None when tracing is disabled and not required
+    """
+    if not config.TRACE_ENABLED and not required:
+        return None
+    trace = Trace(f"{os.getpid():x}-{int(time.time()):x}-{next(_counter)}", persist=config.TRACE_ENABLED)
+    _local.trace = trace
+    return trace
+
+
+def current():
+    """Return the trace active on this thread, or None."""
+    return getattr(_local, "trace", None)
+
+
+@contextmanager
+def use(trace):
+    """Make trace current on this thread for the enclosed block."""
+    previous = current()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time the enclosed block as a span of the current trace (no-op without one)."""
+    trace = current()
+    if trace is None:
+        yield
+        return
+    with trace.span(name, **attributes):
+        yield
+
+
+def _get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            # Deferred: logging.handlers pulls in socket/pickle, unused until the first trace
+            import logging
+            from logging.handlers import RotatingFileHandler
+            path = Path(config.TRACE_FILE)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                path, maxBytes=config.TRACE_MAX_BYTES, backupCount=config.TRACE_BACKUPS, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            writer = logging.getLogger("jarvis.traces")
+            writer.propagate = False
+            writer.setLevel(logging.INFO)
+            writer.addHandler(handler)
+            _writer = writer
+        return _writer
+
+
+def _write(trace: Trace) -> None:
+    record = trace.to_dict()
+    if trace.persist:
+        for span in record["spans"]:
+            metrics.STAGE_SECONDS.observe(span["duration_ms"] / 1000, span["name"])
+        try:
+            _get_writer().info(json.dumps(record, separators=(",", ":")))
+        except Exception as e:
+            _log.warning("Could not write trace: %s", e)
+    for callback in trace._callbacks:
+        try:
+            callback(record)
+        except Exception as e:
+            _log.warning("Trace callback failed: %s", e)
+
+
+# ==================== REPORT ====================
+
+def load_traces(path: Path, since: float = 0.0) -> list:
+    """
+    Read traces from the JSONL file and its rotated backups.
+
+    Args:
+        path: Current trace file
+        since: Only traces started at or after this Unix time
+
+    Returns:
+        List of trace dicts
+    """
+    path = Path(path)
+    files = [path.with_name(f"{path.name}.{i}") for i in range(config.TRACE_BACKUPS, 0, -1)] + [path]
+    traces = []
+    for file in files:
+        try:
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        trace = json.loads(line)
+                    except ValueError:
+                        continue
+                    if trace.get("time", 0) >= since:
+                        traces.append(trace)
+        except OSError:
+            continue
+    return traces
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    rank = max(1, min(len(values), math.ceil(pct / 100 * len(values))))
+    return values[rank - 1]
+
+
+def summarize(traces: list, by_backend: bool = False) -> dict:
+    """
+    Aggregate span durations per stage.
+
+    Args:
+        traces: Trace dicts as loaded by load_traces
+        by_backend: Also report AI spans per backend, as "llm[groq]" etc.
+
+    Returns:
+        Dict mapping stage name to count, p50, p95, p99 and max (milliseconds)
+    """
+    durations = {}
+    for trace in traces:
+        for span in trace.get("spans", []):
+            durations.setdefault(span["name"], []).append(span["duration_ms"])
+            if by_backend and "backend" in span:
+                durations.setdefault(f"{span['name']}[{span['backend']}]", []).append(span["duration_ms"])
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+        }
+    return summary
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Per-stage latency percentiles from Jarvis traces")
+    parser.add_argument("--since", type=float, default=60, help="Window in minutes (0 for everything)")
+    parser.add_argument("--file", default=str(config.TRACE_FILE), help="Trace JSONL file")
+    args = parser.parse_args(argv)
+
+    since = time.time() - args.since * 60 if args.since > 0 else 0.0
+    traces = load_traces(Path(args.file), since)
+    if not traces:
+        print("No traces in window")
+        return
+    print(f"{len(traces)} traces")
+    print(f"{'stage':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    summary = summarize(traces, by_backend=True)
+    # Pipeline order: earliest typical start first
+    order = {}
+    for trace in traces:
+        for span in trace.get("spans", []):
+            order.setdefault(span["name"], []).append(span["start_ms"])
+            if "backend" in span:
+                order.setdefault(f"{span['name']}[{span['backend']}]", []).append(span["start_ms"])
+    for name in sorted(summary, key=lambda n: percentile(sorted(order[n]), 50)):
+        s = summary[name]
+        print(f"{name:<24}{s['count']:>7}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
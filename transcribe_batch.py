@@ -0,0 +1,237 @@
+"""
+Transcription Batch Module
+Micro-batches concurrent in-process transcriptions. Requests that arrive
+within TRANSCRIBE_BATCH_WAIT_MS of the first one waiting (up to
+TRANSCRIBE_BATCH_MAX of them) are decoded by faster-whisper's
+BatchedInferencePipeline in one call, then each caller gets its own text.
+A longer wait fills bigger batches (throughput) at the cost of latency for
+the first request in each batch.
+"""
+
+import queue
+import threading
+import time
+from bisect import bisect_right
+import config
+import log
+import metrics
+import tracing
+import transcribe_worker
+
+_log = log.get_logger("transcribe_batch")
+
+BATCH_SIZE = metrics.histogram(
+    "jarvis_transcribe_batch_size", "Requests decoded per batched call", (1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+QUEUE_SECONDS = metrics.histogram(
+    "jarvis_transcribe_batch_queue_seconds", "Time a request waited for its batch to start decoding",
+    metrics.LATENCY_BUCKETS,
+)
+
+_MAX_CLIP_SECONDS = 30  # Whisper's window; longer utterances are decoded on their own
+
+
+class _Request:
+    """One caller's audio and, once decoded, its text or error."""
+
+    def __init__(self, audio, language: str):
+        self.audio = audio
+        self.language = language
+        self.queued = time.perf_counter()
+        self.started = None
+        self.text = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class Batcher:
+    """
+    Collects transcription requests and decodes them in batches on one thread.
+
+    Args:
+        decode: Callable taking a list of 16 kHz float32 arrays and a
+            language code, returning one transcript per array
+        max_batch: Most requests decoded in one call
+        max_wait: Seconds a batch stays open after its first request arrives
+    """
+
+    def __init__(self, decode, max_batch: int, max_wait: float):
+        self.decode = decode
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="jarvis-transcribe-batch")
+        self._thread.start()
+
+    def transcribe(self, audio, sample_rate: int, language: str = "en") -> tuple:
+        """
+        Queue audio and wait for its batch to be decoded.
+
+        Args:
+            audio: Float samples in [-1, 1] (list or numpy array)
+            sample_rate: Sample rate of audio
+            language: Whisper language code
+
+        Returns:
+            Tuple of (transcript text, time its batch started decoding)
+
+        Raises:
+            RuntimeError: If the batcher is closed
+            Exception: Whatever the batched decode raised
+        """
+        import numpy as np
+        if self._closed:
+            raise RuntimeError("Transcription batcher is closed")
+        samples = transcribe_worker._resample(np.asarray(audio, dtype=np.float32).ravel(), sample_rate)
+        request = _Request(samples, language)
+        self._queue.put(request)
+        request.done.wait()
+        trace = tracing.current()
+        if trace is not None:
+            trace.add_span("batch_wait", request.queued, request.started)
+        if request.error is not None:
+            raise request.error
+        return request.text, request.started
+
+    def close(self) -> None:
+        """Stop accepting requests; queued ones are still decoded."""
+        self._closed = True
+        self._queue.put(None)
+
+    def _collect(self, first: _Request) -> list:
+        batch = [first]
+        deadline = first.queued + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Closing: decode what we have, then let _run see the sentinel
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            started = time.perf_counter()
+            BATCH_SIZE.observe(len(batch))
+            for request in batch:
+                request.started = started
+                QUEUE_SECONDS.observe(started - request.queued)
+            # One batch per language; commands are nearly always all "en"
+            by_language = {}
+            for request in batch:
+                by_language.setdefault(request.language, []).append(request)
+            for language, requests in by_language.items():
+                try:
+                    texts = self.decode([request.audio for request in requests], language)
+                    for request, text in zip(requests, texts):
+                        request.text = text
+                except Exception as e:
+                    _log.warning("Batched transcription of %d requests failed: %s", len(requests), e)
+                    for request in requests:
+                        request.error = e
+                for request in requests:
+                    request.done.set()
+
+
+# ---------- faster-whisper batched decode ----------
+
+_pipeline = None
+_batched_unavailable = False
+
+
+def _join(segments) -> str:
+    # Segments decode lazily; joining them runs the decode
+    return " ".join(segment.text for segment in segments).strip()
+
+
+def _version(module) -> tuple:
+    """(major, minor) of a module's __version__, (0, 0) if it has none."""
+    try:
+        return tuple(int(part) for part in module.__version__.split(".")[:2])
+    except (AttributeError, ValueError):
+        return (0, 0)
+
+
+def decode_batch(audios: list, language: str = "en") -> list:
+    """
+    Decode several 16 kHz utterances with the shared in-process model.
+
+    The utterances are laid end to end and passed as explicit clips to
+    BatchedInferencePipeline, which decodes each clip as one row of a
+    single batch; segments are mapped back to their clip by timestamp.
+    Falls back to one decode per utterance on faster-whisper < 1.2, which
+    reads clip_timestamps as sample indices rather than seconds.
+
+    Args:
+        audios: Float32 numpy arrays at 16 kHz
+        language: Whisper language code
+
+    Returns:
+        One transcript per input, in order
+    """
+    global _pipeline, _batched_unavailable
+    import numpy as np
+    import transcriber
+    model = transcriber._get_model()
+
+    long_clips = [len(audio) > _MAX_CLIP_SECONDS * 16000 for audio in audios]
+    if len(audios) == 1 or _batched_unavailable or all(long_clips):
+        return [_join(model.transcribe(audio, language=language)[0]) for audio in audios]
+
+    if _pipeline is None:
+        import faster_whisper
+        if _version(faster_whisper) < (1, 2):
+            _log.warning("Batched decoding needs faster-whisper >= 1.2 (found %s); decoding one at a time",
+                         getattr(faster_whisper, "__version__", "unknown"))
+            _batched_unavailable = True
+            return decode_batch(audios, language)
+        _pipeline = faster_whisper.BatchedInferencePipeline(model=model)
+
+    texts = [None] * len(audios)
+    batched = [i for i, long_clip in enumerate(long_clips) if not long_clip]
+    for i, long_clip in enumerate(long_clips):
+        if long_clip:
+            texts[i] = _join(model.transcribe(audios[i], language=language)[0])
+
+    clips = []
+    offset = 0.0
+    for i in batched:
+        seconds = len(audios[i]) / 16000
+        clips.append({"start": offset, "end": offset + seconds})
+        offset += seconds
+    joined = np.concatenate([audios[i] for i in batched])
+    segments, _ = _pipeline.transcribe(
+        joined, language=language, batch_size=len(batched), vad_filter=False, clip_timestamps=clips,
+    )
+    starts = [clip["start"] for clip in clips]
+    parts = [[] for _ in batched]
+    for segment in segments:
+        middle = (segment.start + segment.end) / 2
+        parts[max(0, bisect_right(starts, middle) - 1)].append(segment.text)
+    for i, words in zip(batched, parts):
+        texts[i] = " ".join(words).strip()
+    return texts
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher() -> Batcher:
+    """Return the shared batcher, starting its decode thread on first use."""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = Batcher(decode_batch, config.TRANSCRIBE_BATCH_MAX, config.TRANSCRIBE_BATCH_WAIT_MS / 1000)
+    return _batcher
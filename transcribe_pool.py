@@ -0,0 +1,314 @@
+"""
+Transcription Pool Module
+Decodes audio in TRANSCRIBE_WORKERS child processes, each holding its own
+preloaded WhisperModel, so concurrent commands (server mode, replay) decode
+in parallel instead of queueing on one model and the GIL.
+Audio is handed over through a per-worker shared-memory block (float32),
+not pickled. Workers are health-checked and restarted when they crash,
+hang or fail to start.
+"""
+
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import config
+import log
+import metrics
+import transcribe_worker
+
+_log = log.get_logger("transcribe_pool")
+
+RESTARTS = metrics.counter(
+    "jarvis_transcribe_worker_restarts_total", "Transcription worker restarts, by reason", ("reason",),
+)
+
+_START_TIMEOUT = 600  # First run downloads the model
+_PING_TIMEOUT = 5
+_MAX_BACKOFF = 60
+
+
+class WorkerError(RuntimeError):
+    """A worker crashed, hung or could not start."""
+
+
+class _Worker:
+    """One child process, its pipe and its shared-memory block."""
+
+    def __init__(self, ctx, index: int, cpu_threads: int):
+        self.index = index
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=transcribe_worker.main,
+            args=(child_conn, config.WHISPER_MODEL, "auto", "auto", cpu_threads),
+            daemon=True,
+            name=f"jarvis-transcribe-{index}",
+        )
+        self.process.start()
+        child_conn.close()
+        self.block = None
+
+    def wait_ready(self, timeout: float) -> float:
+        """Wait for the model to load; returns load seconds or raises WorkerError."""
+        reply = self._receive(timeout)
+        if reply[0] != "ready":
+            raise WorkerError(reply[1])
+        return reply[2]
+
+    def call(self, message: tuple, timeout: float):
+        try:
+            self.conn.send(message)
+        except (OSError, ValueError) as e:
+            raise WorkerError(f"worker {self.index} unreachable: {e}")
+        return self._receive(timeout)
+
+    def _receive(self, timeout: float):
+        try:
+            if not self.conn.poll(timeout):
+                raise WorkerError(f"worker {self.index} did not answer within {timeout}s")
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.process.join(1)  # Reap it so exitcode and is_alive() are accurate
+            raise WorkerError(f"worker {self.index} exited (code {self.process.exitcode}): {e}")
+
+    def write_audio(self, audio) -> int:
+        """Copy audio into this worker's block (grown as needed); returns the sample count."""
+        try:
+            import numpy as np
+            samples = np.asarray(audio, dtype=np.float32).ravel()
+            count = len(samples)
+        except ImportError:
+            np = None
+            from array import array
+            samples = array("f", audio)
+            count = len(samples)
+        needed = max(4, count * 4)
+        if self.block is None or self.block.size < needed:
+            old = self.block
+            # Headroom so a slightly longer utterance does not reallocate again
+            self.block = shared_memory.SharedMemory(create=True, size=int(needed * 1.5))
+            if old is not None:
+                old.close()
+                old.unlink()
+        if np is not None:
+            view = np.ndarray((count,), dtype=np.float32, buffer=self.block.buf)
+            view[:] = samples
+            del view
+        else:
+            self.block.buf[:count * 4] = samples.tobytes()
+        return count
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(2)
+        self.conn.close()
+        if self.block is not None:
+            self.block.close()
+            try:
+                self.block.unlink()
+            except FileNotFoundError:
+                pass
+            self.block = None
+
+
+class TranscriptionPool:
+    """
+    Fixed set of transcription worker processes.
+
+    Args:
+        workers: Number of processes
+        cpu_threads: Threads per worker model (0 = split the cores evenly)
+        timeout: Seconds before a decode is abandoned and its worker restarted
+        health_seconds: Interval between health checks of idle workers
+    """
+
+    def __init__(self, workers: int, cpu_threads: int = 0, timeout: float = 60, health_seconds: float = 10):
+        self.size = workers
+        self.cpu_threads = cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+        self.timeout = timeout
+        self.health_seconds = health_seconds
+        # spawn, not fork: the assistant process is full of threads
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._alive = 0
+        self._restarts = 0
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        for index in range(workers):
+            self._launch(index)
+        threading.Thread(target=self._monitor, daemon=True, name="jarvis-transcribe-health").start()
+
+    # ---------- lifecycle ----------
+
+    def _launch(self, index: int) -> None:
+        """Start a worker on a background thread; it joins the idle queue once its model is loaded."""
+        def run():
+            backoff = 0.0
+            while not self._closed.is_set():
+                if backoff:
+                    self._closed.wait(backoff)
+                    if self._closed.is_set():
+                        return
+                worker = _Worker(self._ctx, index, self.cpu_threads)
+                try:
+                    seconds = worker.wait_ready(_START_TIMEOUT)
+                except WorkerError as e:
+                    _log.error("Transcription worker %d failed to start: %s", index, e)
+                    worker.stop()
+                    RESTARTS.inc("start_failed")
+                    backoff = min(_MAX_BACKOFF, max(1.0, backoff * 2))
+                    continue
+                _log.info("Transcription worker %d ready (pid %d, %d threads, model loaded in %.1fs)",
+                          index, worker.process.pid, self.cpu_threads, seconds)
+                with self._lock:
+                    self._alive += 1
+                self._idle.put(worker)
+                return
+
+        threading.Thread(target=run, daemon=True, name=f"jarvis-transcribe-start-{index}").start()
+
+    def _replace(self, worker: _Worker, reason: str) -> None:
+        with self._lock:
+            self._alive -= 1
+            self._restarts += 1
+        RESTARTS.inc(reason)
+        _log.warning("Restarting transcription worker %d (%s)", worker.index, reason)
+        worker.stop()
+        if not self._closed.is_set():
+            self._launch(worker.index)
+
+    def _release(self, worker: _Worker) -> None:
+        if self._closed.is_set():
+            worker.stop()
+        else:
+            self._idle.put(worker)
+
+    def _monitor(self) -> None:
+        """Check idle workers: a dead process or a missed ping gets the worker replaced."""
+        while not self._closed.wait(self.health_seconds):
+            checked = []
+            while True:
+                try:
+                    checked.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+            for worker in checked:
+                if not worker.process.is_alive():
+                    self._replace(worker, "crashed")
+                    continue
+                try:
+                    reply = worker.call(("ping",), _PING_TIMEOUT)
+                    if reply[0] != "pong":
+                        raise WorkerError(f"unexpected reply {reply[0]!r}")
+                except WorkerError:
+                    self._replace(worker, "unresponsive")
+                    continue
+                self._release(worker)
+
+    def wait_ready(self, timeout: float = _START_TIMEOUT) -> bool:
+        """Wait until at least one worker has loaded its model."""
+        deadline = time.monotonic() + timeout
+        while self._alive == 0:
+            if self._closed.is_set() or time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self) -> None:
+        """Stop all workers (idle ones now; busy ones when they come back)."""
+        self._closed.set()
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+    def stats(self) -> dict:
+        return {"workers": self.size, "alive": self._alive, "idle": self._idle.qsize(), "restarts": self._restarts}
+
+    # ---------- work ----------
+
+    def transcribe(self, audio, sample_rate: int, language: str = "en") -> str:
+        """
+        Decode audio on the next free worker. A worker that crashes mid-request
+        is restarted and the request retried once on another worker.
+
+        Args:
+            audio: Float samples in [-1, 1] (list or numpy array)
+            sample_rate: Sample rate of audio
+            language: Whisper language code
+
+        Returns:
+            Transcript text (not lowercased)
+
+        Raises:
+            WorkerError: If no worker is available or decoding failed twice
+        """
+        for attempt in range(2):
+            try:
+                worker = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise WorkerError(f"No transcription worker free within {self.timeout}s")
+            if self._closed.is_set():
+                worker.stop()
+                raise WorkerError("Transcription pool is closed")
+            try:
+                count = worker.write_audio(audio)
+                reply = worker.call(("transcribe", worker.block.name, count, sample_rate, language), self.timeout)
+            except WorkerError as e:
+                hung = worker.process.is_alive()
+                self._replace(worker, "timeout" if hung else "crashed")
+                # A hang is not retried: the same audio would likely hang again
+                if attempt == 0 and not hung:
+                    _log.warning("Transcription worker crashed, retrying: %s", e)
+                    continue
+                raise
+            self._release(worker)
+            if reply[0] != "ok":
+                raise WorkerError(f"Transcription failed in worker {worker.index}: {reply[1]}")
+            return reply[1]
+        raise WorkerError("Transcription failed")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> TranscriptionPool:
+    """Return the shared pool, starting its workers on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TranscriptionPool(
+                    config.TRANSCRIBE_WORKERS,
+                    cpu_threads=config.TRANSCRIBE_CPU_THREADS,
+                    timeout=config.TRANSCRIBE_TIMEOUT,
+                    health_seconds=config.TRANSCRIBE_HEALTH_SECONDS,
+                )
+                metrics.gauge("jarvis_transcribe_workers_alive", "Transcription worker processes with a loaded model",
+                              lambda: _pool.stats()["alive"] if _pool is not None else 0)
+                metrics.gauge("jarvis_transcribe_workers_idle", "Transcription workers waiting for audio",
+                              lambda: _pool.stats()["idle"] if _pool is not None else 0)
+    return _pool
+
+
+def shutdown() -> None:
+    """Stop the shared pool's workers."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,82 @@
+"""
+Transcription Worker Module
+Child-process side of transcribe_pool: loads one WhisperModel and decodes
+audio that the parent writes into a shared-memory block as float32.
+Imports nothing from Jarvis, so a spawned worker starts without the
+assistant's threads, logging or config.
+
+Messages (over a multiprocessing Pipe):
+    parent -> worker: ("transcribe", shm_name, n_samples, sample_rate, language)
+                      ("ping",)
+                      None (exit)
+    worker -> parent: ("ready", pid, load_seconds) | ("error", message) at start
+                      ("ok", text, decode_seconds) | ("error", message)
+                      ("pong", pid)
+"""
+
+import os
+import time
+from multiprocessing import shared_memory
+
+
+def _resample(audio, rate: int, target: int = 16000):
+    """Linear resampling to the 16 kHz Whisper expects."""
+    import numpy as np
+    if rate == target or not len(audio):
+        return audio
+    duration = len(audio) / rate
+    positions = np.linspace(0, len(audio) - 1, int(duration * target))
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def main(conn, model_name: str, device: str, compute_type: str, cpu_threads: int) -> None:
+    """
+    Worker entry point (multiprocessing target).
+
+    Args:
+        conn: Child end of the Pipe
+        model_name: Whisper model size or path
+        device: faster-whisper device ("auto", "cpu", "cuda")
+        compute_type: faster-whisper compute type
+        cpu_threads: Threads for this worker's model (0 = library default)
+    """
+    try:
+        import numpy as np
+        from faster_whisper import WhisperModel
+        start = time.perf_counter()
+        model = WhisperModel(model_name, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        conn.send(("ready", os.getpid(), time.perf_counter() - start))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+
+    # The parent keeps one block per worker and only replaces it to grow it
+    block = None
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            break
+        if task[0] == "ping":
+            conn.send(("pong", os.getpid()))
+            continue
+        _, name, n_samples, sample_rate, language = task
+        try:
+            if block is None or block.name != name:
+                if block is not None:
+                    block.close()
+                block = shared_memory.SharedMemory(name=name)
+            # Copy out so the block can be closed or reused while segments still decode
+            audio = np.ndarray((n_samples,), dtype=np.float32, buffer=block.buf).copy()
+            audio = _resample(audio, sample_rate)
+            start = time.perf_counter()
+            segments, _ = model.transcribe(audio, language=language)
+            # Segments decode lazily; joining them runs the decode
+            text = " ".join(segment.text for segment in segments).strip()
+            conn.send(("ok", text, time.perf_counter() - start))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    if block is not None:
+        block.close()
@@ -1,35 +1,183 @@
 """
 Transcriber Module
 Transcribes audio using faster-whisper (runs offline after first download).
-Model is cached after first load.
+Models are cached after first load. With WHISPER_FAST_MODEL set, each
+utterance is decoded by that small model first and only re-decoded by
+WHISPER_MODEL when the fast result looks unreliable.
 """
 
-from faster_whisper import WhisperModel
 import config
+import log
+import threading
 import wave
 import tempfile
 import struct
+import time
 from pathlib import Path
-import traceback
+import metrics
+import tracing
 
-# Global model cache
-_model = None
+_log = log.get_logger("transcriber")
 
+CASCADE = metrics.counter(
+    "jarvis_transcribe_cascade_total", "Fast-model decodes kept or escalated to WHISPER_MODEL, by reason", ("outcome",),
+)
 
-def _get_model() -> WhisperModel:
+# Global model cache, by model name
+_models = {}
+_model_lock = threading.Lock()
+_cascade_counts = {"accepted": 0, "escalated": 0}
+_cascade_lock = threading.Lock()
+
+
+def _get_model(name: str = None):
     """
-    Get or initialize the Whisper model.
-    Model is cached after first load to avoid reloading.
+    Get or initialize a Whisper model.
+    Models are cached after first load to avoid reloading. faster-whisper
+    (and ctranslate2) is imported here, not at module import, so startup
+    does not pay for it. A command arriving while a background preload is
+    still running waits for that load instead of starting a second one.
+    
+    Args:
+        name: Model size or path (config.WHISPER_MODEL if None)
     
     Returns:
         WhisperModel instance
     """
-    global _model
-    if _model is None:
-        # Initialize model (downloads on first run)
-        print(f"Loading Whisper model '{config.WHISPER_MODEL}'... (first run may take a minute or two)")
-        _model = WhisperModel(config.WHISPER_MODEL, device="auto", compute_type="auto")
-    return _model
+    name = name or config.WHISPER_MODEL
+    model = _models.get(name)
+    if model is None:
+        with _model_lock, tracing.span("model_load", model=name):
+            model = _models.get(name)
+            if model is None:
+                from faster_whisper import WhisperModel
+                # Initialize model (downloads on first run)
+                _log.info("Loading Whisper model '%s'... (first run may take a minute or two)", name)
+                model = WhisperModel(name, device="auto", compute_type="auto")
+                _models[name] = model
+    return model
+
+
+def preload() -> None:
+    """
+    Load the Whisper model now, or start the worker processes when
+    config.TRANSCRIBE_WORKERS is set (call from a background thread at startup).
+    """
+    if config.TRANSCRIBE_WORKERS > 0:
+        import transcribe_pool
+        transcribe_pool.get_pool().wait_ready()
+    else:
+        if config.WHISPER_FAST_MODEL:
+            # First, so the cascade can answer while the larger model loads
+            _get_model(config.WHISPER_FAST_MODEL)
+        _get_model()
+
+
+def _decode_in_process(audio, sample_rate: int):
+    """
+    Decode with this process's model via a temporary WAV file.
+
+    Returns:
+        Tuple of (transcript or None on failure, preprocess start, decode start)
+    """
+    # With the cascade, WHISPER_MODEL is only needed on escalation; waiting for
+    # it here would block every fast decode while it loads
+    model = None if config.WHISPER_FAST_MODEL else _get_model()
+
+    # Write audio to a temporary WAV file and pass the filename to faster-whisper
+    preprocess_start = time.perf_counter()
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tf:
+        tmp_path = Path(tf.name)
+    try:
+        flat = audio
+        if hasattr(flat, 'flatten'):
+            flat = flat.flatten()
+        else:
+            flat = list(flat)
+
+        # Convert to 16-bit PCM frames
+        pcm_frames = struct.pack('<' + 'h' * len(flat), *[int(max(-1.0, min(1.0, s)) * 32767) for s in flat])
+        with wave.open(str(tmp_path), 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(pcm_frames)
+        decode_start = time.perf_counter()
+
+        try:
+            # Diagnostic info
+            try:
+                size = tmp_path.stat().st_size
+            except Exception:
+                size = None
+            _log.debug("Wrote temp WAV %s (size=%s)", tmp_path, size)
+
+            if config.WHISPER_FAST_MODEL:
+                segments = _cascade_decode(str(tmp_path))
+            else:
+                segments, _ = model.transcribe(str(tmp_path), language="en")
+        except Exception as e:
+            _log.warning("Transcription call failed: %s", e, exc_info=True)
+            return None, preprocess_start, decode_start
+    finally:
+        try:
+            tmp_path.unlink()
+        except Exception:
+            pass
+
+    # Combine all segments into single transcript (segments decode lazily)
+    return " ".join([segment.text for segment in segments]).strip(), preprocess_start, decode_start
+
+
+def _escalation_reason(segments: list, text: str):
+    """Why a fast-model result should not be trusted, or None to keep it."""
+    if not text:
+        return "empty"
+    if min(segment.avg_logprob for segment in segments) < config.CASCADE_MIN_AVG_LOGPROB:
+        return "low_logprob"
+    if max(segment.no_speech_prob for segment in segments) > config.CASCADE_MAX_NO_SPEECH_PROB:
+        return "no_speech"
+    if config.CASCADE_REQUIRE_WAKE_WORD:
+        import command_router
+        if command_router.strip_wake_word(text) is None:
+            return "no_wake_word"
+    return None
+
+
+def _cascade_decode(path: str) -> list:
+    """
+    Decode with WHISPER_FAST_MODEL and keep the result if every segment is
+    confident and it starts with the wake word; otherwise decode again with
+    WHISPER_MODEL. Both models stay loaded.
+    
+    Returns:
+        The segments of whichever decode was kept
+    """
+    start = time.perf_counter()
+    segments, _ = _get_model(config.WHISPER_FAST_MODEL).transcribe(path, language="en")
+    segments = list(segments)
+    reason = _escalation_reason(segments, " ".join(segment.text for segment in segments).strip())
+    end = time.perf_counter()
+    trace = tracing.current()
+    if trace is not None:
+        trace.add_span("decode_fast", start, end, model=config.WHISPER_FAST_MODEL, escalated=reason is not None)
+    if reason is None:
+        CASCADE.inc("accepted")
+        with _cascade_lock:
+            _cascade_counts["accepted"] += 1
+        return segments
+    CASCADE.inc(reason)
+    with _cascade_lock:
+        _cascade_counts["escalated"] += 1
+    _log.debug("Escalating to %s (%s)", config.WHISPER_MODEL, reason)
+    segments, _ = _get_model().transcribe(path, language="en")
+    return list(segments)
+
+
+def cascade_stats() -> dict:
+    """Counts of fast-model results kept ("accepted") and re-decoded ("escalated")."""
+    with _cascade_lock:
+        return dict(_cascade_counts)
 
 
 def transcribe(audio_buffer, sample_rate: int = 16000) -> str:
@@ -45,7 +193,7 @@ def transcribe(audio_buffer, sample_rate: int = 16000) -> str:
     """
     try:
         if audio_buffer is None:
-            print("Transcription called with None audio_buffer")
+            _log.warning("Transcription called with None audio_buffer")
             return ""
 
         # Convert to list if needed (faster-whisper will handle it)
@@ -60,61 +208,49 @@ def transcribe(audio_buffer, sample_rate: int = 16000) -> str:
                 audio = list(audio)
 
         duration_sec = len(audio) / float(sample_rate) if sample_rate else 0.0
-        print(f"Transcribing audio: samples={len(audio)}, duration={duration_sec:.2f}s")
+        _log.debug("Transcribing audio: samples=%s, duration=%.2fs", len(audio), duration_sec)
 
         # Too short -> skip
         if len(audio) < 1600:
-            print("Audio too short for reliable transcription")
+            _log.info("Audio too short for reliable transcription")
             return ""
 
-        model = _get_model()
-
-        # Write audio to a temporary WAV file and pass the filename to faster-whisper
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tf:
-            tmp_path = Path(tf.name)
-        try:
-            flat = audio
-            if hasattr(flat, 'flatten'):
-                flat = flat.flatten()
-            else:
-                flat = list(flat)
-
-            # Convert to 16-bit PCM frames
-            pcm_frames = struct.pack('<' + 'h' * len(flat), *[int(max(-1.0, min(1.0, s)) * 32767) for s in flat])
-            with wave.open(str(tmp_path), 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(sample_rate)
-                wf.writeframes(pcm_frames)
-
+        if config.TRANSCRIBE_WORKERS > 0:
+            import transcribe_pool
+            # Audio goes to a worker process through shared memory, no WAV round trip
+            preprocess_start = decode_start = time.perf_counter()
             try:
-                # Diagnostic info
-                try:
-                    size = tmp_path.stat().st_size
-                except Exception:
-                    size = None
-                print(f"[DEBUG] Wrote temp WAV {tmp_path} (size={size})")
-
-                segments, _ = model.transcribe(str(tmp_path), language="en")
-            except Exception as e:
-                print(f"Transcription call failed: {e}")
-                traceback.print_exc()
+                transcript = transcribe_pool.get_pool().transcribe(audio, sample_rate)
+            except transcribe_pool.WorkerError as e:
+                _log.warning("Transcription call failed: %s", e)
                 return ""
-        finally:
+        elif config.TRANSCRIBE_BATCH_MAX > 1:
+            import transcribe_batch
+            # Waits (up to TRANSCRIBE_BATCH_WAIT_MS) for concurrent requests to share one decode
             try:
-                tmp_path.unlink()
-            except Exception:
-                pass
-
-        # Combine all segments into single transcript
-        transcript = " ".join([segment.text for segment in segments]).strip()
+                transcript, decode_start = transcribe_batch.get_batcher().transcribe(audio, sample_rate)
+            except Exception as e:
+                _log.warning("Transcription call failed: %s", e)
+                return ""
+            preprocess_start = decode_start
+        else:
+            transcript, preprocess_start, decode_start = _decode_in_process(audio, sample_rate)
+            if transcript is None:
+                return ""
+        decode_end = time.perf_counter()
+        if duration_sec:
+            metrics.TRANSCRIBE_RTF.observe((decode_end - decode_start) / duration_sec)
+        trace = tracing.current()
+        if trace is not None:
+            trace.add_span("preprocess", preprocess_start, decode_start)
+            trace.add_span("decode", decode_start, decode_end, audio_seconds=round(duration_sec, 3))
 
         if not transcript:
-            print("Transcription produced empty transcript")
+            _log.info("Transcription produced empty transcript")
             return ""
 
         # Return lowercase for consistency
         return transcript.lower()
     except Exception as e:
-        print(f"Transcription error: {e}")
+        _log.error("Transcription error: %s", e)
         return ""